@@ -1,10 +1,12 @@
 from django.contrib import admin
-from .models import Space, Machine, Reservation, Schedule, Trainer
+from .models import Space, Machine, Reservation, ReservationArchive, ReservationSeries, BookingRequest, Schedule, Trainer, WaitlistEntry
 from .forms import MachineForm
+from .methods import set_reservation_status
 
 @admin.register(Machine)
 class MachineAdmin(admin.ModelAdmin):
-    list_display = ("name", "custom_id", "category")
+    list_display = ("name", "custom_id", "category", "queued_booking")
+    list_filter = ("queued_booking",)
     filter_horizontal = ("certifications_required",)
 
 # @admin.register(Machine)
@@ -20,10 +22,53 @@ class MachineAdmin(admin.ModelAdmin):
 @admin.register(Trainer)
 class TrainerAdmin(admin.ModelAdmin):
     list_display = ("name", "major", "custom_id")
-    search_fields = ("name", "major", "custom_id", "training_certificates")
+    search_fields = ("name", "major", "custom_id", "certificates__category")
 
 #admin.site.register(Machine)
 admin.site.register(Space)
-admin.site.register(Reservation)
 admin.site.register(Schedule)
 
+@admin.register(Reservation)
+class ReservationAdmin(admin.ModelAdmin):
+    list_display = ("id", "reservation_title", "user", "space", "machine", "trainer", "date", "start_time", "end_time", "status")
+    list_filter = ("status",)
+    list_select_related = ("user", "space", "machine", "trainer")
+    actions = ("approve_selected", "reject_selected")
+
+    @admin.action(description="Approve selected pending reservations")
+    def approve_selected(self, request, queryset):
+        changed = set_reservation_status(queryset.values_list("pk", flat=True), "approved")
+        self.message_user(request, f"Approved {len(changed)} reservations.")
+
+    @admin.action(description="Reject selected pending reservations")
+    def reject_selected(self, request, queryset):
+        changed = set_reservation_status(queryset.values_list("pk", flat=True), "rejected")
+        self.message_user(request, f"Rejected {len(changed)} reservations.")
+
+@admin.register(ReservationSeries)
+class ReservationSeriesAdmin(admin.ModelAdmin):
+    list_display = ("reservation_title", "space", "user", "get_days_display", "start_date", "end_date")
+    list_filter = ("interval",)
+
+@admin.register(BookingRequest)
+class BookingRequestAdmin(admin.ModelAdmin):
+    list_display = ("id", "machine", "user", "date", "start_time", "end_time", "status", "created_at")
+    list_filter = ("status",)
+
+@admin.register(ReservationArchive)
+class ReservationArchiveAdmin(admin.ModelAdmin):
+    list_display = ("id", "reservation_title", "user", "date", "start_time", "end_time", "status", "archived_at")
+    list_filter = ("status",)
+    date_hierarchy = "date"
+
+    # Archived history is read only
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(WaitlistEntry)
+class WaitlistEntryAdmin(admin.ModelAdmin):
+    list_display = ("id", "user", "space", "machine", "trainer", "date", "start_time", "end_time", "status", "created_at")
+    list_filter = ("status",)
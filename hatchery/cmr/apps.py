@@ -6,3 +6,4 @@ class CmrConfig(AppConfig):
     name = 'cmr'
     def ready(self):
         import pct.signals
+        import cmr.signals
@@ -0,0 +1,9 @@
+from cmr.methods import get_pending_count
+
+
+def pending_approvals(request):
+    """Pending trainer reservation count for the staff nav badge (cached, so one cache hit per page)."""
+    user = getattr(request, "user", None)
+    if user is None or not (user.is_staff or user.is_superuser):
+        return {}
+    return {"pending_approval_count": get_pending_count()}
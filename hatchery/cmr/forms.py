@@ -1,8 +1,10 @@
 from django import forms
 
-from .models import Space, Machine, Reservation, Schedule, Trainer, HelpTicket, Contact
+from .models import Space, Machine, MachineCatalogEntry, Reservation, ReservationSeries, Schedule, Trainer, HelpTicket, Contact
 
-from django.db.models import Q, Min
+from .methods import set_trainer_certificates
+
+from django.db.models import Q
 
 from pct.models import TrainingCourse
 
@@ -202,12 +204,16 @@ class MachineForm(forms.ModelForm):
     class Meta:
         model = Machine
         fields = ['name', 'about', 'category', 'certifications_required', 'amount',
-                  'specifications', 'custom_id', 'machine_image', 'installed_in']
+                  'specifications', 'custom_id', 'machine_image', 'installed_in', 'queued_booking']
+        labels = {
+            'queued_booking': 'Queue reservation requests (high-demand mode)',
+        }
 
 
 class ExistingMachineForm(forms.ModelForm):
+    # One choice per machine name; the catalog row carries the fields copied below
     name = forms.ModelChoiceField(
-        queryset=Machine.objects.all(),
+        queryset=MachineCatalogEntry.objects.order_by('name'),
         to_field_name='name',
         empty_label="Select a machine",
         label="Machine Name",
@@ -237,8 +243,8 @@ class ExistingMachineForm(forms.ModelForm):
 
     def save(self, commit=True):
         """
-        Create a new Machine based on the selected existing Machine,
-        copying category / about / specifications.
+        Create a new Machine based on the selected existing machine name,
+        copying category / about / specifications from its catalog entry.
         """
         instance = super().save(commit=False)
         source_machine = self.cleaned_data['name']
@@ -267,19 +273,6 @@ class ExistingMachineForm(forms.ModelForm):
                 Space.objects.filter(current_machine=instance).update(current_machine=None)
 
         return instance
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        name_groups = (
-            Machine.objects
-            .values('name')
-            .annotate(first_id=Min('id'))
-        )
-        unique_ids = [row['first_id'] for row in name_groups]
-
-        
-        no_duplicates_qs = Machine.objects.filter(id__in=unique_ids).order_by('name')
-
-        self.fields['name'].queryset = no_duplicates_qs
 
 class ReservationForm(forms.ModelForm):
     class Meta:
@@ -328,6 +321,60 @@ class ReservationForm(forms.ModelForm):
             instance.save()
         return instance
 
+# Recurring reservation form (weekly or biweekly series)
+class ReservationSeriesForm(forms.ModelForm):
+    # Days of week checkboxes, in date.weekday() order
+    DAY_FIELDS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+    # Days of week checkboxes
+    monday = forms.BooleanField(required=False)
+    tuesday = forms.BooleanField(required=False)
+    wednesday = forms.BooleanField(required=False)
+    thursday = forms.BooleanField(required=False)
+    friday = forms.BooleanField(required=False)
+    saturday = forms.BooleanField(required=False)
+    sunday = forms.BooleanField(required=False)
+
+    class Meta:
+        model = ReservationSeries
+        fields = ['reservation_title', 'start_date', 'end_date', 'start_time', 'end_time',
+                  'interval', 'exceptions', 'notes']
+        widgets = {
+            'reservation_title': forms.TextInput(attrs={
+                'class': 'form-control',
+                'placeholder': 'Enter a short title for your reservation'
+            }),
+            'start_date': forms.DateInput(attrs={'type': 'date', 'class': 'form-control'}),
+            'end_date': forms.DateInput(attrs={'type': 'date', 'class': 'form-control'}),
+            'start_time': forms.TimeInput(attrs={'type': 'time', 'class': 'form-control'}),
+            'end_time': forms.TimeInput(attrs={'type': 'time', 'class': 'form-control'}),
+            'interval': forms.Select(attrs={'class': 'form-select'}),
+            'exceptions': forms.TextInput(attrs={
+                'class': 'form-control',
+                'placeholder': 'Dates to skip, e.g. 10-14-25;11-25-25'
+            }),
+            'notes': forms.Textarea(attrs={
+                'class': 'form-control',
+                'placeholder': 'Add any notes or special requests (optional)',
+                'rows': 3
+            }),
+        }
+        labels = {
+            'start_date': 'First Date',
+            'end_date': 'Last Date',
+            'interval': 'Repeats',
+            'exceptions': 'Skip Dates',
+        }
+
+    def clean(self):
+        cleaned_data = super().clean()
+
+        # Build the day mask from checkboxes before the model is validated (bit i is weekday i)
+        self.instance.days_of_week = sum(
+            1 << weekday for weekday, field in enumerate(self.DAY_FIELDS) if cleaned_data.get(field)
+        )
+        return cleaned_data
+
 # Schedule form for creating and editing schedules
 class ScheduleForm(forms.ModelForm):
     LOCATION_CHOICES = [
@@ -337,7 +384,9 @@ class ScheduleForm(forms.ModelForm):
         ('3rd Floor: Prototyping Shop', '3rd Floor: Prototyping Shop')
     ]
 
-    # Days of week checkboxes
+    # Days of week checkboxes, in date.weekday() order
+    DAY_FIELDS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
     monday = forms.BooleanField(required=False, initial=True)
     tuesday = forms.BooleanField(required=False, initial=True)
     wednesday = forms.BooleanField(required=False, initial=True)
@@ -393,38 +442,18 @@ class ScheduleForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
-        # If editing existing schedule, populate day checkboxes
-        if self.instance and self.instance.pk and self.instance.days_of_week:
-            days = self.instance.days_of_week.split(',')
-            self.fields['monday'].initial = 'Mon' in days
-            self.fields['tuesday'].initial = 'Tue' in days
-            self.fields['wednesday'].initial = 'Wed' in days
-            self.fields['thursday'].initial = 'Thu' in days
-            self.fields['friday'].initial = 'Fri' in days
-            self.fields['saturday'].initial = 'Sat' in days
-            self.fields['sunday'].initial = 'Sun' in days
+        # If editing existing schedule, populate day checkboxes from the day mask
+        if self.instance and self.instance.pk:
+            for weekday, field in enumerate(self.DAY_FIELDS):
+                self.fields[field].initial = bool(self.instance.days_of_week & (1 << weekday))
 
     def save(self, commit=True):
         instance = super().save(commit=False)
 
-        # Build days_of_week string from checkboxes
-        selected_days = []
-        if self.cleaned_data.get('monday'):
-            selected_days.append('Mon')
-        if self.cleaned_data.get('tuesday'):
-            selected_days.append('Tue')
-        if self.cleaned_data.get('wednesday'):
-            selected_days.append('Wed')
-        if self.cleaned_data.get('thursday'):
-            selected_days.append('Thu')
-        if self.cleaned_data.get('friday'):
-            selected_days.append('Fri')
-        if self.cleaned_data.get('saturday'):
-            selected_days.append('Sat')
-        if self.cleaned_data.get('sunday'):
-            selected_days.append('Sun')
-
-        instance.days_of_week = ','.join(selected_days)
+        # Build the day mask from checkboxes (bit i is weekday i, Monday first)
+        instance.days_of_week = sum(
+            1 << weekday for weekday, field in enumerate(self.DAY_FIELDS) if self.cleaned_data.get(field)
+        )
 
         if commit:
             instance.save()
@@ -466,7 +495,7 @@ class TrainerForm(forms.ModelForm):
     
     class Meta:
         model = Trainer
-        fields = ["custom_id", "name", "major", "training_certificates", "certified_machines", "trainer_image"]
+        fields = ["custom_id", "name", "major", "certified_machines", "trainer_image"]
         widgets = {
             "custom_id": forms.TextInput(attrs={"class": "form-control", "placeholder": "e.g., T-001"}),
             "name": forms.TextInput(attrs={"class": "form-control", "placeholder": "Trainer Name"}),
@@ -477,13 +506,8 @@ class TrainerForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
-        if self.instance and self.instance.pk and self.instance.training_certificates:
-            existing = [
-                c.strip()
-                for c in self.instance.training_certificates.split(",")
-                if c.strip()
-            ]
-            self.initial.setdefault("training_certificates", existing)
+        if self.instance and self.instance.pk:
+            self.initial.setdefault("training_certificates", self.instance.get_certificate_list())
 
     def clean_name(self):
         name = self.cleaned_data.get("name", "").strip()
@@ -507,9 +531,10 @@ class TrainerForm(forms.ModelForm):
             raise forms.ValidationError("A trainer with this custom ID already exists.")
         return custom_id
 
-    def clean_training_certificates(self):
-        data = self.cleaned_data.get("training_certificates") or []
-        return ", ".join(data)
+    def _save_m2m(self):
+        # Certificates are rows of their own, saved alongside the many-to-many fields
+        super()._save_m2m()
+        set_trainer_certificates(self.instance, self.cleaned_data.get("training_certificates") or [])
 
 
 
@@ -0,0 +1,213 @@
+"""Live reservation events for open calendars (Server-Sent Events).
+
+Reservation signals publish an event to a set of channels once the change
+commits. The SSE views subscribe to one channel each and stream the events
+out. Channels are named after what a calendar shows:
+
+- space:<pk>, machine:<pk>, trainer:<pk>
+- trainers (every trainer reservation)
+
+Channels are built from the reservation's foreign keys, so publishing costs
+no query. A floor stream subscribes to the channels of every space on the
+floor and every machine installed in them.
+
+The broker is chosen with the RESERVATION_EVENTS_BROKER setting:
+
+- LocalBroker (default) delivers to subscribers in the same process. It is
+  also the stand-in used when testing, since it needs no external service.
+- PostgresBroker sends events through PostgreSQL LISTEN/NOTIFY, so every
+  worker process sees them. Use it when running several workers.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+from collections import defaultdict
+from functools import lru_cache, partial
+from typing import Dict, Iterable, Set
+
+from django.conf import settings
+from django.db import connection, connections, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from cmr.models import Reservation
+
+logger = logging.getLogger(__name__)
+
+# Events waiting for a slow client beyond this are dropped; the client
+# refetches its feed on the next event anyway
+SUBSCRIPTION_QUEUE_SIZE = 100
+
+
+class Subscription:
+    """Events for one connected client, handed from publisher threads to its event loop."""
+
+    def __init__(self, broker: "LocalBroker", channels: Iterable[str]):
+        self.broker = broker
+        self.channels = set(channels)
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIPTION_QUEUE_SIZE)
+
+    def deliver(self, message: dict) -> None:
+        """Queue a message; safe to call from any thread."""
+        try:
+            self.loop.call_soon_threadsafe(self._put, message)
+        except RuntimeError:
+            # The client's event loop is gone
+            self.broker.unsubscribe(self)
+
+    def _put(self, message: dict) -> None:
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+
+    async def get(self) -> dict:
+        return await self.queue.get()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.broker.unsubscribe(self)
+
+
+class LocalBroker:
+    """In-process pub/sub: events reach subscribers in this process only."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions: Dict[str, Set[Subscription]] = defaultdict(set)
+
+    def subscribe(self, channels: Iterable[str]) -> Subscription:
+        """Subscribe the running event loop to the given channels (use as a context manager)."""
+        subscription = Subscription(self, channels)
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscriptions[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._subscriptions.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscriptions[channel]
+
+    def publish(self, channels: Iterable[str], message: dict) -> None:
+        self._deliver(channels, message)
+
+    def _deliver(self, channels: Iterable[str], message: dict) -> None:
+        with self._lock:
+            targets = set()
+            for channel in channels:
+                targets |= self._subscriptions.get(channel, set())
+        for subscription in targets:
+            subscription.deliver(message)
+
+
+class PostgresBroker(LocalBroker):
+    """Pub/sub over PostgreSQL LISTEN/NOTIFY, for several worker processes.
+
+    Publishing sends a NOTIFY on the default database. Each process runs one
+    listener thread on its own connection and hands notifications to its
+    local subscribers.
+    """
+
+    CHANNEL = "cmr_reservation_events"
+
+    def __init__(self):
+        super().__init__()
+        self._listener = None
+
+    def subscribe(self, channels: Iterable[str]) -> Subscription:
+        self._start_listener()
+        return super().subscribe(channels)
+
+    def publish(self, channels: Iterable[str], message: dict) -> None:
+        payload = json.dumps({"channels": sorted(channels), "message": message}, default=str)
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [self.CHANNEL, payload])
+
+    def _start_listener(self) -> None:
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, name="reservation-events", daemon=True)
+                self._listener.start()
+
+    def _listen(self) -> None:
+        wrapper = connections["default"]
+        while True:
+            try:
+                listener = wrapper.Database.connect(**wrapper.get_connection_params())
+                listener.autocommit = True
+                with listener.cursor() as cursor:
+                    cursor.execute(f"LISTEN {self.CHANNEL}")
+                while True:
+                    if select.select([listener], [], [], 30) == ([], [], []):
+                        continue
+                    listener.poll()
+                    while listener.notifies:
+                        notify = listener.notifies.pop(0)
+                        event = json.loads(notify.payload)
+                        self._deliver(event["channels"], event["message"])
+            except Exception:
+                logger.exception("Reservation event listener failed; reconnecting")
+                time.sleep(5)
+
+
+@lru_cache(maxsize=None)
+def get_broker() -> LocalBroker:
+    """The broker named by settings.RESERVATION_EVENTS_BROKER (one per process)."""
+    return import_string(settings.RESERVATION_EVENTS_BROKER)()
+
+
+def calendar_time(value) -> str:
+    """Format an aware datetime as local wall-clock ISO time, which is what the calendars display."""
+    return timezone.localtime(value).replace(tzinfo=None).isoformat()
+
+
+def reservation_channels(reservation: Reservation) -> Set[str]:
+    """Channels whose calendars show this reservation, built from its foreign keys without a query."""
+    channels = set()
+    if reservation.space_id:
+        channels.add(f"space:{reservation.space_id}")
+    if reservation.machine_id:
+        channels.add(f"machine:{reservation.machine_id}")
+    if reservation.trainer_id:
+        channels |= {f"trainer:{reservation.trainer_id}", "trainers"}
+    return channels
+
+
+def reservation_event(reservation: Reservation, action: str) -> dict:
+    """Event payload for a created, updated or deleted reservation."""
+    return {
+        "action": action,
+        "id": reservation.pk,
+        "reservation_title": reservation.reservation_title,
+        "start": calendar_time(reservation.starts_at),
+        "end": calendar_time(reservation.ends_at),
+        "status": reservation.status,
+        "space_id": reservation.space_id,
+        "machine_id": reservation.machine_id,
+        "trainer_id": reservation.trainer_id,
+    }
+
+
+def publish_reservation_change(reservation: Reservation, action: str) -> None:
+    """Publish a reservation event to its calendars once the current transaction commits."""
+    channels = reservation_channels(reservation)
+    if channels:
+        transaction.on_commit(partial(get_broker().publish, channels, reservation_event(reservation, action)))
+
+
+def publish_reservation_changes(reservations: Iterable[Reservation], action: str) -> None:
+    """Publish events for many reservations (e.g. bulk-created series occurrences)."""
+    for reservation in reservations:
+        publish_reservation_change(reservation, action)
@@ -0,0 +1,64 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from cmr.models import Reservation
+
+# One exclusion constraint per exclusive resource, over the same aware
+# [starts_at, ends_at) span that overlap_q() and the conflict check query.
+# Rejected trainer bookings never hold a slot, so they are left out.
+CONSTRAINTS = [
+    ('cmr_reservation_machine_no_overlap', 'machine_id'),
+    ('cmr_reservation_trainer_no_overlap', 'trainer_id'),
+]
+
+# Spaces can seat several people at once, which an exclusion constraint cannot
+# express; their capacity is checked in Reservation.clean() with the space row
+# locked (see book_reservation). Older installs still carry this constraint.
+RETIRED_CONSTRAINTS = ['cmr_reservation_space_no_overlap']
+
+
+class Command(BaseCommand):
+    help = (
+        'Add PostgreSQL exclusion constraints that stop a machine or trainer '
+        'from being double booked at the database level (requires btree_gist)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--drop',
+            action='store_true',
+            help='Remove the exclusion constraints instead of adding them',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            self.stdout.write(
+                self.style.WARNING(
+                    f'Exclusion constraints need PostgreSQL (current database: {connection.vendor}). '
+                    'Overlaps are still rejected by Reservation.clean().'
+                )
+            )
+            return
+
+        table = Reservation._meta.db_table
+
+        with connection.cursor() as cursor:
+            if options['drop']:
+                for name in [name for name, _column in CONSTRAINTS] + RETIRED_CONSTRAINTS:
+                    cursor.execute(f'ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {name}')
+                    self.stdout.write(self.style.SUCCESS(f'Dropped {name}'))
+                return
+
+            for name in RETIRED_CONSTRAINTS:
+                cursor.execute(f'ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {name}')
+
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+            for name, column in CONSTRAINTS:
+                cursor.execute(f'ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {name}')
+                cursor.execute(
+                    f'ALTER TABLE {table} ADD CONSTRAINT {name} EXCLUDE USING gist ('
+                    f'{column} WITH =, '
+                    f"tstzrange(starts_at, ends_at, '[)') WITH &&"
+                    f") WHERE ({column} IS NOT NULL AND status <> 'rejected')"
+                )
+                self.stdout.write(self.style.SUCCESS(f'Added {name}'))
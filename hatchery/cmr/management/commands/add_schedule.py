@@ -1,5 +1,5 @@
 from django.core.management.base import BaseCommand
-from cmr.models import Schedule
+from cmr.models import WEEKDAYS_MASK, Schedule
 from datetime import date, time
 
 
@@ -14,7 +14,7 @@ class Command(BaseCommand):
             end_date=date(2025, 12, 5),
             open_time=time(12, 0),  # 12:00 PM
             close_time=time(22, 0),  # 10:00 PM
-            days_of_week="Monday,Tuesday,Wednesday,Thursday,Friday",
+            days_of_week=WEEKDAYS_MASK,
             location="Hatchery",
             holidays="11-27-25",  # Thanksgiving
             is_active=True
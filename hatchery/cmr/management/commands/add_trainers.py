@@ -1,4 +1,5 @@
 from django.core.management.base import BaseCommand
+from cmr.methods import set_trainer_certificates
 from cmr.models import Trainer
 
 
@@ -80,8 +81,8 @@ class Command(BaseCommand):
                 name=data["name"],
                 custom_id=data["custom_id"],
                 major=data["major"],
-                training_certificates=data["training_certificates"]
             )
+            set_trainer_certificates(trainer, data["training_certificates"].split(","))
             self.stdout.write(
                 self.style.SUCCESS(
                     f'Created trainer: {trainer.name} ({trainer.custom_id}) - {trainer.major}'
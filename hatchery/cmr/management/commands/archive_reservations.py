@@ -0,0 +1,47 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from cmr.methods import archive_reservations
+from cmr.models import Reservation
+
+
+class Command(BaseCommand):
+    help = (
+        'Move reservations older than the archive horizon out of the reservation table '
+        'and into the reservation archive, in batches'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.RESERVATION_ARCHIVE_DAYS,
+            help='Archive reservations dated more than this many days ago',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000, help='Reservations moved per transaction')
+        parser.add_argument('--sleep', type=float, default=0.0, help='Seconds to pause between batches')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many reservations would move')
+
+    def handle(self, *args, **options):
+        before = timezone.localdate() - timedelta(days=options['days'])
+
+        if options['dry_run']:
+            count = Reservation.objects.in_window(end=before).count()
+            self.stdout.write(f'{count} reservations dated before {before} would be archived')
+            return
+
+        total = 0
+        while True:
+            moved = archive_reservations(before, batch_size=options['batch_size'])
+            if not moved:
+                break
+            total += moved
+            self.stdout.write(f'Archived {moved} reservations ({total} so far)')
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(f'Archived {total} reservations dated before {before}'))
@@ -0,0 +1,106 @@
+import random
+import statistics
+import time
+from datetime import date, time as dtime, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from cmr.models import Machine, Reservation
+
+# Two-hour slots seeded for every machine on every day
+SLOTS = [(dtime(h, 0), dtime(h + 2, 0)) for h in range(8, 22, 2)]
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark Reservation.check_conflicts() as the reservation table grows. '
+        'All seeded data is rolled back when the command finishes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            nargs='+',
+            type=int,
+            default=[1000, 10000, 100000],
+            help='Table sizes (number of reservations) to measure at',
+        )
+        parser.add_argument('--machines', type=int, default=40, help='Number of machines to spread bookings over')
+        parser.add_argument('--checks', type=int, default=200, help='Conflict checks to time at each size')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for the probes')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        sizes = sorted(options['sizes'])
+
+        with transaction.atomic():
+            user = User.objects.create(username='benchmark-conflicts')
+            machines = Machine.objects.bulk_create([
+                Machine(name='Benchmark Machine', custom_id=f'BM-{i:04d}', category='Benchmark')
+                for i in range(options['machines'])
+            ])
+
+            start_day = date(2000, 1, 1)
+            seeded = 0
+            rows = self._rows(user, machines, start_day)
+
+            self.stdout.write(f"{'reservations':>12}  {'mean ms':>8}  {'p95 ms':>8}  {'queries':>7}")
+            for size in sizes:
+                batch = []
+                while seeded < size:
+                    batch.append(next(rows))
+                    seeded += 1
+                    if len(batch) >= 5000:
+                        Reservation.objects.bulk_create(batch)
+                        batch = []
+                if batch:
+                    Reservation.objects.bulk_create(batch)
+
+                days_seeded = max(1, seeded // (len(machines) * len(SLOTS)))
+                timings = []
+                with CaptureQueriesContext(connection) as queries:
+                    for _ in range(options['checks']):
+                        slot_start, slot_end = rng.choice(SLOTS)
+                        probe = Reservation(
+                            machine=rng.choice(machines),
+                            user=user,
+                            reservation_title='probe',
+                            date=start_day + timedelta(days=rng.randrange(days_seeded)),
+                            start_time=slot_start,
+                            end_time=slot_end,
+                        )
+                        began = time.perf_counter()
+                        probe.check_conflicts()
+                        timings.append((time.perf_counter() - began) * 1000)
+
+                timings.sort()
+                p95 = timings[int(len(timings) * 0.95) - 1]
+                self.stdout.write(
+                    f'{seeded:>12}  {statistics.mean(timings):>8.3f}  {p95:>8.3f}  '
+                    f'{len(queries) / options["checks"]:>7.1f}'
+                )
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS('Benchmark finished, seeded data rolled back.'))
+
+    def _rows(self, user, machines, start_day):
+        day = 0
+        while True:
+            booking_date = start_day + timedelta(days=day)
+            for machine in machines:
+                for slot_start, slot_end in SLOTS:
+                    reservation = Reservation(
+                        machine=machine,
+                        user=user,
+                        reservation_title='benchmark',
+                        date=booking_date,
+                        start_time=slot_start,
+                        end_time=slot_end,
+                    )
+                    reservation.set_span()
+                    yield reservation
+            day += 1
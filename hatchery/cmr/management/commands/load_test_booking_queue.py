@@ -0,0 +1,141 @@
+import statistics
+import threading
+import time
+import uuid
+from datetime import date, time as dtime, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+from django.urls import reverse
+
+from cmr.methods import process_booking_requests
+from cmr.models import ALL_DAYS_MASK, BookingRequest, Machine, Reservation, Schedule
+
+
+class Command(BaseCommand):
+    help = (
+        'Load test the reserve endpoint of a high-demand machine: many clients request the same few '
+        'slots at once while the booking worker drains the queue. Reports request latency, drain time '
+        'and whether every slot went to its first requester. Test data is deleted afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=20, help='Concurrent clients')
+        parser.add_argument('--requests', type=int, default=10, help='Requests sent by each client')
+        parser.add_argument('--slots', type=int, default=5, help='Distinct slots the clients fight over')
+        parser.add_argument(
+            '--mode',
+            choices=['queued', 'direct'],
+            default='queued',
+            help='Queue requests for the worker, or book them directly for comparison',
+        )
+
+    def handle(self, *args, **options):
+        tag = uuid.uuid4().hex[:6]
+        machine = Machine.objects.create(
+            name=f'Load Test Machine {tag}', custom_id=f'LT-{tag}', category='Load Test',
+            queued_booking=options['mode'] == 'queued',
+        )
+        users = [User.objects.create(username=f'loadtest-{tag}-{i}') for i in range(options['clients'])]
+        url = reverse('machine-reserve', kwargs={'custom_id': machine.custom_id})
+        slots = [date(2099, 6, 1) + timedelta(days=i) for i in range(options['slots'])]
+        # Bookings must fall within opening hours, so open the test dates
+        schedule = Schedule.objects.create(
+            name=f'Load Test {tag}', start_date=slots[0], end_date=slots[-1],
+            open_time=dtime(0, 0), close_time=dtime(23, 59),
+            days_of_week=ALL_DAYS_MASK, is_active=True,
+        )
+
+        latencies = []
+        errors = []
+        lock = threading.Lock()
+        barrier = threading.Barrier(len(users))
+        sending = threading.Event()
+        sending.set()
+
+        def client_loop(index, user):
+            client = Client(SERVER_NAME='localhost')
+            client.force_login(user)
+            try:
+                barrier.wait()
+                for n in range(options['requests']):
+                    slot = slots[(index + n) % len(slots)]
+                    began = time.perf_counter()
+                    response = client.post(url, {
+                        'reservation_title': f'load test {index}-{n}',
+                        'date': slot.isoformat(),
+                        'start_time': '10:00',
+                        'end_time': '11:00',
+                    })
+                    elapsed = (time.perf_counter() - began) * 1000
+                    with lock:
+                        latencies.append(elapsed)
+                        if response.status_code not in (200, 302):
+                            errors.append(response.status_code)
+            finally:
+                connections.close_all()
+
+        def worker_loop():
+            try:
+                while sending.is_set() or BookingRequest.objects.filter(machine=machine, status='queued').exists():
+                    if not sum(process_booking_requests(limit=10).values()):
+                        time.sleep(0.05)
+            finally:
+                connections.close_all()
+
+        try:
+            worker = threading.Thread(target=worker_loop)
+            if options['mode'] == 'queued':
+                worker.start()
+
+            started = time.perf_counter()
+            threads = [threading.Thread(target=client_loop, args=(i, u)) for i, u in enumerate(users)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            sent_at = time.perf_counter()
+            sending.clear()
+            if options['mode'] == 'queued':
+                worker.join()
+            drained_at = time.perf_counter()
+
+            self._report(machine, slots, latencies, errors, sent_at - started, drained_at - started, options)
+        finally:
+            BookingRequest.objects.filter(machine=machine).delete()
+            Reservation.objects.filter(machine=machine).delete()
+            machine.delete()
+            schedule.delete()
+            User.objects.filter(pk__in=[u.pk for u in users]).delete()
+
+    def _report(self, machine, slots, latencies, errors, send_seconds, drain_seconds, options):
+        latencies.sort()
+        total = len(latencies)
+        self.stdout.write(f"Mode: {options['mode']}")
+        self.stdout.write(f'Requests: {total} from {options["clients"]} clients in {send_seconds:.2f}s')
+        self.stdout.write(
+            f'Request latency ms: p50 {statistics.median(latencies):.1f}, '
+            f'p95 {latencies[int(total * 0.95) - 1]:.1f}, max {latencies[-1]:.1f}'
+        )
+        self.stdout.write(f'All requests processed after {drain_seconds:.2f}s')
+
+        problems = []
+        if errors:
+            problems.append(f'{len(errors)} requests failed with status {sorted(set(errors))}')
+
+        for slot in slots:
+            booked = Reservation.objects.filter(machine=machine, date=slot).count()
+            if booked != 1:
+                problems.append(f'{slot}: {booked} reservations')
+
+        if options['mode'] == 'queued':
+            for slot in slots:
+                first = BookingRequest.objects.filter(machine=machine, date=slot).order_by('id').first()
+                if first is None or first.status != 'booked':
+                    problems.append(f'{slot}: first request in line was not the one booked')
+
+        if problems:
+            raise CommandError('; '.join(problems))
+        self.stdout.write(self.style.SUCCESS('Every slot was booked exactly once, in arrival order.'))
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from cmr.methods import process_booking_requests
+
+
+class Command(BaseCommand):
+    help = 'Book queued reservation requests for high-demand machines in arrival order'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Drain the queue once and exit')
+        parser.add_argument('--batch-size', type=int, default=100, help='Requests booked per transaction')
+        parser.add_argument('--sleep', type=float, default=1.0, help='Seconds to wait when the queue is empty')
+
+    def handle(self, *args, **options):
+        while True:
+            counts = process_booking_requests(limit=options['batch_size'])
+            processed = sum(counts.values())
+            if processed:
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"Booked {counts['booked']}, rejected {counts['rejected']}, failed {counts['failed']}"
+                    )
+                )
+                continue
+
+            if options['once']:
+                return
+            time.sleep(options['sleep'])
@@ -0,0 +1,24 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from cmr.methods import prune_reservation_changes
+
+
+class Command(BaseCommand):
+    help = 'Delete delta-sync change log entries older than the retention period'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.RESERVATION_CHANGE_LOG_DAYS,
+            help='Keep change log entries from the last this many days',
+        )
+
+    def handle(self, *args, **options):
+        before = timezone.now() - timedelta(days=options['days'])
+        deleted = prune_reservation_changes(before)
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} change log entries older than {before:%Y-%m-%d %H:%M}'))
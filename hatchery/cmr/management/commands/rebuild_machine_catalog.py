@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from cmr.methods import rebuild_machine_catalog
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild the machine catalog (one row per machine name) from the machines table, '
+        'e.g. after bulk updates that bypass the Machine/Space signals'
+    )
+
+    def handle(self, *args, **options):
+        count = rebuild_machine_catalog()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt the machine catalog: {count} machine names'))
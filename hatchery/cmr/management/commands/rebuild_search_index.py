@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from cmr.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild the full-text search index over machines, spaces and trainers, '
+        'e.g. after bulk updates that bypass their signals'
+    )
+
+    def handle(self, *args, **options):
+        count = rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} search documents'))
@@ -0,0 +1,104 @@
+import threading
+import time
+import uuid
+from datetime import date, time as dtime, timedelta
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+
+from cmr.methods import book_reservation
+from cmr.models import ALL_DAYS_MASK, Machine, Reservation, Schedule, Space
+
+
+class Command(BaseCommand):
+    help = (
+        'Fire parallel bookings at a single machine slot and check that exactly one succeeds. '
+        'Creates a throwaway space, machine and users, and deletes them afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=16, help='Number of concurrent booking threads')
+        parser.add_argument('--rounds', type=int, default=5, help='Number of slots to fight over')
+
+    def handle(self, *args, **options):
+        if connection.vendor == 'sqlite' and connection.settings_dict['NAME'] == ':memory:':
+            raise CommandError('Run this against a file or server database; in-memory SQLite is per-thread.')
+
+        tag = uuid.uuid4().hex[:6]
+        space = Space.objects.create(
+            title=f'Stress Space {tag}', custom_id=f'ST-{tag}', capacity=1,
+            location=Space.LOCATION_CHOICES[0][0], floor=2, type='station',
+        )
+        machine = Machine.objects.create(name=f'Stress Machine {tag}', custom_id=f'SM-{tag}',
+                                         category='Stress', installed_in=space)
+        users = [User.objects.create(username=f'stress-{tag}-{i}') for i in range(options['workers'])]
+        # Bookings must fall within opening hours, so open the test dates
+        schedule = Schedule.objects.create(
+            name=f'Stress Test {tag}', start_date=date(2099, 1, 1),
+            end_date=date(2099, 1, 1) + timedelta(days=options['rounds']),
+            open_time=dtime(0, 0), close_time=dtime(23, 59),
+            days_of_week=ALL_DAYS_MASK, is_active=True,
+        )
+
+        failures = []
+        try:
+            for round_number in range(options['rounds']):
+                slot_date = date(2099, 1, 1) + timedelta(days=round_number)
+                outcome = self._round(users, machine, space, slot_date)
+                booked = Reservation.objects.filter(machine=machine, date=slot_date).count()
+                linked = Reservation.objects.filter(space=space, date=slot_date).count()
+                self.stdout.write(
+                    f'Round {round_number + 1}: {outcome["booked"]} booked, {outcome["rejected"]} rejected, '
+                    f'{outcome["errors"]} errors, rows: {booked} machine / {linked} space, '
+                    f'slowest {outcome["slowest"]:.1f} ms'
+                )
+                if outcome['booked'] != 1 or booked != 1 or linked != 1 or outcome['errors']:
+                    failures.append(round_number + 1)
+        finally:
+            Reservation.objects.filter(machine=machine).delete()
+            Reservation.objects.filter(space=space).delete()
+            machine.delete()
+            space.delete()
+            schedule.delete()
+            User.objects.filter(pk__in=[u.pk for u in users]).delete()
+
+        if failures:
+            raise CommandError(f'Double booking or errors in round(s): {failures}')
+        self.stdout.write(self.style.SUCCESS('Every round booked the slot exactly once.'))
+
+    def _round(self, users, machine, space, slot_date):
+        barrier = threading.Barrier(len(users))
+        lock = threading.Lock()
+        outcome = {'booked': 0, 'rejected': 0, 'errors': 0, 'slowest': 0.0}
+
+        def attempt(user):
+            try:
+                barrier.wait()
+                began = time.perf_counter()
+                reservation = Reservation(
+                    machine=machine, user=user, reservation_title='stress',
+                    date=slot_date, start_time=dtime(10, 0), end_time=dtime(11, 0),
+                )
+                try:
+                    book_reservation(reservation, linked_resource=space)
+                    result = 'booked'
+                except ValidationError:
+                    result = 'rejected'
+                except Exception as e:
+                    self.stderr.write(f'{user.username}: {e!r}')
+                    result = 'errors'
+                elapsed = (time.perf_counter() - began) * 1000
+                with lock:
+                    outcome[result] += 1
+                    outcome['slowest'] = max(outcome['slowest'], elapsed)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=attempt, args=(user,)) for user in users]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return outcome
@@ -1,16 +1,38 @@
 from __future__ import annotations
 
-from typing import Iterable, Optional, Sequence, Union
+import logging
+import uuid
+from collections import defaultdict
+from contextvars import ContextVar
+from datetime import date, time as dtime, timedelta
+from functools import partial
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
+from django.core.mail import send_mail
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
 
-from core import constants as const
 from cmr.models import (
     Space,
     Machine,
-    SpaceCapability,
+    MachineCatalogEntry,
+    Trainer,
+    TrainerCertificate,
     Reservation,
+    BookingRequest,
+    ReservationArchive,
+    ReservationChange,
+    Schedule,
+    WaitlistEntry,
+    overlap_q,
 )
+from cmr.live import publish_reservation_change
+from cmr.search import index_object
+
+logger = logging.getLogger(__name__)
 
 
 def _get_instance(model, obj_or_id):
@@ -22,3 +44,659 @@ def _get_instance(model, obj_or_id):
     return model.objects.get(pk=obj_or_id)
 
 
+# ---- Booking ----------------------------------------------------------------
+
+# Resource rows are always locked in this order so concurrent bookings cannot deadlock
+LOCK_ORDER = (('space', Space), ('machine', Machine), ('trainer', Trainer))
+
+
+def _lock_resources(reservations: Iterable[Reservation]) -> None:
+    """Lock the space/machine/trainer rows the given reservations book.
+
+    Uses SELECT ... FOR UPDATE where the database supports it (PostgreSQL).
+    SQLite ignores FOR UPDATE; there the transaction itself is opened with
+    BEGIN IMMEDIATE (see DATABASES in settings), which serializes writers.
+    """
+    for field, model in LOCK_ORDER:
+        ids = sorted({getattr(r, f"{field}_id") for r in reservations} - {None})
+        if ids:
+            list(model.objects.select_for_update().filter(pk__in=ids).order_by('pk').values_list('pk', flat=True))
+
+
+def book_reservation(
+    reservation: Reservation,
+    linked_resource: Optional[Union[Space, Machine]] = None,
+):
+    """Validate and save a reservation, plus its linked space/machine reservation.
+
+    Everything happens in one transaction with the booked resource rows locked,
+    so two requests for the same slot cannot both succeed, and a failed linked
+    reservation never leaves the primary one behind.
+
+    Args:
+        reservation: Unsaved reservation with user, resource, date and times set
+        linked_resource: Space or Machine to book alongside it for the same slot
+            (the machine installed in a booked space, or the space a booked machine is in)
+
+    Returns:
+        (reservation, linked_reservation) where linked_reservation is None when
+        no linked_resource was given.
+
+    Raises:
+        ValidationError if either reservation conflicts or fails training checks;
+        nothing is written in that case.
+    """
+    linked = None
+    if linked_resource is not None:
+        linked = Reservation(
+            space=linked_resource if isinstance(linked_resource, Space) else None,
+            machine=linked_resource if isinstance(linked_resource, Machine) else None,
+            user=reservation.user,
+            reservation_title=f"Linked to {reservation.reservation_title}",
+            date=reservation.date,
+            start_time=reservation.start_time,
+            end_time=reservation.end_time,
+        )
+
+    with transaction.atomic():
+        _lock_resources([r for r in (reservation, linked) if r is not None])
+
+        reservation.full_clean()
+        if linked is not None:
+            linked.full_clean()  # ALSO validates training
+
+        reservation.save()
+        if linked is not None:
+            linked.linked_reservation = reservation
+            linked.save()
+            reservation.linked_reservation = linked
+            reservation.save(update_fields=['linked_reservation'])
+
+    return reservation, linked
+
+
+def book_any_unit(reservation: Reservation, name: str):
+    """Book the first free machine unit called `name` for the reservation's slot.
+
+    Identical units share a name (see ExistingMachineForm). Every unit and the
+    space it sits in are locked first, so two pooled bookings cannot pick the
+    same unit, then a single query finds the units with no overlapping booking.
+    The first one whose booking passes book_reservation() is kept, together
+    with its linked space reservation.
+
+    Returns (reservation, linked_reservation) like book_reservation().
+    Raises ValidationError when no unit can be booked; nothing is written then.
+    """
+    reservation.set_span()
+    units = Machine.objects.filter(name=name)
+
+    with transaction.atomic():
+        _lock_resources([
+            Reservation(machine_id=machine_id, space_id=space_id)
+            for machine_id, space_id in units.values_list('pk', 'installed_in_id')
+        ])
+
+        busy = Reservation.objects.active().filter(machine=OuterRef('pk')).overlapping(
+            reservation.starts_at, reservation.ends_at
+        )
+        free_units = list(units.exclude(Exists(busy)).select_related('installed_in').order_by('custom_id'))
+        if not free_units:
+            raise ValidationError(
+                f"No {name} is free on {reservation.date} "
+                f"from {reservation.start_time.strftime('%H:%M')} to {reservation.end_time.strftime('%H:%M')}."
+            )
+
+        error = None
+        for unit in free_units:
+            reservation.machine = unit
+            try:
+                return book_reservation(reservation, linked_resource=unit.installed_in)
+            except ValidationError as e:
+                # e.g. the unit's space is full, or the unit needs other training
+                error = e
+        raise error
+
+
+def cancel_reservation(reservation: Reservation) -> List[WaitlistEntry]:
+    """Delete a reservation (and its linked space/machine reservation) and refill the slot.
+
+    Waitlisted users are promoted into the freed slot in the same transaction,
+    so nobody else can grab it in between. Returns the promoted entries.
+    """
+    freed = [reservation]
+    if reservation.linked_reservation_id:
+        freed.append(reservation.linked_reservation)
+
+    with transaction.atomic():
+        _lock_resources(freed)
+        for row in freed:
+            row.delete()
+        return promote_waitlist(freed)
+
+
+def promote_waitlist(freed: Iterable[Reservation]) -> List[WaitlistEntry]:
+    """Book waiting entries that overlap the freed reservations, first come first served.
+
+    Each candidate goes through book_reservation(), so it gets the same conflict
+    and training checks as Reservation.clean(). Users who are not eligible, or
+    whose slot is still partly taken, stay on the waitlist. Must run inside the
+    transaction that freed the slot.
+    """
+    slots = Q()
+    for row in freed:
+        for field in Reservation.RESOURCE_FIELDS:
+            resource_id = getattr(row, f"{field}_id")
+            if resource_id is not None:
+                slots |= Q(**{f"{field}_id": resource_id}) & overlap_q(row.starts_at, row.ends_at)
+    if not slots:
+        return []
+
+    candidates = (
+        WaitlistEntry.objects.filter(status='waiting', starts_at__gt=timezone.now())
+        .filter(slots)
+        .select_related('space__current_machine', 'machine__installed_in', 'trainer', 'user')
+        .order_by('id')
+    )
+
+    promoted = []
+    for entry in candidates:
+        reservation = entry.build_reservation()
+        try:
+            book_reservation(reservation, linked_resource=entry.get_linked_resource())
+        except ValidationError:
+            continue
+        entry.status = 'promoted'
+        entry.reservation = reservation
+        entry.promoted_at = timezone.now()
+        entry.save(update_fields=['status', 'reservation', 'promoted_at'])
+        transaction.on_commit(partial(notify_waitlist_promotion, entry))
+        promoted.append(entry)
+    return promoted
+
+
+def notify_waitlist_promotion(entry: WaitlistEntry) -> None:
+    """Email a user that their waitlist entry became a reservation."""
+    if not entry.user.email:
+        return
+    send_mail(
+        subject=f"Your waitlisted slot for {entry.get_reservable_object()} is booked",
+        message=(
+            f"A slot you were waiting for opened up and has been reserved for you:\n\n"
+            f"{entry.reservation_title}\n"
+            f"{entry.get_reservable_object()} on {entry.date} "
+            f"from {entry.start_time.strftime('%H:%M')} to {entry.end_time.strftime('%H:%M')}\n\n"
+            f"If you no longer need it, please cancel it so the next person can have it."
+        ),
+        from_email=None,
+        recipient_list=[entry.user.email],
+        fail_silently=True,
+    )
+
+
+# ---- Approvals --------------------------------------------------------------
+
+PENDING_COUNT_KEY = "cmr:pending-reservations-count"
+PENDING_COUNT_TIMEOUT = 300
+
+
+def get_pending_count() -> int:
+    """Number of trainer reservations awaiting approval (cached for the staff badge)."""
+    return cache.get_or_set(
+        PENDING_COUNT_KEY,
+        lambda: Reservation.objects.filter(status='pending').count(),
+        PENDING_COUNT_TIMEOUT,
+    )
+
+
+def invalidate_pending_count() -> None:
+    """Drop the cached pending count once the current transaction commits."""
+    transaction.on_commit(partial(cache.delete, PENDING_COUNT_KEY))
+
+
+def set_reservation_status(ids: Iterable[int], status: str) -> List[Reservation]:
+    """Approve or reject pending reservations in one UPDATE ... WHERE id IN (...).
+
+    Reservations that are no longer pending are left alone. QuerySet.update()
+    sends no signals, so the change log (which also moves the feed versions),
+    live events and pending count are refreshed here. Rejected bookings free their slot, which goes to
+    the waitlist. Returns the reservations that changed.
+    """
+    with transaction.atomic():
+        pending = Reservation.objects.filter(pk__in=list(ids), status='pending')
+        rows = list(pending.select_for_update(of=('self',)).select_related('space', 'machine'))
+        if not rows:
+            return []
+        pending.filter(pk__in=[row.pk for row in rows]).update(status=status)
+
+        for row in rows:
+            row.status = status
+            publish_reservation_change(row, 'updated')
+        record_reservation_changes(rows, 'updated')
+        invalidate_pending_count()
+        if status == 'rejected':
+            promote_waitlist(rows)
+    return rows
+
+
+# ---- Feed versions ----------------------------------------------------------
+
+def _feed_changes(scope: str, key):
+    """Change-log rows of the reservations a feed shows."""
+    changes = ReservationChange.objects.all()
+    if scope == 'space':
+        return changes.filter(space_id__in=Space.objects.filter(custom_id=key).values('id'))
+    if scope == 'machine':
+        return changes.filter(machine_id__in=Machine.objects.filter(custom_id=key).values('id'))
+    if scope == 'trainer':
+        return changes.filter(trainer_id__isnull=False) if key == 'all' else changes.filter(trainer_id=key)
+    if scope == 'user':
+        return changes.filter(user_id=key)
+    raise ValueError(f"Unknown feed scope: {scope}")
+
+
+def get_feed_version(scope: str, key) -> Tuple[str, float]:
+    """Return (token, modified timestamp) for a reservation feed: its latest change-log row.
+
+    Scopes are 'space' and 'machine' (keyed by custom_id), 'trainer' (keyed by
+    pk, or 'all' for the combined trainer feed) and 'user' (keyed by user pk).
+    Every reservation write appends to the change log in its own transaction
+    (see record_reservation_changes), so the version is the same in every
+    process, moves as soon as a write commits and stays put while nothing
+    changes. One indexed query.
+    """
+    latest = _feed_changes(scope, key).order_by('-id').values_list('id', 'changed_at').first()
+    if latest is None:
+        return "0", 0.0
+    return str(latest[0]), latest[1].timestamp()
+
+
+# ---- Change log -------------------------------------------------------------
+
+# Arbitrary key for the PostgreSQL advisory lock that orders change-log writes
+CHANGE_LOG_LOCK_KEY = 4711
+
+
+def record_reservation_changes(reservations: Iterable[Reservation], action: str) -> None:
+    """Append rows for the given reservations to the delta-sync change log.
+
+    The rows are written in the caller's transaction and also serve as the
+    calendar feed versions (get_feed_version). On PostgreSQL the
+    transaction also takes an advisory lock until it commits, so change ids
+    become visible in id order and a client that has read up to some id can
+    never miss a lower one committed later. SQLite already serializes writers.
+    """
+    changes = [
+        ReservationChange(
+            reservation_id=r.pk, action=action,
+            space_id=r.space_id, machine_id=r.machine_id, trainer_id=r.trainer_id, user_id=r.user_id,
+        )
+        for r in reservations
+    ]
+    if not changes:
+        return
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_xact_lock(%s)", [CHANGE_LOG_LOCK_KEY])
+        ReservationChange.objects.bulk_create(changes)
+
+
+def prune_reservation_changes(before) -> int:
+    """Delete change-log rows older than `before`; returns how many went.
+
+    Clients whose cursor predates the pruned rows are told to resync.
+    """
+    deleted, _ = ReservationChange.objects.filter(changed_at__lt=before).delete()
+    return deleted
+
+
+# ---- Opening calendar -------------------------------------------------------
+
+OPENING_CALENDAR_KEY = "cmr:opening-calendar"
+OPENING_CALENDAR_VERSION_KEY = "cmr:opening-calendar-version"
+# The calendar expires even without a Schedule change: only the saving process
+# republishes it, so with a per-process cache the other processes (and the
+# booking queue worker) recompile it at least this often
+OPENING_CALENDAR_TIMEOUT = 60
+WEEK_HOURS_KEY = "cmr:week-hours"
+# Week results are keyed by calendar version, so they need not outlive it
+WEEK_HOURS_TIMEOUT = OPENING_CALENDAR_TIMEOUT
+
+OpeningCalendar = Dict[date, Tuple[dtime, dtime]]
+# {date: (schedule_id, schedule_name)} for the same dates as the opening calendar
+ScheduleIndex = Dict[date, Tuple[int, str]]
+# (start_date, end_date) of each active schedule; hours are only enforced inside these
+CoveredSpans = Tuple[Tuple[date, date], ...]
+# Hours of a date no active schedule covers: bookable at any time, as with no schedule at all
+ALL_DAY = (dtime.min, dtime.max)
+
+# (version, calendar, schedule index, covered spans) compiled or fetched by
+# this process, reused until the version changes
+_opening_calendar: Tuple[Optional[str], OpeningCalendar, ScheduleIndex, CoveredSpans] = (None, {}, {}, ())
+
+
+def compile_opening_calendar() -> Tuple[OpeningCalendar, ScheduleIndex, CoveredSpans]:
+    """Resolve every open date of the active schedules, holidays removed.
+
+    Returns the opening calendar {date: (open_time, close_time)}, the
+    schedule index {date: (schedule_id, schedule_name)} naming the schedule
+    each date was resolved from, and the date spans the active schedules cover.
+    """
+    covered = tuple(
+        Schedule.objects.filter(is_active=True).order_by('start_date').values_list('start_date', 'end_date')
+    )
+    if not covered:
+        return {}, {}, ()
+    resolved = Schedule.get_date_schedules(min(start for start, _ in covered), max(end for _, end in covered))
+    calendar = {day: (schedule.open_time, schedule.close_time) for day, schedule in resolved.items()}
+    index = {day: (schedule.pk, schedule.name) for day, schedule in resolved.items()}
+    return calendar, index, covered
+
+
+def rebuild_opening_calendar() -> OpeningCalendar:
+    """Compile the opening calendar and publish it under a new version (run after Schedule changes)."""
+    global _opening_calendar
+    calendar, index, covered = compile_opening_calendar()
+    version = uuid.uuid4().hex
+    entry = (version, calendar, index, covered)
+    cache.set_many({OPENING_CALENDAR_VERSION_KEY: version, OPENING_CALENDAR_KEY: entry}, OPENING_CALENDAR_TIMEOUT)
+    _opening_calendar = entry
+    return calendar
+
+
+def _current_opening_calendar() -> Tuple[Optional[str], OpeningCalendar, ScheduleIndex, CoveredSpans]:
+    """The (version, calendar, schedule index, covered spans) entry, fetched or compiled only when the version changed."""
+    global _opening_calendar
+    version = cache.get(OPENING_CALENDAR_VERSION_KEY)
+    if version is not None:
+        if _opening_calendar[0] == version:
+            return _opening_calendar
+        entry = cache.get(OPENING_CALENDAR_KEY)
+        if entry is not None and entry[0] == version and len(entry) == 4:
+            _opening_calendar = entry
+            return entry
+    rebuild_opening_calendar()
+    return _opening_calendar
+
+
+def get_opening_hours_between(start: date, end: date) -> OpeningCalendar:
+    """Bookable hours {date: (open_time, close_time)} of every bookable date in [start, end].
+
+    Answered from the compiled calendar: each call reads only the small
+    version key from the cache, and the calendar is fetched or compiled again
+    only when a Schedule change published a new version or the version
+    expired (OPENING_CALENDAR_TIMEOUT). Dates inside an active schedule keep
+    its hours, with holidays and unlisted weekdays left out as closed. Dates
+    no active schedule covers are ALL_DAY, so bookings beyond the seeded
+    semesters are not refused.
+    """
+    _, calendar, _, covered = _current_opening_calendar()
+    hours = {}
+    day = start
+    while day <= end:
+        if day in calendar:
+            hours[day] = calendar[day]
+        elif not any(first <= day <= last for first, last in covered):
+            hours[day] = ALL_DAY
+        day += timedelta(days=1)
+    return hours
+
+
+def get_opening_hours_on(day: date) -> Optional[Tuple[dtime, dtime]]:
+    """Bookable hours of one date (see get_opening_hours_between()), or None when it is closed."""
+    return get_opening_hours_between(day, day).get(day)
+
+
+def resolve_opening_hours(start: date, end: date) -> List[dict]:
+    """Opening hours for every date in [start, end), open or closed, in date order.
+
+    Each day is a dict with 'date', 'open', 'open_time', 'close_time',
+    'all_day' and the 'schedule_id'/'schedule_name' it was resolved from (None
+    on closed days and on dates no active schedule covers). Dates are open or
+    closed exactly as get_opening_hours_between() books them, so uncovered
+    dates are open all day. Answered from the compiled calendar, so a whole
+    semester costs no query.
+    """
+    _, _, index, _ = _current_opening_calendar()
+    hours = get_opening_hours_between(start, end - timedelta(days=1)) if end > start else {}
+    days = []
+    day = start
+    while day < end:
+        opening = hours.get(day)
+        schedule_id, schedule_name = index.get(day, (None, None))
+        days.append({
+            'date': day,
+            'open': opening is not None,
+            'open_time': opening[0] if opening else None,
+            'close_time': opening[1] if opening else None,
+            'all_day': opening == ALL_DAY,
+            'schedule_id': schedule_id,
+            'schedule_name': schedule_name,
+        })
+        day += timedelta(days=1)
+    return days
+
+
+def get_week_hours(day: date) -> List[dict]:
+    """resolve_opening_hours() for the Monday-to-Sunday week containing `day`, cached per calendar version."""
+    version = _current_opening_calendar()[0]
+    monday = day - timedelta(days=day.weekday())
+    return cache.get_or_set(
+        f"{WEEK_HOURS_KEY}:{version}:{monday.isoformat()}",
+        lambda: resolve_opening_hours(monday, monday + timedelta(days=7)),
+        WEEK_HOURS_TIMEOUT,
+    )
+
+
+# ---- Machine catalog --------------------------------------------------------
+
+CATALOG_UPDATE_FIELDS = [
+    'category', 'about', 'specifications', 'machine_image', 'unit_count',
+    'unit_ids', 'locations', 'certification_ids', 'location_key',
+]
+
+
+def _catalog_entry(name: str, units: List[Machine]) -> MachineCatalogEntry:
+    """Summarize the units sharing a name (ordered by id) into one catalog row."""
+    first = units[0]
+    locations = sorted({unit.installed_in.location for unit in units if unit.installed_in})
+    certification_ids = sorted({course.pk for unit in units for course in unit.certifications_required.all()})
+    return MachineCatalogEntry(
+        name=name,
+        category=first.category,
+        about=first.about,
+        specifications=first.specifications,
+        machine_image=first.machine_image.name,
+        unit_count=len(units),
+        unit_ids=[unit.pk for unit in units],
+        locations=locations,
+        certification_ids=certification_ids,
+        location_key="".join(f"|{location}|" for location in locations),
+    )
+
+
+def refresh_machine_catalog(names: Iterable[str]) -> None:
+    """Rebuild the catalog rows for these machine names, dropping names no unit uses any more.
+
+    Called from the Machine/Space signals, so it runs inside the writing
+    transaction. Writes through QuerySet.update() send no signals; run
+    rebuild_machine_catalog (or the command of that name) after those.
+    """
+    names = {name for name in names if name}
+    if not names:
+        return
+
+    units_by_name = defaultdict(list)
+    units = (
+        Machine.objects.filter(name__in=names)
+        .select_related('installed_in')
+        .prefetch_related('certifications_required')
+        .order_by('id')
+    )
+    for unit in units:
+        units_by_name[unit.name].append(unit)
+
+    with transaction.atomic():
+        if units_by_name:
+            MachineCatalogEntry.objects.bulk_create(
+                [_catalog_entry(name, group) for name, group in units_by_name.items()],
+                update_conflicts=True,
+                unique_fields=['name'],
+                update_fields=CATALOG_UPDATE_FIELDS,
+            )
+        MachineCatalogEntry.objects.filter(name__in=names - units_by_name.keys()).delete()
+
+
+def rebuild_machine_catalog() -> int:
+    """Rebuild the whole machine catalog; returns the number of machine names in it."""
+    names = set(Machine.objects.values_list('name', flat=True))
+    refresh_machine_catalog(names | set(MachineCatalogEntry.objects.values_list('name', flat=True)))
+    return len(names)
+
+
+# ---- Trainer certificates ---------------------------------------------------
+
+def set_trainer_certificates(trainer: Trainer, categories: Iterable[str]) -> None:
+    """Make `categories` exactly the trainer's certificate categories, then reindex the trainer for search."""
+    categories = {category.strip() for category in categories if category and category.strip()}
+    with transaction.atomic():
+        trainer.certificates.exclude(category__in=categories).delete()
+        held = set(trainer.certificates.values_list('category', flat=True))
+        TrainerCertificate.objects.bulk_create(
+            [TrainerCertificate(trainer=trainer, category=category) for category in sorted(categories - held)]
+        )
+        index_object(trainer)
+
+
+# ---- Queued booking ---------------------------------------------------------
+
+def enqueue_booking_request(reservation: Reservation) -> BookingRequest:
+    """Queue an unsaved machine reservation instead of booking it right away.
+
+    Only a single INSERT hits the database; conflict and training checks run
+    later in the booking worker (see process_booking_requests).
+    """
+    return BookingRequest.objects.create(
+        machine=reservation.machine,
+        user=reservation.user,
+        reservation_title=reservation.reservation_title,
+        date=reservation.date,
+        start_time=reservation.start_time,
+        end_time=reservation.end_time,
+        notes=reservation.notes,
+    )
+
+
+def process_booking_requests(limit: int = 100) -> dict:
+    """Book up to `limit` queued requests in arrival order.
+
+    Each request is booked through book_reservation(), so it is checked for
+    conflicts and training exactly like a direct booking. On PostgreSQL the
+    batch is claimed with SKIP LOCKED so several workers can run side by side.
+    Every request runs in its own savepoint: one that errors unexpectedly is
+    marked 'failed' with the error and the rest of the batch still goes through.
+
+    Returns a dict with the number of requests 'booked', 'rejected' and 'failed'.
+    """
+    counts = {'booked': 0, 'rejected': 0, 'failed': 0}
+
+    with transaction.atomic():
+        queued = BookingRequest.objects.filter(status='queued').order_by('id')
+        if connection.features.has_select_for_update_skip_locked:
+            queued = queued.select_for_update(skip_locked=True, of=('self',))
+        batch = list(queued.select_related('machine__installed_in', 'user')[:limit])
+
+        for booking_request in batch:
+            reservation = Reservation(
+                machine=booking_request.machine,
+                user=booking_request.user,
+                reservation_title=booking_request.reservation_title,
+                date=booking_request.date,
+                start_time=booking_request.start_time,
+                end_time=booking_request.end_time,
+                notes=booking_request.notes,
+            )
+            try:
+                with transaction.atomic():
+                    book_reservation(reservation, linked_resource=booking_request.machine.installed_in)
+            except ValidationError as e:
+                booking_request.status = 'rejected'
+                booking_request.message = " ".join(e.messages)
+            except Exception as e:
+                logger.exception("Booking request %s failed", booking_request.pk)
+                booking_request.status = 'failed'
+                booking_request.message = f"Could not be booked: {e}"
+            else:
+                booking_request.status = 'booked'
+                booking_request.reservation = reservation
+            booking_request.processed_at = timezone.now()
+            booking_request.save(update_fields=['status', 'message', 'reservation', 'processed_at'])
+            counts[booking_request.status] += 1
+
+    return counts
+
+
+# ---- Archive ----------------------------------------------------------------
+
+def ensure_archive_partitions(dates: Iterable[date]) -> None:
+    """Create the yearly archive partitions covering `dates` (PostgreSQL only).
+
+    Other databases keep the archive in a single plain table.
+    """
+    if connection.vendor != 'postgresql':
+        return
+    table = ReservationArchive._meta.db_table
+    with connection.cursor() as cursor:
+        for year in sorted({d.year for d in dates}):
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {table}_y{year} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+            )
+
+
+# Set while archive_reservations() deletes the rows it has just copied; the
+# Reservation receivers in cmr.signals skip those deletes
+_archiving = ContextVar("cmr_archiving", default=False)
+
+
+def is_archiving() -> bool:
+    """Whether the reservations being deleted are moving to the archive rather than going away."""
+    return _archiving.get()
+
+
+def archive_reservations(before: date, batch_size: int = 1000) -> int:
+    """Move one batch of reservations dated before `before` into the archive.
+
+    The copy and the delete run in one transaction, so a row is never in both
+    tables or in neither. Linked space/machine pairs are always moved together.
+
+    The calendar feeds still show archived rows, so the delete sends no
+    per-row signal work: no change-log tombstones (the feed versions stay as
+    they are) and no live "deleted" events.
+
+    Returns the number of reservations archived; 0 means nothing is left to move.
+    """
+    past = Reservation.objects.in_window(end=before)
+    with transaction.atomic():
+        ids = list(past.order_by('starts_at', 'id').values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return 0
+
+        rows = list(
+            past.filter(Q(pk__in=ids) | Q(linked_reservation_id__in=ids))
+        )
+        ensure_archive_partitions(row.date for row in rows)
+        ReservationArchive.objects.bulk_create([
+            ReservationArchive(**{field: getattr(row, field) for field in ReservationArchive.COPIED_FIELDS})
+            for row in rows
+        ])
+        token = _archiving.set(True)
+        try:
+            Reservation.objects.filter(pk__in=[row.pk for row in rows]).delete()
+        finally:
+            _archiving.reset(token)
+
+        if any(row.trainer_id for row in rows):
+            invalidate_pending_count()
+
+    return len(rows)
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-18 03:37
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cmr', '0024_event_project'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='schedule',
+            name='is_active',
+            field=models.BooleanField(default=False, help_text='Whether this schedule is currently active (multiple schedules can be active)'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['space', 'date', 'start_time'], name='cmr_res_space_slot_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['machine', 'date', 'start_time'], name='cmr_res_machine_slot_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['trainer', 'date', 'start_time'], name='cmr_res_trainer_slot_idx'),
+        ),
+    ]
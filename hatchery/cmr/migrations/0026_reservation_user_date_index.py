@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-18 03:38
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cmr', '0025_reservation_resource_slot_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['user', 'date'], name='cmr_res_user_date_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.7 on 2026-10-18 03:41
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cmr', '0026_reservation_user_date_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReservationSeries',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reservation_title', models.CharField(max_length=120)),
+                ('notes', models.TextField(blank=True, null=True)),
+                ('start_date', models.DateField(help_text='Date of the first possible occurrence')),
+                ('end_date', models.DateField(help_text='Date of the last possible occurrence')),
+                ('start_time', models.TimeField()),
+                ('end_time', models.TimeField()),
+                ('days_of_week', models.CharField(help_text='Days the series repeats on (stored as comma-separated values: Mon,Tue,Wed,Thu,Fri,Sat,Sun)', max_length=50)),
+                ('interval', models.PositiveSmallIntegerField(choices=[(1, 'Every week'), (2, 'Every other week')], default=1, help_text='Repeat every week or every other week')),
+                ('exceptions', models.TextField(blank=True, help_text="Dates to skip in mm-dd-yr format, separated by semicolons (e.g., '10-14-25;11-25-25')", null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('machine', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='reservation_series', to='cmr.machine')),
+                ('space', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='reservation_series', to='cmr.space')),
+                ('trainer', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='reservation_series', to='cmr.trainer')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reservation_series', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'reservation series',
+                'ordering': ['-start_date'],
+            },
+        ),
+        migrations.AddField(
+            model_name='reservation',
+            name='series',
+            field=models.ForeignKey(blank=True, help_text='Recurring series this reservation was generated from', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='occurrences', to='cmr.reservationseries'),
+        ),
+    ]
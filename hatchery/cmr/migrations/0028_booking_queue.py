@@ -0,0 +1,43 @@
+# Generated by Django 5.2.7 on 2026-10-18 03:44
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cmr', '0027_reservationseries'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='machine',
+            name='queued_booking',
+            field=models.BooleanField(default=False, help_text='Queue reservation requests and book them in arrival order (for high-demand machines)'),
+        ),
+        migrations.CreateModel(
+            name='BookingRequest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reservation_title', models.CharField(max_length=120)),
+                ('date', models.DateField()),
+                ('start_time', models.TimeField()),
+                ('end_time', models.TimeField()),
+                ('notes', models.TextField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('booked', 'Booked'), ('rejected', 'Rejected')], default='queued', help_text='Queued until the booking worker processes the request', max_length=20)),
+                ('message', models.TextField(blank=True, help_text='Why the request was rejected, if it was')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('machine', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='booking_requests', to='cmr.machine')),
+                ('reservation', models.ForeignKey(blank=True, help_text='Reservation created for this request', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='booking_requests', to='cmr.reservation')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='booking_requests', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['status', 'id'], name='cmr_bookreq_queue_idx'), models.Index(fields=['machine', 'status', 'id'], name='cmr_bookreq_machine_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.7 on 2026-10-18 03:47
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def partition_archive_table(apps, schema_editor):
+    """On PostgreSQL, rebuild the (still empty) archive table as range partitioned by date.
+
+    Partitions are created per year by the archive_reservations command. The primary
+    key of a partitioned table has to include the partition column, so it becomes (id, date).
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    model = apps.get_model('cmr', 'ReservationArchive')
+    table = model._meta.db_table
+    schema_editor.execute(f'ALTER TABLE {table} RENAME TO {table}_unpartitioned')
+    schema_editor.execute(
+        f'CREATE TABLE {table} (LIKE {table}_unpartitioned INCLUDING DEFAULTS) PARTITION BY RANGE (date)'
+    )
+    schema_editor.execute(f'DROP TABLE {table}_unpartitioned')
+    schema_editor.execute(f'ALTER TABLE {table} ADD PRIMARY KEY (id, date)')
+    for index in model._meta.indexes:
+        schema_editor.add_index(model, index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cmr', '0028_booking_queue'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReservationArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('linked_reservation_id', models.BigIntegerField(blank=True, null=True)),
+                ('series_id', models.BigIntegerField(blank=True, null=True)),
+                ('reservation_title', models.CharField(max_length=120)),
+                ('date', models.DateField()),
+                ('start_time', models.TimeField()),
+                ('end_time', models.TimeField()),
+                ('notes', models.TextField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('approved', 'Approved'), ('rejected', 'Rejected')], default='approved', max_length=20)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('machine', models.ForeignKey(blank=True, db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='cmr.machine')),
+                ('space', models.ForeignKey(blank=True, db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='cmr.space')),
+                ('trainer', models.ForeignKey(blank=True, db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='cmr.trainer')),
+                ('user', models.ForeignKey(blank=True, db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-date', '-start_time'],
+                'indexes': [models.Index(fields=['date'], name='cmr_resarch_date_idx'), models.Index(fields=['space', 'date'], name='cmr_resarch_space_idx'), models.Index(fields=['machine', 'date'], name='cmr_resarch_machine_idx'), models.Index(fields=['trainer', 'date'], name='cmr_resarch_trainer_idx'), models.Index(fields=['user', 'date'], name='cmr_resarch_user_idx')],
+            },
+        ),
+        migrations.RunPython(partition_archive_table, migrations.RunPython.noop),
+    ]
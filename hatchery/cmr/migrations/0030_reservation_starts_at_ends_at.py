@@ -0,0 +1,62 @@
+from datetime import datetime
+
+from django.db import migrations, models, transaction
+from django.utils import timezone
+
+BACKFILL_CHUNK_SIZE = 2000
+
+
+def backfill_spans(apps, schema_editor):
+    """Fill starts_at/ends_at from date/start_time/end_time, one committed chunk at a time."""
+    tz = timezone.get_default_timezone()
+    for model_name in ('Reservation', 'ReservationArchive'):
+        model = apps.get_model('cmr', model_name)
+        last_id = 0
+        while True:
+            with transaction.atomic(using=schema_editor.connection.alias):
+                rows = list(
+                    model.objects.filter(pk__gt=last_id, starts_at__isnull=True)
+                    .order_by('pk')
+                    .only('date', 'start_time', 'end_time')[:BACKFILL_CHUNK_SIZE]
+                )
+                if not rows:
+                    break
+                for row in rows:
+                    row.starts_at = timezone.make_aware(datetime.combine(row.date, row.start_time), tz)
+                    row.ends_at = timezone.make_aware(datetime.combine(row.date, row.end_time), tz)
+                model.objects.bulk_update(rows, ['starts_at', 'ends_at'])
+            last_id = rows[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    # Each backfill chunk commits on its own so large tables are not locked for the whole run
+    atomic = False
+
+    dependencies = [
+        ('cmr', '0029_reservation_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reservation',
+            name='starts_at',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='reservation',
+            name='ends_at',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='reservationarchive',
+            name='starts_at',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.AddField(
+            model_name='reservationarchive',
+            name='ends_at',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.RunPython(backfill_spans, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,107 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cmr', '0030_reservation_starts_at_ends_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reservation',
+            name='starts_at',
+            field=models.DateTimeField(editable=False),
+        ),
+        migrations.AlterField(
+            model_name='reservation',
+            name='ends_at',
+            field=models.DateTimeField(editable=False),
+        ),
+        migrations.AlterField(
+            model_name='reservationarchive',
+            name='starts_at',
+            field=models.DateTimeField(),
+        ),
+        migrations.AlterField(
+            model_name='reservationarchive',
+            name='ends_at',
+            field=models.DateTimeField(),
+        ),
+        migrations.RemoveIndex(
+            model_name='reservation',
+            name='cmr_reserva_date_bb41da_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='reservation',
+            name='cmr_res_space_slot_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='reservation',
+            name='cmr_res_machine_slot_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='reservation',
+            name='cmr_res_trainer_slot_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='reservation',
+            name='cmr_res_user_date_idx',
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['starts_at', 'ends_at'], name='cmr_res_span_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['space', 'starts_at', 'ends_at'], name='cmr_res_space_span_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['machine', 'starts_at', 'ends_at'], name='cmr_res_machine_span_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['trainer', 'starts_at', 'ends_at'], name='cmr_res_trainer_span_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['user', 'starts_at'], name='cmr_res_user_span_idx'),
+        ),
+        migrations.AlterModelOptions(
+            name='reservationarchive',
+            options={'ordering': ['-starts_at']},
+        ),
+        migrations.RemoveIndex(
+            model_name='reservationarchive',
+            name='cmr_resarch_space_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='reservationarchive',
+            name='cmr_resarch_machine_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='reservationarchive',
+            name='cmr_resarch_trainer_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='reservationarchive',
+            name='cmr_resarch_user_idx',
+        ),
+        migrations.AddIndex(
+            model_name='reservationarchive',
+            index=models.Index(fields=['space', 'starts_at'], name='cmr_resarch_space_span_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservationarchive',
+            index=models.Index(fields=['machine', 'starts_at'], name='cmr_resarch_machine_span_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservationarchive',
+            index=models.Index(fields=['trainer', 'starts_at'], name='cmr_resarch_trainer_span_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservationarchive',
+            index=models.Index(fields=['user', 'starts_at'], name='cmr_resarch_user_span_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.7 on 2026-10-18 03:52
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cmr', '0031_reservation_span_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WaitlistEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reservation_title', models.CharField(max_length=120)),
+                ('date', models.DateField()),
+                ('start_time', models.TimeField()),
+                ('end_time', models.TimeField()),
+                ('notes', models.TextField(blank=True, null=True)),
+                ('starts_at', models.DateTimeField(editable=False)),
+                ('ends_at', models.DateTimeField(editable=False)),
+                ('status', models.CharField(choices=[('waiting', 'Waiting'), ('promoted', 'Promoted'), ('cancelled', 'Cancelled')], default='waiting', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('promoted_at', models.DateTimeField(blank=True, null=True)),
+                ('machine', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to='cmr.machine')),
+                ('reservation', models.ForeignKey(blank=True, help_text='Reservation the entry was promoted to', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='waitlist_entries', to='cmr.reservation')),
+                ('space', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to='cmr.space')),
+                ('trainer', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to='cmr.trainer')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'waitlist entries',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['space', 'status', 'starts_at'], name='cmr_waitlist_space_idx'), models.Index(fields=['machine', 'status', 'starts_at'], name='cmr_waitlist_machine_idx'), models.Index(fields=['trainer', 'status', 'starts_at'], name='cmr_waitlist_trainer_idx')],
+            },
+        ),
+    ]
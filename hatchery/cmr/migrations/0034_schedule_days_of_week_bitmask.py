@@ -0,0 +1,71 @@
+from django.db import migrations, models
+
+# Bit i of the mask is date.weekday() == i (Monday is bit 0)
+DAY_BITS = {
+    'Monday': 1, 'Mon': 1,
+    'Tuesday': 2, 'Tue': 2,
+    'Wednesday': 4, 'Wed': 4,
+    'Thursday': 8, 'Thu': 8,
+    'Friday': 16, 'Fri': 16,
+    'Saturday': 32, 'Sat': 32,
+    'Sunday': 64, 'Sun': 64,
+}
+DAY_ABBRS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+
+
+def backfill_days_mask(apps, schema_editor):
+    """Fold each comma-separated day list into its bitmask, ignoring unknown entries."""
+    Schedule = apps.get_model('cmr', 'Schedule')
+    schedules = list(Schedule.objects.only('days_of_week'))
+    for schedule in schedules:
+        schedule.days_mask = 0
+        for day in (schedule.days_of_week or '').split(','):
+            schedule.days_mask |= DAY_BITS.get(day.strip(), 0)
+    Schedule.objects.bulk_update(schedules, ['days_mask'])
+
+
+def restore_day_lists(apps, schema_editor):
+    Schedule = apps.get_model('cmr', 'Schedule')
+    schedules = list(Schedule.objects.only('days_mask'))
+    for schedule in schedules:
+        schedule.days_of_week = ','.join(abbr for i, abbr in enumerate(DAY_ABBRS) if schedule.days_mask & (1 << i))
+    Schedule.objects.bulk_update(schedules, ['days_of_week'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cmr', '0033_reservationchange'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='schedule',
+            name='days_mask',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_days_mask, restore_day_lists),
+        # Gives the old column a default, so reversing the removal can re-add it
+        migrations.AlterField(
+            model_name='schedule',
+            name='days_of_week',
+            field=models.CharField(blank=True, default='', max_length=50),
+        ),
+        migrations.RemoveField(
+            model_name='schedule',
+            name='days_of_week',
+        ),
+        migrations.RenameField(
+            model_name='schedule',
+            old_name='days_mask',
+            new_name='days_of_week',
+        ),
+        migrations.AlterField(
+            model_name='schedule',
+            name='days_of_week',
+            field=models.PositiveSmallIntegerField(
+                default=0,
+                help_text='Days this schedule applies to, as a bitmask of date.weekday() values (Monday = 1, Tuesday = 2, ... Sunday = 64)',
+            ),
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.7 on 2026-10-18 04:11
+
+from collections import defaultdict
+
+from django.db import migrations, models
+
+
+def populate_catalog(apps, schema_editor):
+    """Summarize existing machines by name (same rules as cmr.methods.refresh_machine_catalog)."""
+    Machine = apps.get_model('cmr', 'Machine')
+    MachineCatalogEntry = apps.get_model('cmr', 'MachineCatalogEntry')
+
+    units_by_name = defaultdict(list)
+    units = Machine.objects.select_related('installed_in').prefetch_related('certifications_required').order_by('id')
+    for unit in units:
+        units_by_name[unit.name].append(unit)
+
+    entries = []
+    for name, group in units_by_name.items():
+        first = group[0]
+        locations = sorted({unit.installed_in.location for unit in group if unit.installed_in})
+        entries.append(MachineCatalogEntry(
+            name=name,
+            category=first.category,
+            about=first.about,
+            specifications=first.specifications,
+            machine_image=first.machine_image.name,
+            unit_count=len(group),
+            unit_ids=[unit.pk for unit in group],
+            locations=locations,
+            certification_ids=sorted({course.pk for unit in group for course in unit.certifications_required.all()}),
+            search_text="\n".join(
+                [name] + [part for unit in group for part in (unit.custom_id, unit.specifications or "")]
+            ).lower(),
+            location_key="".join(f"|{location}|" for location in locations),
+        ))
+    MachineCatalogEntry.objects.bulk_create(entries)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cmr', '0034_schedule_days_of_week_bitmask'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MachineCatalogEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=130, unique=True)),
+                ('category', models.TextField(db_index=True)),
+                ('about', models.TextField(blank=True, null=True)),
+                ('specifications', models.TextField(blank=True, null=True)),
+                ('machine_image', models.ImageField(blank=True, null=True, upload_to='machines/')),
+                ('unit_count', models.PositiveIntegerField(default=0)),
+                ('unit_ids', models.JSONField(default=list)),
+                ('locations', models.JSONField(default=list)),
+                ('certification_ids', models.JSONField(default=list)),
+                ('search_text', models.TextField(blank=True, default='')),
+                ('location_key', models.TextField(blank=True, default='')),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.RunPython(populate_catalog, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,103 @@
+# Generated by Django 5.2.7 on 2026-10-18 04:13
+
+from django.db import migrations, models
+from django.urls import reverse
+
+FTS_TABLE = 'cmr_searchdocument_fts'
+
+
+def create_fulltext_index(apps, schema_editor):
+    """A weighted tsvector column with a GIN index on PostgreSQL, an FTS5 shadow table on SQLite."""
+    table = apps.get_model('cmr', 'SearchDocument')._meta.db_table
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            f"ALTER TABLE {table} ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+            f"setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            f"setweight(to_tsvector('english', coalesce(body, '')), 'B')) STORED"
+        )
+        schema_editor.execute(f'CREATE INDEX cmr_search_doc_vector_idx ON {table} USING GIN (search_vector)')
+    elif vendor == 'sqlite':
+        schema_editor.execute(f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(title, body, tokenize='unicode61')")
+
+
+def drop_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+def _text(*parts):
+    return ' '.join(str(part) for part in parts if part and part != 'None')
+
+
+def populate_documents(apps, schema_editor):
+    """Index existing machines, spaces and trainers (same documents as cmr.search builds)."""
+    SearchDocument = apps.get_model('cmr', 'SearchDocument')
+    Machine = apps.get_model('cmr', 'Machine')
+    Space = apps.get_model('cmr', 'Space')
+    Trainer = apps.get_model('cmr', 'Trainer')
+    space_types = dict(Space._meta.get_field('type').choices)
+
+    documents = [
+        SearchDocument(
+            kind='machine', object_id=machine.pk, title=machine.name,
+            summary=' · '.join(filter(None, [machine.category, machine.custom_id])),
+            url=reverse('machine-detail', kwargs={'custom_id': machine.custom_id}),
+            body=_text(machine.custom_id, machine.category, machine.about, machine.specifications),
+        )
+        for machine in Machine.objects.all()
+    ] + [
+        SearchDocument(
+            kind='space', object_id=space.pk, title=space.title,
+            summary=' · '.join(filter(None, [space.location, space.custom_id])),
+            url=reverse('space-detail', kwargs={'custom_id': space.custom_id}),
+            body=_text(space.custom_id, space.location, space_types.get(space.type, space.type), space.notes),
+        )
+        for space in Space.objects.all()
+    ] + [
+        SearchDocument(
+            kind='trainer', object_id=trainer.pk, title=trainer.name, summary=trainer.major or '',
+            url=reverse('trainer_detail', kwargs={'pk': trainer.pk}),
+            body=_text(trainer.custom_id, trainer.major, trainer.training_certificates),
+        )
+        for trainer in Trainer.objects.all()
+    ]
+    SearchDocument.objects.bulk_create(documents, batch_size=500)
+
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, title, body) '
+            f'SELECT id, title, body FROM {SearchDocument._meta.db_table}'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cmr', '0035_machinecatalogentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('machine', 'Machine'), ('space', 'Space'), ('trainer', 'Trainer')], max_length=10)),
+                ('object_id', models.BigIntegerField()),
+                ('title', models.CharField(max_length=200)),
+                ('summary', models.CharField(blank=True, default='', max_length=255)),
+                ('url', models.CharField(max_length=200)),
+                ('body', models.TextField(blank=True, default='')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id'), name='cmr_search_doc_object_uniq')],
+            },
+        ),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+        migrations.RunPython(populate_documents, migrations.RunPython.noop),
+        # Machine list text search now goes through the search index
+        migrations.RemoveField(
+            model_name='machinecatalogentry',
+            name='search_text',
+        ),
+    ]
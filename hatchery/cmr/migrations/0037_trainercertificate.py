@@ -0,0 +1,52 @@
+# Generated by Django 5.2.7 on 2026-10-18 04:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def split_certificates(apps, schema_editor):
+    """One certificate row per entry of each comma-separated training_certificates string."""
+    Trainer = apps.get_model('cmr', 'Trainer')
+    TrainerCertificate = apps.get_model('cmr', 'TrainerCertificate')
+    certificates = []
+    for trainer_id, value in Trainer.objects.exclude(training_certificates=None).values_list('id', 'training_certificates'):
+        categories = {category.strip() for category in value.split(',') if category.strip()}
+        certificates += [TrainerCertificate(trainer_id=trainer_id, category=category) for category in sorted(categories)]
+    TrainerCertificate.objects.bulk_create(certificates, batch_size=1000)
+
+
+def join_certificates(apps, schema_editor):
+    Trainer = apps.get_model('cmr', 'Trainer')
+    TrainerCertificate = apps.get_model('cmr', 'TrainerCertificate')
+    categories = {}
+    for trainer_id, category in TrainerCertificate.objects.order_by('category').values_list('trainer_id', 'category'):
+        categories.setdefault(trainer_id, []).append(category)
+    for trainer_id, names in categories.items():
+        Trainer.objects.filter(pk=trainer_id).update(training_certificates=', '.join(names))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cmr', '0036_searchdocument'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrainerCertificate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(max_length=100)),
+                ('trainer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='certificates', to='cmr.trainer')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['category', 'trainer'], name='cmr_trainer_cert_cat_idx')],
+                'constraints': [models.UniqueConstraint(fields=('trainer', 'category'), name='cmr_trainer_cert_uniq')],
+            },
+        ),
+        migrations.RunPython(split_certificates, join_certificates),
+        migrations.RemoveField(
+            model_name='trainer',
+            name='training_certificates',
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-18 04:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cmr', '0037_trainercertificate'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contact',
+            index=models.Index(fields=['order', 'name', 'id'], name='cmr_contact_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='helpticket',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='cmr_ticket_status_new_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trainer',
+            index=models.Index(fields=['name', 'id'], name='cmr_trainer_name_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-18 04:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cmr', '0038_list_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='bookingrequest',
+            name='message',
+            field=models.TextField(blank=True, help_text='Why the request was rejected or failed, if it was'),
+        ),
+        migrations.AlterField(
+            model_name='bookingrequest',
+            name='status',
+            field=models.CharField(choices=[('queued', 'Queued'), ('booked', 'Booked'), ('rejected', 'Rejected'), ('failed', 'Failed')], default='queued', help_text='Queued until the booking worker processes the request', max_length=20),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.7 on 2026-10-18 04:40
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+SCOPE_FIELDS = ['space_id', 'machine_id', 'trainer_id', 'user_id']
+
+
+def backfill_scopes(apps, schema_editor):
+    """Copy the resources and owner of each logged reservation that still exists (tombstones stay empty)."""
+    Reservation = apps.get_model('cmr', 'Reservation')
+    ReservationChange = apps.get_model('cmr', 'ReservationChange')
+    reservation = Reservation.objects.filter(pk=OuterRef('reservation_id'))
+    ReservationChange.objects.update(**{
+        field: Subquery(reservation.values(field)[:1]) for field in SCOPE_FIELDS
+    })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cmr', '0039_booking_request_failed_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reservationchange',
+            name='machine_id',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='reservationchange',
+            name='space_id',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='reservationchange',
+            name='trainer_id',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='reservationchange',
+            name='user_id',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='reservationchange',
+            index=models.Index(fields=['space_id', 'id'], name='cmr_res_change_space_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservationchange',
+            index=models.Index(fields=['machine_id', 'id'], name='cmr_res_change_machine_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservationchange',
+            index=models.Index(fields=['trainer_id', 'id'], name='cmr_res_change_trainer_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservationchange',
+            index=models.Index(fields=['user_id', 'id'], name='cmr_res_change_user_idx'),
+        ),
+        migrations.RunPython(backfill_scopes, migrations.RunPython.noop),
+    ]
@@ -1,11 +1,41 @@
-from django.db import models
+from datetime import datetime, timedelta
+
+from django.db import models, transaction
+from django.db.models import F, Q
 from django.urls import reverse
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 from django import forms
 from core import constants as const
-from pct.models import TrainingCourse, TrainingRecord
+from pct.models import TrainingCourse
+from pct.methods import get_completed_course_ids
+
+# Schedule day abbreviations indexed by date.weekday()
+WEEKDAY_ABBRS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+
+# Schedule/ReservationSeries.days_of_week bitmask: bit i is date.weekday() == i
+ALL_DAYS_MASK = 0b1111111
+WEEKDAYS_MASK = 0b0011111
+
+def mask_days(mask):
+    """Return the day abbreviations set in a weekday bitmask, Monday first."""
+    return [abbr for i, abbr in enumerate(WEEKDAY_ABBRS) if mask & (1 << i)]
+
+def parse_date_list(value):
+    """Return the set of dates in a semicolon-separated mm-dd-yy string, skipping bad entries."""
+    dates = set()
+    if not value:
+        return dates
+    for entry in value.split(';'):
+        entry = entry.strip()
+        if not entry:
+            continue
+        try:
+            dates.add(datetime.strptime(entry, '%m-%d-%y').date())
+        except ValueError:
+            continue
+    return dates
 
 class Space (models.Model):
     TYPE_CHOICES = [
@@ -100,6 +130,10 @@ class Machine (models.Model):
         blank=True,
         null=True,
     )
+    queued_booking = models.BooleanField(
+        default=False,
+        help_text="Queue reservation requests and book them in arrival order (for high-demand machines)"
+    )
     
     def __str__(self):
         return self.name
@@ -108,6 +142,59 @@ class Machine (models.Model):
         return reverse("machine-detail", kwargs={"custom_id": self.custom_id})
     
 
+class MachineCatalogEntry(models.Model):
+    """
+    One row per machine name, summarizing every unit that shares it, for the
+    machine list page. Kept up to date from Machine/Space signals (see
+    cmr.methods.refresh_machine_catalog); never edit it by hand.
+    """
+    name = models.CharField(max_length=130, unique=True)
+    # Shown fields come from the first unit (lowest id) with this name
+    category = models.TextField(db_index=True)
+    about = models.TextField(blank=True, null=True)
+    specifications = models.TextField(blank=True, null=True)
+    machine_image = models.ImageField(upload_to='machines/', blank=True, null=True)
+    unit_count = models.PositiveIntegerField(default=0)
+    unit_ids = models.JSONField(default=list)
+    locations = models.JSONField(default=list)
+    certification_ids = models.JSONField(default=list)
+    # Every unit's space location wrapped in '|' (e.g. '|2nd Floor: Hatch Front|'), for the location filter
+    location_key = models.TextField(blank=True, default="")
+
+    def __str__(self):
+        return self.name
+
+    class Meta:
+        ordering = ['name']
+
+class SearchDocument(models.Model):
+    """
+    Search index row for one machine, space or trainer, kept in sync by
+    signals (see cmr.search). The full-text index over title/body lives
+    outside the ORM: a generated tsvector column with a GIN index on
+    PostgreSQL, an FTS5 shadow table on SQLite.
+    """
+    KIND_CHOICES = [
+        ('machine', 'Machine'),
+        ('space', 'Space'),
+        ('trainer', 'Trainer'),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    title = models.CharField(max_length=200)
+    summary = models.CharField(max_length=255, blank=True, default="")
+    url = models.CharField(max_length=200)
+    body = models.TextField(blank=True, default="")
+
+    def __str__(self):
+        return f"{self.kind}: {self.title}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='cmr_search_doc_object_uniq'),
+        ]
+
 # class Location(models.Model):
 #   machine = models.ForeignKey(
 #      Machine,
@@ -123,7 +210,6 @@ class Trainer (models.Model):
     custom_id = models.CharField(max_length = 10, unique = True) #custom IDs of the form M-3D-01, where the second field indicates the machine type
     #the third field indicates the incremental id number
     major = models.TextField(max_length=200, blank=True)
-    training_certificates = models.TextField(blank=True, null=True)
     trainer_image = models.ImageField(
         upload_to='trainers/',
         blank=True,
@@ -143,12 +229,124 @@ class Trainer (models.Model):
         # Use the pk-based trainer_detail URL (matches config/urls.py)
         return reverse("trainer_detail", kwargs={"pk": self.pk})
 
+    def get_certificate_list(self):
+        """Return the categories this trainer holds certificates in (uses prefetched certificates)"""
+        return sorted(certificate.category for certificate in self.certificates.all())
+
+    def get_certificates_display(self):
+        """Return the certificate categories as 'Laser, Textiles'"""
+        return ", ".join(self.get_certificate_list())
+
+    class Meta:
+        indexes = [
+            # Keyset pagination of the trainer list
+            models.Index(fields=['name', 'id'], name='cmr_trainer_name_idx'),
+        ]
+
+class TrainerCertificate(models.Model):
+    """A training certificate held by a trainer, in one equipment category (e.g. 'Laser')."""
+    trainer = models.ForeignKey(
+        Trainer,
+        on_delete=models.CASCADE,
+        related_name="certificates"
+    )
+    category = models.CharField(max_length=100)
+
+    def __str__(self):
+        return f"{self.trainer}: {self.category}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['trainer', 'category'], name='cmr_trainer_cert_uniq'),
+        ]
+        indexes = [
+            # Trainers certified in a category (machine detail, trainer list filter)
+            models.Index(fields=['category', 'trainer'], name='cmr_trainer_cert_cat_idx'),
+        ]
+
+# Longest a single reservation can last. Overlap queries use it as the lower
+# bound of their starts_at range, so the index scan is bounded on both ends.
+MAX_RESERVATION_LENGTH = timedelta(days=1)
+
+def as_aware(value):
+    """Return an aware datetime for a date (local midnight) or a naive/aware datetime."""
+    if not isinstance(value, datetime):
+        value = datetime.combine(value, datetime.min.time())
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+def overlap_q(starts_at, ends_at):
+    """Q matching reservations whose [starts_at, ends_at) span overlaps the given one."""
+    starts_at, ends_at = as_aware(starts_at), as_aware(ends_at)
+    return Q(
+        starts_at__gt=starts_at - MAX_RESERVATION_LENGTH,
+        starts_at__lt=ends_at,
+        ends_at__gt=starts_at,
+    )
+
+def occupancy(spans):
+    """
+    Sweep over [start, end) spans and return (start, end, count) segments
+    giving how many spans are in progress at once, in time order. Segments
+    where nothing is in progress are left out.
+    """
+    events = []
+    for start, end in spans:
+        events.append((start, 1))
+        events.append((end, -1))
+    # At equal times ends sort first, so back-to-back spans do not stack
+    events.sort(key=lambda event: (event[0], event[1]))
+
+    segments = []
+    count = 0
+    previous = None
+    for time, delta in events:
+        if count and previous is not None and time > previous:
+            segments.append((previous, time, count))
+        count += delta
+        previous = time
+    return segments
+
+def peak_occupancy(spans, starts_at, ends_at):
+    """
+    Highest number of spans in progress at once within [starts_at, ends_at).
+    Returns (peak, segment) where segment is the (start, end) of the first
+    stretch at that peak, or (0, None) when nothing overlaps.
+    """
+    peak, segment = 0, None
+    for start, end, count in occupancy(spans):
+        if start < ends_at and end > starts_at and count > peak:
+            peak, segment = count, (max(start, starts_at), min(end, ends_at))
+    return peak, segment
+
+class ReservationQuerySet(models.QuerySet):
+    def active(self):
+        """Reservations that still hold their slot (rejected trainer bookings do not)."""
+        return self.exclude(status='rejected')
+
+    def overlapping(self, starts_at, ends_at):
+        """Reservations whose [starts_at, ends_at) span overlaps the given one."""
+        return self.filter(overlap_q(starts_at, ends_at))
+
+    def in_window(self, start=None, end=None):
+        """Reservations starting within [start, end); dates mean local midnight and either bound may be omitted."""
+        qs = self
+        if start:
+            qs = qs.filter(starts_at__gte=as_aware(start))
+        if end:
+            qs = qs.filter(starts_at__lt=as_aware(end))
+        return qs
+
 class Reservation (models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pending'),
         ('approved', 'Approved'),
         ('rejected', 'Rejected'),
     ]
+
+    # Resources a reservation can hold; each one is checked for double booking
+    RESOURCE_FIELDS = ('space', 'machine', 'trainer')
     
     space = models.ForeignKey(
         Space,
@@ -190,10 +388,23 @@ class Reservation (models.Model):
         related_name="reservations"
     )
 
+    series = models.ForeignKey(
+        "ReservationSeries",
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name="occurrences",
+        help_text="Recurring series this reservation was generated from"
+    )
+
     date = models.DateField()
     start_time = models.TimeField()
     end_time = models.TimeField()
     notes = models.TextField(blank=True, null=True)
+
+    # Timezone-aware span, filled from date/start_time/end_time (local time) by set_span()
+    starts_at = models.DateTimeField(editable=False)
+    ends_at = models.DateTimeField(editable=False)
     
     # Status field - only applies to trainer reservations
     status = models.CharField(
@@ -203,9 +414,16 @@ class Reservation (models.Model):
         help_text="Approval status for trainer reservations"
     )
 
+    objects = ReservationQuerySet.as_manager()
+
     class Meta:
         indexes = [
-            models.Index(fields=['date', 'start_time', 'end_time'])
+            models.Index(fields=['starts_at', 'ends_at'], name='cmr_res_span_idx'),
+            # Per-resource span indexes used by the overlap checks and calendar feeds
+            models.Index(fields=['space', 'starts_at', 'ends_at'], name='cmr_res_space_span_idx'),
+            models.Index(fields=['machine', 'starts_at', 'ends_at'], name='cmr_res_machine_span_idx'),
+            models.Index(fields=['trainer', 'starts_at', 'ends_at'], name='cmr_res_trainer_span_idx'),
+            models.Index(fields=['user', 'starts_at'], name='cmr_res_user_span_idx'),
         ]
 
     def __str__(self):
@@ -214,6 +432,59 @@ class Reservation (models.Model):
 
     def get_reservable_object(self):
         return self.space or self.machine or self.trainer
+
+    def check_conflicts(self):
+        """
+        Check if this reservation overlaps an existing booking of the same space,
+        machine or trainer. Runs one indexed range query per booked resource.
+        Spaces with a capacity above one only conflict once they are full for
+        part of the span (see space_is_full()).
+        Returns a list of conflicts, each with the resource field and the
+        earliest overlapping reservation; full spaces also carry 'full', the
+        (start, end) stretch with no seat left.
+        """
+        conflicts = []
+
+        # Rejected bookings never hold a slot, so they cannot conflict either
+        if self.status == 'rejected':
+            return conflicts
+
+        self.set_span()
+
+        for field in self.RESOURCE_FIELDS:
+            resource_id = getattr(self, f"{field}_id")
+            if resource_id is None:
+                continue
+
+            overlapping = (
+                Reservation.objects.active()
+                .filter(**{f"{field}_id": resource_id})
+                .overlapping(self.starts_at, self.ends_at)
+                .exclude(pk=self.pk)
+                .order_by('starts_at')
+            )
+            if field == 'space' and self.space.capacity > 1:
+                full = self.space_is_full(overlapping)
+                if full:
+                    clash = overlapping.filter(starts_at__lt=full[1], ends_at__gt=full[0]).first()
+                    conflicts.append({'resource': field, 'reservation': clash, 'full': full})
+                continue
+
+            clash = overlapping.first()
+            if clash:
+                conflicts.append({'resource': field, 'reservation': clash})
+
+        return conflicts
+
+    def space_is_full(self, overlapping):
+        """
+        Sweep the space bookings overlapping this one and return the (start, end)
+        stretch where they already fill every seat, or None if a seat is free
+        throughout. Reads only the span columns of the overlap query.
+        """
+        spans = overlapping.values_list('starts_at', 'ends_at')
+        peak, segment = peak_occupancy(spans, self.starts_at, self.ends_at)
+        return segment if peak >= self.space.capacity else None
     
     def clean(self):
         super().clean()
@@ -222,53 +493,658 @@ class Reservation (models.Model):
         if self.start_time >= self.end_time:
             raise ValidationError("End time must be after start time.")
 
+        self.check_opening_hours()
+
+        # ---------- CONFLICT VALIDATION ----------
+        conflicts = self.check_conflicts()
+        if conflicts:
+            raise ValidationError([self._conflict_message(conflict) for conflict in conflicts])
+
         # ---------- TRAINING VALIDATION ----------
+        self.check_training()
+
+    def check_opening_hours(self):
+        """
+        Raise ValidationError unless the slot lies within the opening hours of
+        its date, looked up in the compiled opening calendar (active schedules,
+        holidays removed). Hours are not enforced on dates no active schedule
+        covers.
+        """
+        from cmr.methods import get_opening_hours_on
+        day = self._meta.get_field('date').to_python(self.date)
+        start = self._meta.get_field('start_time').to_python(self.start_time)
+        end = self._meta.get_field('end_time').to_python(self.end_time)
+        hours = get_opening_hours_on(day)
+        if hours is None:
+            raise ValidationError(f"The Hatchery is closed on {day.strftime('%A, %B %d, %Y')}.")
+        if start < hours[0] or end > hours[1]:
+            raise ValidationError(
+                f"On {day} the Hatchery is open from {hours[0].strftime('%H:%M')} "
+                f"to {hours[1].strftime('%H:%M')}; please book within those hours."
+            )
+
+    def _conflict_message(self, conflict):
+        resource = getattr(self, conflict['resource'])
+        if conflict.get('full'):
+            start, end = (timezone.localtime(value) for value in conflict['full'])
+            return (
+                f"{resource} is full ({resource.capacity} people) on {start.date()} "
+                f"from {start.strftime('%H:%M')} to {end.strftime('%H:%M')}."
+            )
+        clash = conflict['reservation']
+        return (
+            f"{resource} is already booked on {clash.date} "
+            f"from {clash.start_time.strftime('%H:%M')} to {clash.end_time.strftime('%H:%M')}."
+        )
+
+    def check_training(self):
+        """
+        Raise ValidationError if the user lacks training required by the booked machine
+        (or the machine installed in the booked space). Completed courses come from the
+        per-person cache, so eligibility is a set difference in memory.
+        """
+        checks = []
         # If booking a machine:
         if self.machine:
-            required = self.machine.certifications_required.all()
+            checks.append((self.machine, None))
+        if self.space and self.space.current_machine:
+            checks.append((self.space.current_machine, self.space))
 
-            if required.exists():
+        completed = None
+        for machine, space in checks:
+            required = dict(machine.certifications_required.values_list("id", "name"))
+            if not required:
+                continue
+
+            if completed is None:
                 person = getattr(self.user, "person", None)
 
                 if not person:
                     raise ValidationError("Your user account is not linked to a Person record.")
 
-                user_trainings = TrainingRecord.objects.filter(person=person).values_list(
-                    "training_course_id", flat=True
-                )
+                completed = get_completed_course_ids(person)
 
-                missing = required.exclude(id__in=user_trainings)
+            missing = required.keys() - completed
 
-                if missing.exists():
-                    names = ", ".join(m.name for m in missing)
+            if missing:
+                names = ", ".join(sorted(required[course_id] for course_id in missing))
+                if space is None:
                     raise ValidationError(f"You do not have the required training to reserve this machine: {names}")
-        if self.space and self.space.current_machine:
-            machine = self.space.current_machine
-            required = machine.certifications_required.all()
+                raise ValidationError(
+                    f"You do not have the required training to reserve this space "
+                    f"(it includes machine {machine.name}). Missing: {names}"
+                )
 
-            if required.exists():
-                person = getattr(self.user, "person", None)
+    def _validation_state(self):
+        """Fields clean() depends on; save() skips re-validating when they are unchanged."""
+        return (
+            self.space_id, self.machine_id, self.trainer_id, self.user_id,
+            str(self.date), str(self.start_time), str(self.end_time), self.status,
+        )
+
+    def set_span(self):
+        """Fill starts_at/ends_at from date, start_time and end_time, read as local time."""
+        day = self._meta.get_field('date').to_python(self.date)
+        start = self._meta.get_field('start_time').to_python(self.start_time)
+        end = self._meta.get_field('end_time').to_python(self.end_time)
+        if day is None or start is None or end is None:
+            return
+        self.starts_at = timezone.make_aware(datetime.combine(day, start))
+        self.ends_at = timezone.make_aware(datetime.combine(day, end))
+
+    def full_clean(self, *args, **kwargs):
+        self.set_span()
+        super().full_clean(*args, **kwargs)
+        self._validated_state = self._validation_state()
 
-                if not person:
-                    raise ValidationError("Your user account is not linked to a Person record.")
+    def save(self, *args, **kwargs):
+        self.set_span()
+        # full_clean() already ran clean() on exactly these values
+        if getattr(self, "_validated_state", None) != self._validation_state():
+            self.clean()
+        super().save(*args, **kwargs)
+        self._validated_state = self._validation_state()
+
+class ReservationArchiveQuerySet(ReservationQuerySet):
+    def in_window(self, start=None, end=None):
+        qs = super().in_window(start, end)
+        # The archive is partitioned on date; bounding it as well lets PostgreSQL skip partitions
+        if start:
+            qs = qs.filter(date__gte=timezone.localtime(as_aware(start)).date())
+        if end:
+            qs = qs.filter(date__lte=timezone.localtime(as_aware(end)).date())
+        return qs
+
+# Past reservations moved out of the hot table by the archive_reservations command.
+# On PostgreSQL the table is range partitioned by year on `date`.
+class ReservationArchive(models.Model):
+    # Archived rows keep the id they had in the reservation table
+    id = models.BigIntegerField(primary_key=True)
+
+    # History outlives the resources and users it refers to, so these
+    # references carry no database constraint
+    space = models.ForeignKey(
+        Space,
+        null=True,
+        blank=True,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        related_name="+"
+    )
+    machine = models.ForeignKey(
+        Machine,
+        null=True,
+        blank=True,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        related_name="+"
+    )
+    trainer = models.ForeignKey(
+        Trainer,
+        null=True,
+        blank=True,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        related_name="+"
+    )
+    user = models.ForeignKey(
+        User,
+        null=True,
+        blank=True,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        related_name="+"
+    )
+    linked_reservation_id = models.BigIntegerField(null=True, blank=True)
+    series_id = models.BigIntegerField(null=True, blank=True)
 
-                user_trainings = TrainingRecord.objects.filter(person=person).values_list(
-                    "training_course_id", flat=True
-                )
+    reservation_title = models.CharField(max_length=120)
+    date = models.DateField()
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    notes = models.TextField(blank=True, null=True)
+    status = models.CharField(max_length=20, choices=Reservation.STATUS_CHOICES, default='approved')
+    starts_at = models.DateTimeField()
+    ends_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    # Same window helpers as the hot table, so feeds can read both alike
+    objects = ReservationArchiveQuerySet.as_manager()
+
+    # Columns copied from Reservation when a row is archived
+    COPIED_FIELDS = (
+        'id', 'space_id', 'machine_id', 'trainer_id', 'user_id', 'linked_reservation_id', 'series_id',
+        'reservation_title', 'date', 'start_time', 'end_time', 'notes', 'status', 'starts_at', 'ends_at',
+    )
+
+    class Meta:
+        ordering = ['-starts_at']
+        indexes = [
+            models.Index(fields=['date'], name='cmr_resarch_date_idx'),
+            models.Index(fields=['space', 'starts_at'], name='cmr_resarch_space_span_idx'),
+            models.Index(fields=['machine', 'starts_at'], name='cmr_resarch_machine_span_idx'),
+            models.Index(fields=['trainer', 'starts_at'], name='cmr_resarch_trainer_span_idx'),
+            models.Index(fields=['user', 'starts_at'], name='cmr_resarch_user_span_idx'),
+        ]
+
+    def __str__(self):
+        return f"Archived reservation {self.pk} on {self.date}"
+
+# Queued reservation request for machines in queued booking mode
+class BookingRequest(models.Model):
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('booked', 'Booked'),
+        ('rejected', 'Rejected'),
+        ('failed', 'Failed'),
+    ]
+
+    machine = models.ForeignKey(
+        Machine,
+        on_delete=models.CASCADE,
+        related_name="booking_requests"
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="booking_requests"
+    )
+    reservation_title = models.CharField(max_length=120)
+    date = models.DateField()
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    notes = models.TextField(blank=True, null=True)
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='queued',
+        help_text="Queued until the booking worker processes the request"
+    )
+    message = models.TextField(
+        blank=True,
+        help_text="Why the request was rejected or failed, if it was"
+    )
+    reservation = models.ForeignKey(
+        Reservation,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="booking_requests",
+        help_text="Reservation created for this request"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Booking request #{self.id} for {self.machine} ({self.status})"
+
+    def get_position(self):
+        """Number of queued requests for the same machine ahead of this one (0 = next)."""
+        if self.status != 'queued':
+            return None
+        return BookingRequest.objects.filter(
+            machine_id=self.machine_id, status='queued', id__lt=self.id
+        ).count()
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            # Worker scans queued requests in arrival order
+            models.Index(fields=['status', 'id'], name='cmr_bookreq_queue_idx'),
+            models.Index(fields=['machine', 'status', 'id'], name='cmr_bookreq_machine_idx'),
+        ]
+
+# A user waiting for a taken slot; promoted to a reservation when the slot frees up
+class WaitlistEntry(models.Model):
+    STATUS_CHOICES = [
+        ('waiting', 'Waiting'),
+        ('promoted', 'Promoted'),
+        ('cancelled', 'Cancelled'),
+    ]
+
+    space = models.ForeignKey(
+        Space,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name="waitlist_entries"
+    )
+    machine = models.ForeignKey(
+        Machine,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name="waitlist_entries"
+    )
+    trainer = models.ForeignKey(
+        Trainer,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name="waitlist_entries"
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="waitlist_entries"
+    )
+    reservation_title = models.CharField(max_length=120)
+    date = models.DateField()
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    notes = models.TextField(blank=True, null=True)
+    starts_at = models.DateTimeField(editable=False)
+    ends_at = models.DateTimeField(editable=False)
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='waiting'
+    )
+    reservation = models.ForeignKey(
+        Reservation,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="waitlist_entries",
+        help_text="Reservation the entry was promoted to"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    promoted_at = models.DateTimeField(null=True, blank=True)
 
-                missing = required.exclude(id__in=user_trainings)
+    def __str__(self):
+        return f"{self.user} waiting for {self.get_reservable_object()} on {self.date}"
 
-                if missing.exists():
-                    names = ", ".join(m.name for m in missing)
-                    raise ValidationError(
-                        f"You do not have the required training to reserve this space "
-                        f"(it includes machine {machine.name}). Missing: {names}"
-                    )
+    def get_reservable_object(self):
+        return self.space or self.machine or self.trainer
 
     def save(self, *args, **kwargs):
-        self.clean()
+        self.starts_at = timezone.make_aware(datetime.combine(self.date, self.start_time))
+        self.ends_at = timezone.make_aware(datetime.combine(self.date, self.end_time))
         super().save(*args, **kwargs)
 
+    def build_reservation(self):
+        """Unsaved reservation for this entry's slot, as the reserve views would create it."""
+        return Reservation(
+            space=self.space,
+            machine=self.machine,
+            trainer=self.trainer,
+            user=self.user,
+            reservation_title=self.reservation_title,
+            date=self.date,
+            start_time=self.start_time,
+            end_time=self.end_time,
+            notes=self.notes,
+            # Trainer bookings still need the trainer's approval
+            status='pending' if self.trainer_id else 'approved',
+        )
+
+    def get_linked_resource(self):
+        """Space or machine booked alongside this slot, mirroring the reserve views."""
+        if self.space:
+            return self.space.current_machine
+        if self.machine:
+            return self.machine.installed_in
+        return None
+
+    class Meta:
+        ordering = ['id']
+        verbose_name_plural = "waitlist entries"
+        indexes = [
+            # Promotion looks up waiting entries per resource around the freed span
+            models.Index(fields=['space', 'status', 'starts_at'], name='cmr_waitlist_space_idx'),
+            models.Index(fields=['machine', 'status', 'starts_at'], name='cmr_waitlist_machine_idx'),
+            models.Index(fields=['trainer', 'status', 'starts_at'], name='cmr_waitlist_trainer_idx'),
+        ]
+
+# Change log behind the reservation delta-sync endpoint: one row per write,
+# with deletions kept as tombstones. The id is the sync cursor.
+class ReservationChange(models.Model):
+    ACTION_CHOICES = [
+        ('created', 'Created'),
+        ('updated', 'Updated'),
+        ('deleted', 'Deleted'),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    # Plain columns rather than foreign keys: tombstones outlive their reservation
+    reservation_id = models.BigIntegerField()
+    # The reservation's resources and owner, so each calendar feed can read
+    # its version (its latest change) with one indexed lookup
+    space_id = models.BigIntegerField(null=True, blank=True)
+    machine_id = models.BigIntegerField(null=True, blank=True)
+    trainer_id = models.BigIntegerField(null=True, blank=True)
+    user_id = models.BigIntegerField(null=True, blank=True)
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"#{self.id}: reservation {self.reservation_id} {self.action}"
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            # Clients page through the log by id (the primary key); pruning goes by age
+            models.Index(fields=['changed_at'], name='cmr_res_change_time_idx'),
+            models.Index(fields=['space_id', 'id'], name='cmr_res_change_space_idx'),
+            models.Index(fields=['machine_id', 'id'], name='cmr_res_change_machine_idx'),
+            models.Index(fields=['trainer_id', 'id'], name='cmr_res_change_trainer_idx'),
+            models.Index(fields=['user_id', 'id'], name='cmr_res_change_user_idx'),
+        ]
+
+# Recurring reservation series (e.g. a classroom every Tue/Thu for a semester)
+class ReservationSeries(models.Model):
+    INTERVAL_CHOICES = [
+        (1, 'Every week'),
+        (2, 'Every other week'),
+    ]
+
+    space = models.ForeignKey(
+        Space,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name="reservation_series"
+    )
+    machine = models.ForeignKey(
+        Machine,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name="reservation_series"
+    )
+    trainer = models.ForeignKey(
+        Trainer,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name="reservation_series"
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="reservation_series"
+    )
+    reservation_title = models.CharField(max_length=120)
+    notes = models.TextField(blank=True, null=True)
+    start_date = models.DateField(
+        help_text="Date of the first possible occurrence"
+    )
+    end_date = models.DateField(
+        help_text="Date of the last possible occurrence"
+    )
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    days_of_week = models.PositiveSmallIntegerField(
+        default=0,
+        help_text="Days the series repeats on, as a bitmask of date.weekday() values (Monday = 1, Tuesday = 2, ... Sunday = 64)"
+    )
+    interval = models.PositiveSmallIntegerField(
+        choices=INTERVAL_CHOICES,
+        default=1,
+        help_text="Repeat every week or every other week"
+    )
+    exceptions = models.TextField(
+        blank=True,
+        null=True,
+        help_text="Dates to skip in mm-dd-yr format, separated by semicolons (e.g., '10-14-25;11-25-25')"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        target = self.space or self.machine or self.trainer
+        return f"{self.reservation_title} for {target} ({self.start_date} to {self.end_date})"
+
+    def clean(self):
+        super().clean()
+        if self.start_time and self.end_time and self.start_time >= self.end_time:
+            raise ValidationError("End time must be after start time.")
+        if self.start_date and self.end_date and self.start_date > self.end_date:
+            raise ValidationError("End date must be on or after start date.")
+        if not self.days_of_week & ALL_DAYS_MASK:
+            raise ValidationError("Select at least one day of the week.")
+
+    def get_days_display(self):
+        """Return the days this series repeats on as 'Mon, Tue, ...'"""
+        return ', '.join(mask_days(self.days_of_week))
+
+    def applies_on(self, day):
+        """Whether this series' days include the weekday of `day`"""
+        return bool(self.days_of_week & (1 << day.weekday()))
+
+    def get_occurrence_dates(self):
+        """
+        Expand the recurrence rule against the active schedules.
+        Returns (dates, skipped): the dates to book, and the dates the rule
+        produced that fall outside opening hours.
+        """
+        from cmr.methods import get_opening_hours_between
+        exceptions = parse_date_list(self.exceptions)
+        hours = get_opening_hours_between(self.start_date, self.end_date)
+
+        # Weeks are counted from the Monday of the first week of the series
+        first_monday = self.start_date - timedelta(days=self.start_date.weekday())
+
+        dates = []
+        skipped = []
+        day = self.start_date
+        while day <= self.end_date:
+            week = (day - first_monday).days // 7
+            if week % self.interval == 0 and self.applies_on(day) and day not in exceptions:
+                opening = hours.get(day)
+                if opening and opening[0] <= self.start_time and self.end_time <= opening[1]:
+                    dates.append(day)
+                else:
+                    skipped.append(day)
+            day += timedelta(days=1)
+        return dates, skipped
+
+    def build_occurrences(self, dates):
+        """Return unsaved Reservation rows for the given dates, plus linked machine rows for spaces."""
+        occurrences = [
+            Reservation(
+                space=self.space,
+                machine=self.machine,
+                trainer=self.trainer,
+                user=self.user,
+                series=self,
+                reservation_title=self.reservation_title,
+                notes=self.notes,
+                date=day,
+                start_time=self.start_time,
+                end_time=self.end_time,
+                status='pending' if self.trainer_id else 'approved',
+            )
+            for day in dates
+        ]
+
+        linked = []
+        if self.space and self.space.current_machine:
+            linked = [
+                Reservation(
+                    machine=self.space.current_machine,
+                    user=self.user,
+                    series=self,
+                    reservation_title=f"Linked to {self.reservation_title}",
+                    date=day,
+                    start_time=self.start_time,
+                    end_time=self.end_time,
+                )
+                for day in dates
+            ]
+        for reservation in occurrences + linked:
+            reservation.set_span()
+        return occurrences, linked
+
+    def find_conflicts(self, dates):
+        """
+        Check every occurrence date at once. Runs one query per booked resource
+        (including a space's installed machine) and returns {date: [reservation, ...]}.
+        """
+        resources = [
+            (field, getattr(self, f"{field}_id"))
+            for field in Reservation.RESOURCE_FIELDS
+            if getattr(self, f"{field}_id") is not None
+        ]
+        if self.space and self.space.current_machine_id:
+            resources.append(('machine', self.space.current_machine_id))
+
+        spans = Q()
+        for day in dates:
+            spans |= overlap_q(datetime.combine(day, self.start_time), datetime.combine(day, self.end_time))
+
+        conflicts = {}
+        for field, resource_id in resources:
+            clashes = (
+                Reservation.objects.active()
+                .filter(**{f"{field}_id": resource_id})
+                .filter(spans)
+                .select_related(field)
+                .order_by('starts_at')
+            )
+            if self.pk:
+                clashes = clashes.exclude(series=self)
+            if field == 'space' and self.space.capacity > 1:
+                self._add_full_days(dates, list(clashes), conflicts)
+                continue
+            for clash in clashes:
+                conflicts.setdefault(clash.date, []).append(clash)
+        return conflicts
+
+    def _add_full_days(self, dates, clashes, conflicts):
+        """Add the occurrence dates on which the series' shared space has no seat left."""
+        for day in dates:
+            starts_at = as_aware(datetime.combine(day, self.start_time))
+            ends_at = as_aware(datetime.combine(day, self.end_time))
+            day_clashes = [c for c in clashes if c.starts_at < ends_at and c.ends_at > starts_at]
+            peak, segment = peak_occupancy(
+                [(clash.starts_at, clash.ends_at) for clash in day_clashes], starts_at, ends_at
+            )
+            if peak >= self.space.capacity:
+                conflicts.setdefault(day, []).append(
+                    next(c for c in day_clashes if c.starts_at < segment[1] and c.ends_at > segment[0])
+                )
+
+    def create_occurrences(self):
+        """
+        Save the series and bulk-insert all of its occurrences in one transaction.
+        Raises ValidationError (and books nothing) if the rule yields no open
+        dates, the user lacks the required training, or any occurrence conflicts.
+        Returns (occurrences, skipped_dates).
+        """
+        self.full_clean()
+        dates, skipped = self.get_occurrence_dates()
+        if not dates:
+            raise ValidationError("This series has no occurrences during opening hours.")
+
+        occurrences, linked = self.build_occurrences(dates)
+
+        # Training depends only on the user and resource, so check it once
+        occurrences[0].check_training()
+
+        with transaction.atomic():
+            if self.pk is None:
+                self.save()
+            conflicts = self.find_conflicts(dates)
+            if conflicts:
+                raise ValidationError([
+                    f"{day}: {clash.get_reservable_object()} is already booked from "
+                    f"{clash.start_time.strftime('%H:%M')} to {clash.end_time.strftime('%H:%M')}."
+                    for day, clashes in sorted(conflicts.items())
+                    for clash in clashes
+                ])
+
+            for occurrence in occurrences:
+                occurrence.series = self
+            Reservation.objects.bulk_create(occurrences)
+
+            if linked:
+                for occurrence, linked_occurrence in zip(occurrences, linked):
+                    linked_occurrence.series = self
+                    linked_occurrence.linked_reservation = occurrence
+                Reservation.objects.bulk_create(linked)
+                for occurrence, linked_occurrence in zip(occurrences, linked):
+                    occurrence.linked_reservation = linked_occurrence
+                Reservation.objects.bulk_update(occurrences, ['linked_reservation'])
+
+            # bulk_create() sends no post_save signals, so fill the change log (which
+            # moves the feed versions), publish live events and refresh the pending count here
+            from cmr.live import publish_reservation_changes
+            from cmr.methods import invalidate_pending_count, record_reservation_changes
+            record_reservation_changes(occurrences + linked, 'created')
+            publish_reservation_changes(occurrences + linked, 'created')
+            if self.trainer_id:
+                invalidate_pending_count()
+
+        return occurrences, skipped
+
+    class Meta:
+        ordering = ['-start_date']
+        verbose_name_plural = 'reservation series'
+
 # Schedule model for defining operating schedules
 class Schedule(models.Model):
     name = models.CharField(
@@ -287,9 +1163,9 @@ class Schedule(models.Model):
     close_time = models.TimeField(
         help_text="Daily closing time"
     )
-    days_of_week = models.CharField(
-        max_length=50,
-        help_text="Days this schedule applies to (stored as comma-separated values: Mon,Tue,Wed,Thu,Fri,Sat,Sun)"
+    days_of_week = models.PositiveSmallIntegerField(
+        default=0,
+        help_text="Days this schedule applies to, as a bitmask of date.weekday() values (Monday = 1, Tuesday = 2, ... Sunday = 64)"
     )
     location = models.CharField(
         max_length=100,
@@ -311,73 +1187,89 @@ class Schedule(models.Model):
         return f"{self.name} ({self.start_date} to {self.end_date})"
 
     def get_days_set(self):
-        """Return a set of days this schedule applies to"""
-        if not self.days_of_week:
-            return set()
-        return set(day.strip() for day in self.days_of_week.split(','))
+        """Return the set of day abbreviations (Mon, Tue, etc.) this schedule applies to"""
+        return set(mask_days(self.days_of_week))
+
+    def get_days_display(self):
+        """Return the days this schedule applies to as 'Mon, Tue, ...'"""
+        return ', '.join(mask_days(self.days_of_week))
 
-    def get_normalized_days_set(self):
+    def applies_on(self, day):
+        """Whether this schedule's days include the weekday of `day`"""
+        return bool(self.days_of_week & (1 << day.weekday()))
+
+    def get_holiday_dates(self):
+        """Return the set of holiday dates, skipping entries not in mm-dd-yy format"""
+        return parse_date_list(self.holidays)
+
+    @staticmethod
+    def get_date_schedules(start_date, end_date):
+        """
+        Map each open date in [start_date, end_date] to the active schedule that
+        governs it, with holidays removed. Where active schedules overlap, the one
+        starting first wins. Dates no active schedule covers are left out.
         """
-        Return a set of normalized day abbreviations (Mon, Tue, etc.)
-        Handles both full names (Monday) and abbreviations (Mon)
+        schedules = Schedule.objects.filter(
+            is_active=True,
+            start_date__lte=end_date,
+            end_date__gte=start_date,
+        ).order_by('start_date', 'id')
+
+        resolved = {}
+        for schedule in schedules:
+            holidays = schedule.get_holiday_dates()
+            day = max(schedule.start_date, start_date)
+            last_day = min(schedule.end_date, end_date)
+            while day <= last_day:
+                if schedule.applies_on(day) and day not in holidays:
+                    resolved.setdefault(day, schedule)
+                day += timedelta(days=1)
+        return resolved
+
+    @staticmethod
+    def get_opening_hours(start_date, end_date):
         """
-        if not self.days_of_week:
-            return set()
-
-        # Map full names to abbreviations
-        day_map = {
-            'Monday': 'Mon', 'Mon': 'Mon',
-            'Tuesday': 'Tue', 'Tue': 'Tue',
-            'Wednesday': 'Wed', 'Wed': 'Wed',
-            'Thursday': 'Thu', 'Thu': 'Thu',
-            'Friday': 'Fri', 'Fri': 'Fri',
-            'Saturday': 'Sat', 'Sat': 'Sat',
-            'Sunday': 'Sun', 'Sun': 'Sun'
+        Map each open date in [start_date, end_date] to its (open_time, close_time),
+        using the active schedules with holidays removed. Dates no active schedule
+        covers are closed and left out of the mapping. Callers normally read the
+        compiled, cached result instead (cmr.methods.get_opening_hours_between).
+        """
+        return {
+            day: (schedule.open_time, schedule.close_time)
+            for day, schedule in Schedule.get_date_schedules(start_date, end_date).items()
         }
 
-        normalized_days = set()
-        for day in self.days_of_week.split(','):
-            day = day.strip()
-            if day in day_map:
-                normalized_days.add(day_map[day])
-
-        return normalized_days
-
     def check_conflicts_with_active_schedules(self):
         """
         Check if activating this schedule would conflict with currently active schedules.
         Returns a list of conflicting schedules with details about the conflicts.
-        """
-        conflicts = []
-
-        # Get all currently active schedules except this one
-        active_schedules = Schedule.objects.filter(is_active=True).exclude(id=self.id)
-
-        # Get the normalized days this schedule applies to
-        self_days = self.get_normalized_days_set()
-
-        for active_schedule in active_schedules:
-            # Get the normalized days the active schedule applies to
-            active_days = active_schedule.get_normalized_days_set()
-
-            # Find overlapping days
-            overlapping_days = self_days & active_days
-
-            if overlapping_days:
-                # Check if date ranges overlap
-                if not (self.end_date < active_schedule.start_date or
-                        self.start_date > active_schedule.end_date):
-                    # There's a conflict - same days and overlapping date ranges
-                    conflicts.append({
-                        'schedule': active_schedule,
-                        'overlapping_days': sorted(overlapping_days),
-                        'date_overlap': (
-                            max(self.start_date, active_schedule.start_date),
-                            min(self.end_date, active_schedule.end_date)
-                        )
-                    })
 
-        return conflicts
+        One query: active schedules sharing a day (bitwise AND of the day masks)
+        whose date range overlaps this one.
+        """
+        overlapping = Schedule.objects.filter(
+            is_active=True,
+            start_date__lte=self.end_date,
+            end_date__gte=self.start_date,
+        ).exclude(
+            id=self.id
+        ).annotate(
+            shared_days=F('days_of_week').bitand(self.days_of_week)
+        ).filter(
+            shared_days__gt=0
+        ).order_by('start_date', 'id')
+
+        return [
+            {
+                'schedule': active_schedule,
+                'overlapping_days': mask_days(active_schedule.shared_days),
+                'date_overlap': (
+                    max(self.start_date, active_schedule.start_date),
+                    min(self.end_date, active_schedule.end_date)
+                )
+            }
+            for active_schedule in overlapping
+        ]
 
     def set_as_active(self):
         """
@@ -403,7 +1295,7 @@ class Schedule(models.Model):
             raise ValueError('\n'.join(error_parts))
 
         self.is_active = True
-        self.save()
+        self.save(update_fields=['is_active'])
 
     def get_absolute_url(self):
         return reverse("schedule-detail", kwargs={"id": self.id})
@@ -480,6 +1372,10 @@ class HelpTicket(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination of the open ticket list, newest first
+            models.Index(fields=['status', '-created_at', '-id'], name='cmr_ticket_status_new_idx'),
+        ]
 
 # Contact model for staff directory
 class Contact(models.Model):
@@ -514,6 +1410,10 @@ class Contact(models.Model):
 
     class Meta:
         ordering = ['order', 'name']
+        indexes = [
+            # Keyset pagination of the contact list
+            models.Index(fields=['order', 'name', 'id'], name='cmr_contact_order_idx'),
+        ]
 
 # Project model for showcasing student projects
 class Project(models.Model):
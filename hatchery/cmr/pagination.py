@@ -0,0 +1,147 @@
+"""Keyset (cursor) pagination for the list pages and JSON feeds.
+
+A page is read with a WHERE on its ordering key instead of an OFFSET, so
+every page costs the same index range scan however deep it is. The
+ordering must be unique (end it with the primary key) and backed by an
+index, e.g. ('name', 'id') or ('-created_at', '-id').
+
+A cursor is the ordering key of the last row on a page, JSON encoded and
+base64url wrapped. Clients treat it as opaque and send it back as ?cursor=;
+?limit= picks the page size, up to the view's maximum.
+"""
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import datetime, time
+from functools import reduce
+from operator import or_
+from typing import Optional, Sequence
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+DEFAULT_PAGE_SIZE = 24
+MAX_PAGE_SIZE = 100
+
+
+class InvalidCursor(ValueError):
+    """The cursor was not produced by this ordering (tampered, truncated or stale)."""
+
+
+@dataclass
+class KeysetPage:
+    items: list
+    next_cursor: Optional[str] = None
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+
+def _cursor_value(value):
+    # DjangoJSONEncoder cuts datetimes to milliseconds, which would skip or
+    # repeat rows written within the same millisecond
+    if isinstance(value, (datetime, time)):
+        return value.isoformat()
+    return value
+
+
+def encode_cursor(values: Sequence) -> str:
+    payload = json.dumps([_cursor_value(value) for value in values], cls=DjangoJSONEncoder, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, length: int) -> list:
+    """Return the ordering key in a cursor, which must have `length` values."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, binascii.Error):
+        raise InvalidCursor("Malformed cursor.")
+    if not isinstance(values, list) or len(values) != length:
+        raise InvalidCursor("Malformed cursor.")
+    return values
+
+
+def page_size(request, default: int = DEFAULT_PAGE_SIZE, maximum: int = MAX_PAGE_SIZE) -> int:
+    """The ?limit= of a request clamped to [1, maximum]; `default` when missing or not a number."""
+    try:
+        size = int(request.GET.get("limit", default))
+    except ValueError:
+        size = default
+    return max(1, min(size, maximum))
+
+
+def row_key(row, ordering: Sequence[str]) -> list:
+    """The ordering key of a model instance or values() dict."""
+    names = [field.lstrip("-") for field in ordering]
+    if isinstance(row, dict):
+        return [row[name] for name in names]
+    return [getattr(row, name) for name in names]
+
+
+def after_key(ordering: Sequence[str], values: Sequence) -> Q:
+    """Condition selecting the rows strictly after `values` in `ordering`.
+
+    For ('name', 'id') that is name > v0 OR (name = v0 AND id > v1); a
+    descending field compares with < instead.
+    """
+    clauses = []
+    equal = Q()
+    for field, value in zip(ordering, values):
+        name = field.lstrip("-")
+        lookup = "lt" if field.startswith("-") else "gt"
+        clauses.append(equal & Q(**{f"{name}__{lookup}": value}))
+        equal &= Q(**{name: value})
+    return reduce(or_, clauses)
+
+
+def keyset_page(queryset, ordering: Sequence[str], cursor: Optional[str] = None, size: int = DEFAULT_PAGE_SIZE) -> KeysetPage:
+    """Read one page of `queryset` in `ordering`, starting after `cursor`.
+
+    One query fetches size + 1 rows; the extra row only tells whether a
+    next page exists. Raises InvalidCursor for a cursor this ordering
+    cannot use.
+    """
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        values = decode_cursor(cursor, len(ordering))
+        try:
+            queryset = queryset.filter(after_key(ordering, values))
+        except (TypeError, ValueError, ValidationError):
+            raise InvalidCursor("Malformed cursor.")
+
+    rows = list(queryset[:size + 1])
+    if len(rows) <= size:
+        return KeysetPage(rows)
+    rows = rows[:size]
+    return KeysetPage(rows, encode_cursor(row_key(rows[-1], ordering)))
+
+
+def page_url(request, cursor: Optional[str] = None) -> str:
+    """Query string for the same listing (filters kept) at `cursor`, or at its first page."""
+    params = request.GET.copy()
+    params.pop("cursor", None)
+    if cursor:
+        params["cursor"] = cursor
+    return f"?{params.urlencode()}" if params else "?"
+
+
+def page_context(request, page: KeysetPage) -> dict:
+    """Template context for templates/pagination.html."""
+    return {
+        "page": page,
+        "next_page_url": page_url(request, page.next_cursor) if page.has_next else None,
+        "first_page_url": page_url(request) if request.GET.get("cursor") else None,
+    }
+
+
+def add_next_link(response, request, cursor: Optional[str]):
+    """Point a JSON feed response at its next page (Link and X-Next-Cursor headers)."""
+    if cursor:
+        response.headers["Link"] = f'<{request.build_absolute_uri(request.path + page_url(request, cursor))}>; rel="next"'
+        response.headers["X-Next-Cursor"] = cursor
+    return response
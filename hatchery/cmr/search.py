@@ -0,0 +1,177 @@
+"""Full-text search over machines, spaces and trainers.
+
+Every machine, space and trainer has a SearchDocument row (title, summary,
+url and a body of searchable text), written by the signals in cmr.signals.
+The full-text index over it depends on the database:
+
+- PostgreSQL: a generated tsvector column, search_vector (title weighted
+  above body), with a GIN index. Queries use to_tsquery and rank with
+  ts_rank_cd.
+- SQLite: the FTS5 shadow table cmr_searchdocument_fts, keyed by document
+  id and written alongside each document. Queries use MATCH and rank with
+  bm25().
+- Other databases fall back to a case-insensitive scan of title and body.
+
+Every word of a query must match, as a prefix, so "las cut" finds
+"Laser Cutter".
+"""
+from __future__ import annotations
+
+import re
+from typing import Iterable, List, Optional
+
+from django.db import connection, transaction
+from django.db.models import FloatField, Q, Value
+from django.urls import reverse
+
+from cmr.models import Machine, SearchDocument, Space, Trainer
+
+FTS_TABLE = "cmr_searchdocument_fts"
+SEARCH_CONFIG = "english"
+# bm25() column weight of the title against the body (PostgreSQL uses weights A and B)
+TITLE_WEIGHT = 10.0
+
+SEARCH_KINDS = [kind for kind, _ in SearchDocument.KIND_CHOICES]
+
+
+def _text(*parts) -> str:
+    # Machine.about defaults to the string "None"
+    return " ".join(str(part) for part in parts if part and part != "None")
+
+
+def machine_document(machine: Machine) -> dict:
+    return {
+        "title": machine.name,
+        "summary": " · ".join(filter(None, [machine.category, machine.custom_id])),
+        "url": reverse("machine-detail", kwargs={"custom_id": machine.custom_id}),
+        "body": _text(machine.custom_id, machine.category, machine.about, machine.specifications),
+    }
+
+
+def space_document(space: Space) -> dict:
+    return {
+        "title": space.title,
+        "summary": " · ".join(filter(None, [space.location, space.custom_id])),
+        "url": reverse("space-detail", kwargs={"custom_id": space.custom_id}),
+        "body": _text(space.custom_id, space.location, space.get_type_display(), space.notes),
+    }
+
+
+def trainer_document(trainer: Trainer) -> dict:
+    return {
+        "title": trainer.name,
+        "summary": trainer.major or "",
+        "url": reverse("trainer_detail", kwargs={"pk": trainer.pk}),
+        "body": _text(trainer.custom_id, trainer.major, trainer.get_certificates_display()),
+    }
+
+
+DOCUMENT_BUILDERS = {
+    Machine: ("machine", machine_document),
+    Space: ("space", space_document),
+    Trainer: ("trainer", trainer_document),
+}
+
+# Related rows the builders read, prefetched when rebuilding the whole index
+DOCUMENT_PREFETCH = {
+    Trainer: ["certificates"],
+}
+
+
+def index_object(instance) -> None:
+    """Write the search document for a machine, space or trainer."""
+    kind, build = DOCUMENT_BUILDERS[type(instance)]
+    document, _ = SearchDocument.objects.update_or_create(
+        kind=kind, object_id=instance.pk, defaults=build(instance)
+    )
+    if connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [document.pk])
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, body) VALUES (%s, %s, %s)",
+                [document.pk, document.title, document.body],
+            )
+
+
+def unindex_object(instance) -> None:
+    """Remove the search document of a deleted machine, space or trainer."""
+    kind, _ = DOCUMENT_BUILDERS[type(instance)]
+    documents = SearchDocument.objects.filter(kind=kind, object_id=instance.pk)
+    if connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            for document_id in documents.values_list("id", flat=True):
+                cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [document_id])
+    documents.delete()
+
+
+def rebuild_search_index() -> int:
+    """Rebuild every search document from scratch; returns how many were written."""
+    documents = []
+    for model, (kind, build) in DOCUMENT_BUILDERS.items():
+        objects = model.objects.prefetch_related(*DOCUMENT_PREFETCH.get(model, []))
+        documents += [SearchDocument(kind=kind, object_id=obj.pk, **build(obj)) for obj in objects]
+
+    with transaction.atomic():
+        SearchDocument.objects.all().delete()
+        SearchDocument.objects.bulk_create(documents, batch_size=500)
+        if connection.vendor == "sqlite":
+            with connection.cursor() as cursor:
+                cursor.execute(f"DELETE FROM {FTS_TABLE}")
+                cursor.execute(
+                    f"INSERT INTO {FTS_TABLE} (rowid, title, body) "
+                    f"SELECT id, title, body FROM {SearchDocument._meta.db_table}"
+                )
+    return len(documents)
+
+
+def search(query: str, kinds: Optional[Iterable[str]] = None, limit: Optional[int] = 20) -> List[SearchDocument]:
+    """Documents matching every word of `query` (as a prefix), best match first.
+
+    Args:
+        query: Free text typed by the user
+        kinds: Restrict to these kinds ('machine', 'space', 'trainer'); all by default
+        limit: Most documents returned, or None for every match
+
+    Each returned document has a `score` attribute (higher is more relevant).
+    The body is not loaded.
+    """
+    terms = re.findall(r"\w+", query.lower())
+    kinds = list(kinds) if kinds else SEARCH_KINDS
+    if not terms or not kinds:
+        return []
+
+    table = SearchDocument._meta.db_table
+    kind_placeholders = ", ".join(["%s"] * len(kinds))
+    limit_sql = "LIMIT %s" if limit is not None else ""
+    limit_params = [limit] if limit is not None else []
+
+    if connection.vendor == "postgresql":
+        sql = (
+            f"SELECT id, kind, object_id, title, summary, url, ts_rank_cd(search_vector, query) AS score "
+            f"FROM {table}, to_tsquery(%s, %s) query "
+            f"WHERE search_vector @@ query AND kind IN ({kind_placeholders}) "
+            f"ORDER BY score DESC, id {limit_sql}"
+        )
+        params = [SEARCH_CONFIG, " & ".join(f"{term}:*" for term in terms), *kinds, *limit_params]
+    elif connection.vendor == "sqlite":
+        sql = (
+            f"SELECT d.id, d.kind, d.object_id, d.title, d.summary, d.url, "
+            f"-bm25({FTS_TABLE}, {TITLE_WEIGHT}, 1.0) AS score "
+            f"FROM {FTS_TABLE} JOIN {table} d ON d.id = {FTS_TABLE}.rowid "
+            f"WHERE {FTS_TABLE} MATCH %s AND d.kind IN ({kind_placeholders}) "
+            f"ORDER BY score DESC, d.id {limit_sql}"
+        )
+        params = [" ".join(f'"{term}"*' for term in terms), *kinds, *limit_params]
+    else:
+        documents = SearchDocument.objects.filter(kind__in=kinds).defer("body")
+        for term in terms:
+            documents = documents.filter(Q(title__icontains=term) | Q(body__icontains=term))
+        documents = documents.annotate(score=Value(0.0, output_field=FloatField())).order_by("title", "id")
+        return list(documents[:limit] if limit is not None else documents)
+
+    return list(SearchDocument.objects.raw(sql, params))
+
+
+def search_object_ids(kind: str, query: str) -> List[int]:
+    """IDs of every object of one kind matching `query`, best match first (for filtering list pages)."""
+    return [document.object_id for document in search(query, [kind], limit=None)]
@@ -0,0 +1,105 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_save, post_delete, pre_delete, pre_save
+from django.dispatch import receiver
+from cmr.models import Machine, Reservation, Schedule, Space, Trainer
+from cmr.methods import (
+    invalidate_pending_count,
+    is_archiving,
+    rebuild_machine_catalog,
+    rebuild_opening_calendar,
+    record_reservation_changes,
+    refresh_machine_catalog,
+)
+from pct.models import TrainingCourse
+from cmr.live import publish_reservation_change
+from cmr.search import index_object, unindex_object
+
+@receiver(post_save, sender=Reservation)
+@receiver(post_delete, sender=Reservation)
+def publish_reservation_event(sender, instance, created=False, **kwargs):
+    """Push the change to open calendars once it commits."""
+    if is_archiving():
+        return
+    if kwargs.get("signal") is post_delete:
+        action = "deleted"
+    else:
+        action = "created" if created else "updated"
+    publish_reservation_change(instance, action)
+
+@receiver(post_save, sender=Reservation)
+@receiver(post_delete, sender=Reservation)
+def log_reservation_change(sender, instance, created=False, **kwargs):
+    """Record the write in the delta-sync change log (deletions as tombstones), which also moves the feed versions."""
+    if is_archiving():
+        return
+    if kwargs.get("signal") is post_delete:
+        action = "deleted"
+    else:
+        action = "created" if created else "updated"
+    record_reservation_changes([instance], action)
+
+@receiver(post_save, sender=Reservation)
+@receiver(post_delete, sender=Reservation)
+def refresh_pending_count(sender, instance, **kwargs):
+    """Only trainer reservations go through approval, so only they move the pending count."""
+    if instance.trainer_id and not is_archiving():
+        invalidate_pending_count()
+
+@receiver(post_save, sender=Schedule)
+@receiver(post_delete, sender=Schedule)
+def refresh_opening_calendar(sender, instance, **kwargs):
+    """Recompile the opening calendar once the schedule change commits."""
+    transaction.on_commit(rebuild_opening_calendar)
+
+@receiver(pre_save, sender=Machine)
+def remember_machine_name(sender, instance, **kwargs):
+    """Note the name being saved over, so a rename also refreshes the old catalog row."""
+    instance._catalog_previous_name = (
+        Machine.objects.filter(pk=instance.pk).values_list("name", flat=True).first() if instance.pk else None
+    )
+
+@receiver(post_save, sender=Machine)
+@receiver(post_delete, sender=Machine)
+def refresh_machine_catalog_for_machine(sender, instance, **kwargs):
+    refresh_machine_catalog({instance.name, getattr(instance, "_catalog_previous_name", None)})
+
+@receiver(m2m_changed, sender=Machine.certifications_required.through)
+def refresh_machine_catalog_for_certifications(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        refresh_machine_catalog({instance.name})
+    elif pk_set:
+        refresh_machine_catalog(Machine.objects.filter(pk__in=pk_set).values_list("name", flat=True))
+    else:
+        # A course cleared from every machine: which ones is no longer known
+        rebuild_machine_catalog()
+
+@receiver(post_save, sender=Space)
+def refresh_machine_catalog_for_space(sender, instance, **kwargs):
+    """The space's location is listed on the catalog rows of the machines installed in it."""
+    refresh_machine_catalog(instance.machines_installed_here.values_list("name", flat=True))
+
+@receiver(pre_delete, sender=Space)
+@receiver(pre_delete, sender=TrainingCourse)
+def remember_catalog_names(sender, instance, **kwargs):
+    """Note the machine names a space or course appears under before the delete unlinks them."""
+    related = instance.machines_installed_here if sender is Space else instance.machines_requiring
+    instance._catalog_names = set(related.values_list("name", flat=True))
+
+@receiver(post_delete, sender=Space)
+@receiver(post_delete, sender=TrainingCourse)
+def refresh_machine_catalog_after_delete(sender, instance, **kwargs):
+    refresh_machine_catalog(getattr(instance, "_catalog_names", ()))
+
+@receiver(post_save, sender=Machine)
+@receiver(post_save, sender=Space)
+@receiver(post_save, sender=Trainer)
+def update_search_index(sender, instance, **kwargs):
+    index_object(instance)
+
+@receiver(post_delete, sender=Machine)
+@receiver(post_delete, sender=Space)
+@receiver(post_delete, sender=Trainer)
+def remove_from_search_index(sender, instance, **kwargs):
+    unindex_object(instance)
@@ -1,3 +1,526 @@
-from django.test import TestCase
+from datetime import date, datetime, time, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from cmr import methods
+from cmr.methods import (
+    ALL_DAY,
+    archive_reservations,
+    enqueue_booking_request,
+    get_opening_hours_on,
+    process_booking_requests,
+    prune_reservation_changes,
+    resolve_opening_hours,
+)
+from cmr.models import (
+    ALL_DAYS_MASK,
+    WEEKDAYS_MASK,
+    BookingRequest,
+    Machine,
+    Reservation,
+    ReservationChange,
+    ReservationSeries,
+    Schedule,
+    Space,
+    as_aware,
+    peak_occupancy,
+)
+from cmr.pagination import InvalidCursor, decode_cursor, encode_cursor, keyset_page
+from cmr.views import FEED_ORDERING
+
+# A Monday. Only OpeningHoursTests activates a schedule (9:00-17:00 on weekdays
+# that month); everywhere else no schedule covers it, so it is bookable all day
+DAY = date(2031, 3, 3)
+
+
+def make_space(custom_id="SP-2-01", capacity=1):
+    return Space.objects.create(
+        title="Workbench",
+        custom_id=custom_id,
+        capacity=capacity,
+        location="2nd Floor: Hatch Front",
+        floor=2,
+        type="station",
+    )
+
+
+def make_machine(custom_id="M-3D-01", name="Prusa Mini"):
+    return Machine.objects.create(name=name, custom_id=custom_id, category="3D Printer")
+
+
+def book(user, start, end, day=DAY, **resource):
+    """Save a reservation of `resource` from `start` to `end` (hours, or times) on `day`."""
+    if isinstance(start, int):
+        start = time(start)
+    if isinstance(end, int):
+        end = time(end)
+    return Reservation.objects.create(
+        user=user,
+        reservation_title="Test booking",
+        date=day,
+        start_time=start,
+        end_time=end,
+        **resource,
+    )
+
+
+class ReservationTestCase(TestCase):
+    """Cached state (opening calendar, feed and count caches) outlives the test transaction, so start each test clean."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("maker", "maker@example.com", "password")
+
+
+class ReservationOverlapTests(ReservationTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.machine = make_machine()
+        self.existing = book(self.user, 10, 12, machine=self.machine)
+
+    def test_back_to_back_bookings_are_accepted(self):
+        before = book(self.user, 8, 10, machine=self.machine)
+        after = book(self.user, 12, 13, machine=self.machine)
+        self.assertEqual(before.ends_at, self.existing.starts_at)
+        self.assertEqual(after.starts_at, self.existing.ends_at)
+
+    def test_overlap_at_either_edge_is_rejected(self):
+        spans = {
+            "across the start": (9, time(10, 30)),
+            "across the end": (time(11, 30), 13),
+            "inside": (time(10, 30), 11),
+            "around": (9, 13),
+            "same span": (10, 12),
+            "one minute in": (time(11, 59), 13),
+        }
+        for label, (start, end) in spans.items():
+            with self.subTest(label), self.assertRaisesMessage(ValidationError, "already booked"):
+                book(self.user, start, end, machine=self.machine)
+        self.assertEqual(Reservation.objects.count(), 1)
+
+    def test_other_resources_and_days_stay_free(self):
+        book(self.user, 10, 12, machine=make_machine("M-3D-02"))
+        book(self.user, 10, 12, day=DAY + timedelta(days=1), machine=self.machine)
+        book(self.user, 10, 12, space=make_space())
+
+    def test_single_seat_space_rejects_overlap(self):
+        space = make_space()
+        book(self.user, 10, 12, space=space)
+        with self.assertRaisesMessage(ValidationError, "already booked"):
+            book(self.user, 11, 13, space=space)
+
+    def test_rejected_reservations_hold_no_slot(self):
+        Reservation.objects.filter(pk=self.existing.pk).update(status="rejected")
+        book(self.user, 10, 12, machine=self.machine)
+
+    def test_editing_a_reservation_does_not_conflict_with_itself(self):
+        self.existing.end_time = time(12, 30)
+        self.existing.save()
+        self.existing.refresh_from_db()
+        self.assertEqual(self.existing.ends_at - self.existing.starts_at, timedelta(hours=2, minutes=30))
+
+
+class SpaceCapacityTests(ReservationTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.space = make_space(capacity=2)
+
+    def test_space_takes_bookings_up_to_its_capacity(self):
+        book(self.user, 10, 12, space=self.space)
+        book(self.user, 10, 12, space=self.space)
+        with self.assertRaisesMessage(ValidationError, "is full (2 people)"):
+            book(self.user, 11, 13, space=self.space)
+        book(self.user, 12, 13, space=self.space)
+
+    def test_only_simultaneous_bookings_count_against_capacity(self):
+        # Three bookings overlap the new one, but never more than one at once
+        book(self.user, 9, time(10, 30), space=self.space)
+        book(self.user, time(10, 30), 12, space=self.space)
+        book(self.user, 12, 13, space=self.space)
+        book(self.user, time(9, 30), time(12, 30), space=self.space)
+        with self.assertRaisesMessage(ValidationError, "from 09:30 to 10:00"):
+            book(self.user, 9, 10, space=self.space)
+
+    def test_peak_occupancy_does_not_stack_back_to_back_spans(self):
+        at = lambda hour: as_aware(DAY) + timedelta(hours=hour)
+        spans = [(at(9), at(10)), (at(10), at(11)), (at(10), at(12))]
+        self.assertEqual(peak_occupancy(spans, at(9), at(12)), (2, (at(10), at(11))))
+        self.assertEqual(peak_occupancy(spans, at(11), at(12)), (1, (at(11), at(12))))
+        self.assertEqual(peak_occupancy(spans, at(12), at(13)), (0, None))
+
+    def test_space_feed_reports_remaining_seats(self):
+        first = book(self.user, 10, 12, space=self.space)
+        second = book(self.user, 11, 13, space=self.space)
+        alone = book(self.user, 14, 15, space=self.space)
+        response = self.client.get(
+            reverse("space-reservations-json", args=[self.space.custom_id]),
+            {"start": DAY.isoformat(), "end": (DAY + timedelta(days=1)).isoformat()},
+        )
+        seats = {row["id"]: row["remaining_seats"] for row in response.json()}
+        self.assertEqual(seats, {first.pk: 0, second.pk: 0, alone.pk: 1})
+
+
+class OpeningHoursTests(ReservationTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.machine = make_machine()
+        # Schedule changes recompile the opening calendar once they commit
+        with self.captureOnCommitCallbacks(execute=True):
+            self.schedule = Schedule.objects.create(
+                name="Spring 2031",
+                start_date=date(2031, 3, 1),
+                end_date=date(2031, 3, 31),
+                open_time=time(9),
+                close_time=time(17),
+                days_of_week=WEEKDAYS_MASK,
+                holidays="03-05-31",
+                is_active=True,
+            )
+
+    def test_booking_within_opening_hours_is_accepted(self):
+        book(self.user, 9, 17, machine=self.machine)
+
+    def test_booking_outside_opening_hours_is_rejected(self):
+        for start, end in [(8, 10), (16, 18)]:
+            with self.subTest(start=start), self.assertRaisesMessage(ValidationError, "open from 09:00 to 17:00"):
+                book(self.user, start, end, machine=self.machine)
+
+    def test_holidays_and_unlisted_weekdays_are_closed(self):
+        for day in [date(2031, 3, 5), date(2031, 3, 8)]:
+            with self.subTest(day=day), self.assertRaisesMessage(ValidationError, "closed on"):
+                book(self.user, 10, 11, day=day, machine=self.machine)
+
+    def test_dates_no_schedule_covers_are_open_all_day(self):
+        book(self.user, 6, 23, day=date(2031, 4, 7), machine=self.machine)
+        self.assertEqual(get_opening_hours_on(date(2031, 4, 7)), ALL_DAY)
+
+    def test_schedule_change_recompiles_the_calendar(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.schedule.is_active = False
+            self.schedule.save()
+        book(self.user, 6, 23, day=date(2031, 3, 8), machine=self.machine)
+
+    def test_resolved_hours_match_booking(self):
+        days = {day["date"]: day for day in resolve_opening_hours(date(2031, 3, 31), date(2031, 4, 2))}
+        self.assertEqual(
+            (days[date(2031, 3, 31)]["open_time"], days[date(2031, 3, 31)]["schedule_name"]),
+            (time(9), "Spring 2031"),
+        )
+        self.assertTrue(days[date(2031, 4, 1)]["all_day"])
+        self.assertIsNone(days[date(2031, 4, 1)]["schedule_id"])
+
+    def test_hours_json_reports_closed_and_all_day_dates(self):
+        response = self.client.get(reverse("opening-hours-json"), {"start": "2031-03-05", "end": "2031-04-02"})
+        days = {day["date"]: day for day in response.json()["days"]}
+        self.assertFalse(days["2031-03-05"]["open"])
+        self.assertEqual((days["2031-03-06"]["open_time"], days["2031-03-06"]["all_day"]), ("09:00", False))
+        self.assertEqual((days["2031-04-01"]["open_time"], days["2031-04-01"]["all_day"]), ("00:00", True))
+
+
+class FeedVersionTests(ReservationTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.space = make_space()
+        self.url = reverse("space-reservations-json", args=[self.space.custom_id])
+
+    def revalidate(self, etag):
+        return self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_unchanged_feed_is_answered_with_304(self):
+        book(self.user, 10, 11, space=self.space)
+        etag = self.client.get(self.url)["ETag"]
+        with self.assertNumQueries(1):
+            response = self.revalidate(etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_write_to_the_feed_returns_200_with_a_new_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+        reservation = book(self.user, 10, 11, space=self.space)
+        response = self.revalidate(etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual([row["id"] for row in response.json()], [reservation.pk])
+
+        etag = response["ETag"]
+        self.assertEqual(self.revalidate(etag).status_code, 304)
+        reservation.delete()
+        response = self.revalidate(etag)
+        self.assertEqual((response.status_code, response.json()), (200, []))
+
+    def test_write_to_another_resource_keeps_the_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+        book(self.user, 10, 11, space=make_space("SP-2-02"))
+        book(self.user, 10, 11, machine=make_machine())
+        self.assertEqual(self.revalidate(etag).status_code, 304)
+
+
+class ChangeLogTests(ReservationTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.machine = make_machine()
+        self.url = reverse("reservation-changes-json")
+
+    def changes(self, **params):
+        return self.client.get(self.url, params).json()
+
+    def test_snapshot_then_since_cursor_returns_only_new_changes(self):
+        kept = book(self.user, 9, 10, machine=self.machine)
+        snapshot = self.changes()
+        self.assertTrue(snapshot["snapshot"])
+        self.assertEqual([row["id"] for row in snapshot["changes"]], [kept.pk])
+
+        added = book(self.user, 10, 11, machine=self.machine)
+        delta = self.changes(since=snapshot["cursor"])
+        self.assertEqual([row["id"] for row in delta["changes"]], [added.pk])
+        self.assertEqual((delta["deleted"], delta["has_more"]), ([], False))
+        self.assertGreater(delta["cursor"], snapshot["cursor"])
+
+        idle = self.changes(since=delta["cursor"])
+        self.assertEqual((idle["changes"], idle["cursor"]), ([], delta["cursor"]))
+
+    def test_latest_action_per_reservation_wins(self):
+        cursor = self.changes()["cursor"]
+        gone = book(self.user, 9, 10, machine=self.machine)
+        gone.end_time = time(10, 30)
+        gone.save()
+        gone_id = gone.pk
+        gone.delete()
+        delta = self.changes(since=cursor)
+        self.assertEqual((delta["changes"], delta["deleted"]), ([], [gone_id]))
+
+    def test_has_more_pages_through_the_log(self):
+        cursor = self.changes()["cursor"]
+        first = book(self.user, 9, 10, machine=self.machine)
+        second = book(self.user, 10, 11, machine=self.machine)
+        page = self.changes(since=cursor, limit=1)
+        self.assertEqual(([row["id"] for row in page["changes"]], page["has_more"]), ([first.pk], True))
+        page = self.changes(since=page["cursor"], limit=1)
+        self.assertEqual(([row["id"] for row in page["changes"]], page["has_more"]), ([second.pk], False))
+
+    def test_cursor_older_than_the_log_gets_410(self):
+        cursor = self.changes()["cursor"]
+        old = book(self.user, 9, 10, machine=self.machine)
+        book(self.user, 10, 11, machine=self.machine)
+        ReservationChange.objects.filter(reservation_id=old.pk).update(
+            changed_at=timezone.now() - timedelta(days=60)
+        )
+        self.assertEqual(prune_reservation_changes(timezone.now() - timedelta(days=30)), 1)
+        self.assertEqual(self.client.get(self.url, {"since": cursor}).status_code, 410)
+        self.assertEqual(self.client.get(self.url, {"since": "soon"}).status_code, 400)
+
+    def test_archiving_writes_no_tombstones(self):
+        book(self.user, 9, 10, machine=self.machine)
+        cursor = self.changes()["cursor"]
+        self.assertEqual(archive_reservations(DAY + timedelta(days=1)), 1)
+        delta = self.changes(since=cursor)
+        self.assertEqual((delta["changes"], delta["deleted"], delta["cursor"]), ([], [], cursor))
+
+
+class KeysetPaginationTests(ReservationTestCase):
+
+    def walk(self, queryset, size):
+        """Ids of every row, read keyset page by keyset page in the feed ordering."""
+        ids, cursor = [], None
+        while True:
+            page = keyset_page(queryset, FEED_ORDERING, cursor, size)
+            ids += [row.pk for row in page.items]
+            if not page.has_next:
+                return ids
+            cursor = page.next_cursor
+
+    def test_cursor_keeps_microseconds(self):
+        moment = timezone.make_aware(datetime(2031, 3, 3, 10, 0, 0, 123456))
+        self.assertEqual(decode_cursor(encode_cursor([moment, 7]), 2), [moment.isoformat(), 7])
+
+    def test_malformed_cursors_are_rejected(self):
+        for cursor in ["not base64 json!", encode_cursor([1]), encode_cursor({"id": 1})]:
+            with self.subTest(cursor=cursor), self.assertRaises(InvalidCursor):
+                decode_cursor(cursor, 2)
+
+    def test_pages_visit_every_row_once_across_ties(self):
+        machines = [make_machine(f"M-3D-0{n}") for n in range(4)]
+        # Same start on three machines, and starts within the same millisecond
+        rows = [book(self.user, 10, 11, machine=machine) for machine in machines[:3]]
+        rows += [
+            book(self.user, time(12, 0, 0, 100), 13, machine=machines[3]),
+            book(self.user, time(13, 0, 0, 200), 14, machine=machines[3]),
+            book(self.user, time(14, 0, 0, 300), 15, machine=machines[3]),
+        ]
+        for size in (1, 2, 4):
+            with self.subTest(size=size):
+                self.assertEqual(self.walk(Reservation.objects.all(), size), [row.pk for row in rows])
+
+
+class CalendarFeedPagingTests(ReservationTestCase):
+    """Feeds whose window reaches into the past merge archived and live rows."""
+
+    PAST = date(2020, 3, 2)
+
+    def setUp(self):
+        super().setUp()
+        self.space = make_space(capacity=2)
+        self.url = reverse("space-reservations-json", args=[self.space.custom_id])
+        self.window = {"start": self.PAST.isoformat(), "end": (self.PAST + timedelta(days=2)).isoformat()}
+        self.archived = [book(self.user, 10, 12, day=self.PAST, space=self.space)]
+        self.live = [
+            book(self.user, 10, 12, day=self.PAST + timedelta(days=1), space=self.space),
+            book(self.user, 11, 13, day=self.PAST + timedelta(days=1), space=self.space),
+        ]
+        archive_reservations(self.PAST + timedelta(days=1))
+
+    def test_whole_window_merges_archive_and_live_rows(self):
+        rows = self.client.get(self.url, self.window).json()
+        self.assertEqual(sorted(row["id"] for row in rows), [row.pk for row in self.archived + self.live])
+
+    def test_paged_feed_follows_the_cursor_across_both_tables(self):
+        ids, seats, params = [], [], dict(self.window, limit=1)
+        while True:
+            response = self.client.get(self.url, params)
+            ids += [row["id"] for row in response.json()]
+            seats += [row["remaining_seats"] for row in response.json()]
+            if "X-Next-Cursor" not in response:
+                break
+            params["cursor"] = response["X-Next-Cursor"]
+        self.assertEqual(ids, [row.pk for row in self.archived + self.live])
+        # Seats are counted over the whole window, not just the page
+        self.assertEqual(seats, [1, 0, 0])
+
+    def test_bad_cursor_gets_400(self):
+        response = self.client.get(self.url, dict(self.window, cursor="garbage"))
+        self.assertEqual(response.status_code, 400)
+
+
+class DaysOfWeekBitmaskTests(ReservationTestCase):
+
+    def schedule(self, name, days, active=True):
+        return Schedule.objects.create(
+            name=name,
+            start_date=date(2031, 3, 1),
+            end_date=date(2031, 3, 31),
+            open_time=time(9),
+            close_time=time(17),
+            days_of_week=days,
+            is_active=active,
+        )
+
+    def test_schedule_days_read_from_the_mask(self):
+        schedule = self.schedule("Weekdays", WEEKDAYS_MASK)
+        self.assertEqual(schedule.get_days_display(), "Mon, Tue, Wed, Thu, Fri")
+        self.assertTrue(schedule.applies_on(DAY))
+        self.assertFalse(schedule.applies_on(date(2031, 3, 8)))
+
+    def test_conflicts_need_a_shared_day(self):
+        self.schedule("Weekdays", WEEKDAYS_MASK)
+        weekend = self.schedule("Weekend", ALL_DAYS_MASK & ~WEEKDAYS_MASK, active=False)
+        friday = self.schedule("Late Friday", 0b0010000, active=False)
+        self.assertEqual(weekend.check_conflicts_with_active_schedules(), [])
+        conflicts = friday.check_conflicts_with_active_schedules()
+        self.assertEqual([conflict["overlapping_days"] for conflict in conflicts], [["Fri"]])
+
+    def test_series_books_only_its_days(self):
+        series = ReservationSeries(
+            machine=make_machine(),
+            user=self.user,
+            reservation_title="Tuesday and Thursday prints",
+            start_date=DAY,
+            end_date=DAY + timedelta(days=13),
+            start_time=time(10),
+            end_time=time(11),
+            days_of_week=0b0001010,
+        )
+        occurrences, skipped = series.create_occurrences()
+        self.assertEqual(
+            [occurrence.date for occurrence in occurrences],
+            [date(2031, 3, 4), date(2031, 3, 6), date(2031, 3, 11), date(2031, 3, 13)],
+        )
+        self.assertEqual((skipped, series.get_days_display()), ([], "Tue, Thu"))
+
+
+class DaysOfWeekMigrationTests(TransactionTestCase):
+    """The bitmask migrations fold the old comma-separated day lists into masks."""
+
+    def migrate(self, target):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate([("cmr", target)])
+        return executor.loader.project_state([("cmr", target)]).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_schedule_day_lists_become_masks(self):
+        apps = self.migrate("0033_reservationchange")
+        OldSchedule = apps.get_model("cmr", "Schedule")
+        for name, days in [("weekdays", "Mon,Tue,Wed,Thu,Fri"), ("full names", "Saturday, Sunday"), ("typo", "Mon,Fryday")]:
+            OldSchedule.objects.create(
+                name=name, start_date=DAY, end_date=DAY, open_time=time(9), close_time=time(17), days_of_week=days,
+            )
+
+        apps = self.migrate("0034_schedule_days_of_week_bitmask")
+        masks = dict(apps.get_model("cmr", "Schedule").objects.values_list("name", "days_of_week"))
+        self.assertEqual(masks, {"weekdays": WEEKDAYS_MASK, "full names": 0b1100000, "typo": 0b0000001})
+
+    def test_series_day_lists_become_masks(self):
+        apps = self.migrate("0040_reservation_change_feed_scopes")
+        user = apps.get_model("auth", "User").objects.create(username="maker")
+        apps.get_model("cmr", "ReservationSeries").objects.create(
+            user_id=user.pk, reservation_title="Prints", start_date=DAY, end_date=DAY,
+            start_time=time(10), end_time=time(11), days_of_week="Tue,Thu",
+        )
+
+        apps = self.migrate("0041_reservationseries_days_of_week_bitmask")
+        series = apps.get_model("cmr", "ReservationSeries").objects.get()
+        self.assertEqual(series.days_of_week, 0b0001010)
+
+
+class BookingQueueTests(ReservationTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.machine = make_machine()
+        self.requests = [
+            enqueue_booking_request(Reservation(
+                machine=self.machine, user=self.user, reservation_title=f"Request {n}",
+                date=DAY, start_time=time(10), end_time=time(11),
+            ))
+            for n in range(2)
+        ]
+
+    def test_requests_are_booked_in_arrival_order(self):
+        self.assertEqual(process_booking_requests(), {"booked": 1, "rejected": 1, "failed": 0})
+        first, second = (BookingRequest.objects.get(pk=request.pk) for request in self.requests)
+        self.assertEqual((first.status, first.reservation.reservation_title), ("booked", "Request 0"))
+        self.assertEqual(second.status, "rejected")
+        self.assertIn("already booked", second.message)
+
+    def test_unexpected_error_fails_only_its_request(self):
+        book = methods.book_reservation
+
+        def book_or_fail(reservation, **kwargs):
+            book(reservation, **kwargs)
+            if reservation.reservation_title == "Request 0":
+                raise RuntimeError("printer offline")
+
+        with mock.patch.object(methods, "book_reservation", side_effect=book_or_fail), \
+                self.assertLogs("cmr.methods", "ERROR"):
+            self.assertEqual(process_booking_requests(), {"booked": 1, "rejected": 0, "failed": 1})
+        first, second = (BookingRequest.objects.get(pk=request.pk) for request in self.requests)
+        self.assertEqual((first.status, first.message), ("failed", "Could not be booked: printer offline"))
+        # The failed request's booking was rolled back with its savepoint
+        self.assertEqual(second.status, "booked")
+        self.assertEqual(list(Reservation.objects.values_list("reservation_title", flat=True)), ["Request 1"])
@@ -3,21 +3,47 @@ from django.contrib import messages
 from django.core.exceptions import ValidationError
 
 from collections import defaultdict
-from django.db.models import Q, Min
+from django.db.models import Q
+
+from django.http import Http404, JsonResponse, HttpResponse, StreamingHttpResponse
+
+from django.core.handlers.asgi import ASGIRequest
 
-from django.http import Http404, JsonResponse
+import asyncio
 
 from django.db.models import Q
 
 from django.shortcuts import render, get_object_or_404, redirect
 
-from datetime import timedelta
+from django.urls import reverse
+
+from datetime import datetime, timedelta
 
 from django.utils import timezone
 
-from .models import Space, Machine, Reservation, Schedule, Trainer
+from django.utils.dateparse import parse_date, parse_datetime
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+
+from django.utils.http import http_date, quote_etag
+
+from functools import wraps
+
+from bisect import bisect_left, bisect_right
+
+from .models import Space, Machine, MachineCatalogEntry, Reservation, ReservationArchive, ReservationChange, BookingRequest, Schedule, Trainer, WaitlistEntry, occupancy
+
+from .forms import SpaceForm,MachineForm, ExistingMachineForm, ReservationForm, ReservationSeriesForm, ScheduleForm,TrainerForm,TrainerFilterForm
+
+from core.methods import find_free_slots, machines_available
 
-from .forms import SpaceForm,MachineForm, ExistingMachineForm, ReservationForm, ScheduleForm,TrainerForm,TrainerFilterForm
+from .methods import book_any_unit, book_reservation, cancel_reservation, enqueue_booking_request, get_feed_version, get_opening_hours_on, get_week_hours, resolve_opening_hours, set_reservation_status
+
+from .live import calendar_time, get_broker
+
+from .search import SEARCH_KINDS, search, search_object_ids
+
+from .pagination import InvalidCursor, KeysetPage, add_next_link, after_key, decode_cursor, encode_cursor, keyset_page, page_context, page_size, row_key
 
 import json
 
@@ -27,6 +53,222 @@ from django.http import HttpResponseForbidden
 
 # Create your views here.
 
+def _parse_calendar_date(value):
+    """Parse a FullCalendar start/end parameter (ISO date or datetime) into a date."""
+    if not value:
+        return None
+    try:
+        parsed = parse_datetime(value)
+        if parsed is not None:
+            return parsed.date()
+        return parse_date(value[:10])
+    except ValueError:
+        return None
+
+def _calendar_window(request):
+    """Return the [start, end) dates of the calendar view requesting a feed."""
+    return (
+        _parse_calendar_date(request.GET.get("start")),
+        _parse_calendar_date(request.GET.get("end")),
+    )
+
+def _versioned_feed(scope, key_func):
+    """Serve a reservation feed with an ETag/Last-Modified taken from its version (latest change).
+
+    A matching If-None-Match or If-Modified-Since is answered with 304 before
+    the view runs, so unchanged calendars cost one indexed change-log lookup
+    and no reservation query. The version is read before the feed is built: a change
+    that lands in between only makes the next request fetch again.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            token, modified = get_feed_version(scope, key_func(request, **kwargs))
+            etag = quote_etag(f"{scope}-{token}")
+            last_modified = int(modified)
+
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = view(request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                response.headers["ETag"] = etag
+                response.headers["Last-Modified"] = http_date(last_modified)
+                # Browsers must revalidate every time instead of guessing freshness
+                patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return wrapped
+    return decorator
+
+# Keyset orderings of the paginated list pages; each is unique and backed by an index
+SPACE_LIST_ORDERING = ("custom_id",)
+MACHINE_LIST_ORDERING = ("name",)
+TRAINER_LIST_ORDERING = ("name", "id")
+HELP_TICKET_LIST_ORDERING = ("-created_at", "-id")
+CONTACT_LIST_ORDERING = ("order", "name", "id")
+
+def _list_page(request, queryset, ordering):
+    """One keyset page of a list view (?cursor=, ?limit=); a bad cursor shows the first page."""
+    size = page_size(request)
+    try:
+        return keyset_page(queryset, ordering, request.GET.get("cursor"), size)
+    except InvalidCursor:
+        return keyset_page(queryset, ordering, None, size)
+
+def _add_remaining_seats(rows, capacity, spans=None):
+    """Set 'remaining_seats' on each row: the capacity minus the peak occupancy during its slot.
+
+    Occupancy is counted over ``spans`` ((starts_at, ends_at) pairs of every
+    booking in the window), or over the rows themselves when they are the
+    whole window. One sweep builds the occupancy segments; each row then
+    bisects to the segments it spans.
+    """
+    if spans is None:
+        spans = [(row["starts_at"], row["ends_at"]) for row in rows]
+    segments = occupancy(spans)
+    starts = [segment[0] for segment in segments]
+    ends = [segment[1] for segment in segments]
+    for row in rows:
+        spanned = segments[bisect_right(ends, row["starts_at"]):bisect_left(starts, row["ends_at"])]
+        row["remaining_seats"] = max(capacity - max((count for _, _, count in spanned), default=0), 0)
+
+# Calendar feeds return their whole window unless the client asks for pages
+# (?cursor= or ?limit=); pages follow (starts_at, id), at most FEED_PAGE_SIZE rows each
+FEED_ORDERING = ("starts_at", "id")
+FEED_PAGE_SIZE = 1000
+
+def _feed_page_size(request):
+    """Rows per page for a feed request that opted into paging, or None for the whole window."""
+    if "cursor" not in request.GET and "limit" not in request.GET:
+        return None
+    return page_size(request, FEED_PAGE_SIZE, FEED_PAGE_SIZE)
+
+def _calendar_rows(request, build, *fields, capacity=None):
+    """Return feed rows for the calendar's visible window, each with ISO 'start' and 'end'.
+
+    ``build`` narrows a reservation manager to the feed's reservations. Windows
+    that reach into the past also read the reservation archive, so history stays
+    visible after old bookings leave the reservation table. Given a space
+    ``capacity``, rows also carry the seats left during their slot, counted
+    over the whole window. ``fields`` must include "id".
+
+    The whole window comes back as one page unless the request pages it:
+    then rows come in FEED_ORDERING, ?limit= (at most FEED_PAGE_SIZE) at a
+    time, starting after ?cursor=. Raises InvalidCursor for a cursor it
+    cannot use.
+    """
+    start, end = _calendar_window(request)
+    size = _feed_page_size(request)
+    cursor = request.GET.get("cursor")
+    fields += ("starts_at", "ends_at")
+
+    sources = [build(Reservation.objects).in_window(start, end)]
+    if start is None or start < timezone.localdate():
+        sources.append(build(ReservationArchive.objects).in_window(start, end))
+
+    if size is None:
+        rows = [row for objects in sources for row in objects.values(*fields)]
+        spans = None
+    else:
+        rows = []
+        try:
+            after = after_key(FEED_ORDERING, decode_cursor(cursor, len(FEED_ORDERING))) if cursor else Q()
+            for objects in sources:
+                # Each table is read up to one row past the page; the merge keeps the first ones
+                rows += objects.filter(after).order_by(*FEED_ORDERING).values(*fields)[:size + 1]
+        except (TypeError, ValueError, ValidationError):
+            raise InvalidCursor("Malformed cursor.")
+        rows.sort(key=lambda row: row_key(row, FEED_ORDERING))
+        spans = (
+            [span for objects in sources for span in objects.values_list("starts_at", "ends_at")]
+            if capacity is not None else None
+        )
+
+    next_cursor = None
+    if size is not None and len(rows) > size:
+        rows = rows[:size]
+        next_cursor = encode_cursor(row_key(rows[-1], FEED_ORDERING))
+
+    if capacity is not None:
+        _add_remaining_seats(rows, capacity, spans)
+    for row in rows:
+        row["start"] = calendar_time(row.pop("starts_at"))
+        row["end"] = calendar_time(row.pop("ends_at"))
+    return KeysetPage(rows, next_cursor)
+
+def _calendar_feed(request, build, *fields, capacity=None):
+    """JSON response for _calendar_rows().
+
+    The body stays a plain event array, as calendar event sources expect; a
+    paged request finds the next page in the Link and X-Next-Cursor headers.
+    """
+    try:
+        page = _calendar_rows(request, build, *fields, capacity=capacity)
+    except InvalidCursor as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+    return add_next_link(JsonResponse(page.items, safe=False), request, page.next_cursor)
+
+def _report_promotions(request, promoted):
+    """Tell the person cancelling that their slot went to someone on the waitlist."""
+    if promoted:
+        messages.info(request, "The freed slot was given to the next person on the waitlist.")
+
+def _join_waitlist(request, response, **resource):
+    """Put the current user on the waitlist for a taken slot of the given space, machine or trainer."""
+    if not request.user.is_authenticated:
+        messages.error(request, "You must be logged in to join a waitlist.")
+        return response
+    if request.method != "POST":
+        return response
+
+    form = ReservationForm(request.POST)
+    if not form.is_valid():
+        for errors in form.errors.values():
+            for msg in errors:
+                messages.error(request, msg)
+        return response
+
+    reservation = form.save(commit=False)
+    reservation.user = request.user
+    for field, value in resource.items():
+        setattr(reservation, field, value)
+
+    try:
+        reservation.check_opening_hours()
+    except ValidationError as e:
+        for msg in e.messages:
+            messages.error(request, msg)
+        return response
+
+    if not reservation.check_conflicts():
+        messages.info(request, "That slot is free, so you can reserve it right away.")
+        return response
+
+    # Only wait for slots the user could actually be given
+    try:
+        reservation.check_training()
+    except ValidationError as e:
+        for msg in e.messages:
+            messages.error(request, msg)
+        return response
+
+    entry, created = WaitlistEntry.objects.get_or_create(
+        user=request.user,
+        status='waiting',
+        date=reservation.date,
+        start_time=reservation.start_time,
+        end_time=reservation.end_time,
+        **resource,
+        defaults={
+            "reservation_title": reservation.reservation_title,
+            "notes": reservation.notes,
+        },
+    )
+    if created:
+        messages.success(request, "You're on the waitlist. We'll email you if the slot opens up and book it for you.")
+    else:
+        messages.info(request, "You're already on the waitlist for this slot.")
+    return response
+
 def landing_view(request):
     context = {}
     if request.user.is_authenticated:
@@ -45,19 +287,21 @@ def landing_view(request):
     return render(request, "landing.html", context)
 
 @login_required
+@_versioned_feed("user", lambda request: request.user.pk)
 def my_reservations_json(request):
     # Get all user's reservations
     # For trainer reservations, only include approved ones (exclude pending and rejected)
-    reservations = Reservation.objects.filter(
-        user=request.user
-    ).filter(
-        # Include all non-trainer reservations OR only approved trainer reservations
-        Q(trainer__isnull=True) | Q(status='approved')
-    ).values(
-        "id", "reservation_title", "date", "start_time", "end_time",
+    return _calendar_feed(
+        request,
+        lambda objects: objects.filter(
+            user=request.user
+        ).filter(
+            # Include all non-trainer reservations OR only approved trainer reservations
+            Q(trainer__isnull=True) | Q(status='approved')
+        ),
+        "id", "reservation_title",
         "space__title", "machine__name", "trainer__name", "status"
     )
-    return JsonResponse(list(reservations), safe=False)
 
 @login_required
 def edit_reservation(request, reservation_id):
@@ -81,7 +325,14 @@ def edit_reservation(request, reservation_id):
         reservation.start_time = start_time
         reservation.end_time = end_time
         reservation.notes = notes
-        reservation.save()
+        # Re-validated like a new booking, with the resource locked, so a move
+        # onto another booking or outside opening hours is refused
+        try:
+            book_reservation(reservation)
+        except ValidationError as e:
+            for msg in e.messages:
+                messages.error(request, msg)
+            return redirect("landing page")
 
         messages.success(request, "Reservation updated successfully!")
         return redirect("landing page")
@@ -93,8 +344,9 @@ def delete_reservation(request, reservation_id):
     reservation = get_object_or_404(Reservation, id=reservation_id, user=request.user)
 
     if request.method == "POST":
-        reservation.delete()
+        promoted = cancel_reservation(reservation)
         messages.success(request, "Reservation deleted successfully!")
+        _report_promotions(request, promoted)
         return redirect("landing page")
 
     return HttpResponseForbidden("You are not allowed to delete this reservation.")
@@ -107,12 +359,9 @@ def space_list_view(request):
     type_filter = request.GET.get('type', '')
     location_filter = request.GET.get('location', '')
 
-    # Filter by title or custom_id
+    # Filter by title, custom_id, location or notes through the full-text index
     if search_query:
-        queryset = queryset.filter(
-            Q(title__icontains=search_query) |
-            Q(custom_id__icontains=search_query)
-        )
+        queryset = queryset.filter(pk__in=search_object_ids("space", search_query))
     
     # Filter by type
     if type_filter:
@@ -129,8 +378,11 @@ def space_list_view(request):
         queryset = queryset.filter(current_machine__isnull=True)
 
 
+    page = _list_page(request, queryset, SPACE_LIST_ORDERING)
+
     context = {
-        "space_list": queryset,
+        "space_list": page.items,
+        **page_context(request, page),
         "search_query": search_query,
         "type_filter": type_filter,
         "location_filter": location_filter,
@@ -180,7 +432,8 @@ def dynamic_lookup_view(request, custom_id):
     context = {
         "object": obj,
         "edit_form": edit_form,
-        "reservation_form": reservation_form
+        "reservation_form": reservation_form,
+        "series_form": ReservationSeriesForm()
     }
     return render(request, "space_detail.html", context)
 
@@ -199,12 +452,13 @@ def New_machine_create_view(request):
     # If invalid, re-render the same list page with BOTH forms:
     # - show the invalid New form (with errors) in its modal
     # - keep the Existing form available/blank
-    queryset = Machine.objects.all()
+    page = _list_page(request, MachineCatalogEntry.objects.all(), MACHINE_LIST_ORDERING)
     return render(
         request,
         "machine_list.html",
         {
-            "object_list": queryset,
+            "object_list": page.items,
+            **page_context(request, page),
             "form_new": form,                       # preserve user input + errors
             "form_existing": ExistingMachineForm(),
             "open_modal": "new", # other modal still works
@@ -221,12 +475,13 @@ def Existing_machine_create_view(request):
         return redirect("machine_list")
 
     # If invalid, re-render machine_list.html with both forms
-    queryset = Machine.objects.all()
+    page = _list_page(request, MachineCatalogEntry.objects.all(), MACHINE_LIST_ORDERING)
     return render(
         request,
         "machine_list.html",
         {
-            "object_list": queryset,
+            "object_list": page.items,
+            **page_context(request, page),
             "form_new": MachineForm(),      # keep both modals available
             "form_existing": form,          # preserve user's invalid input + errors
         },
@@ -240,11 +495,42 @@ def Existing_machine_create_view(request):
 #    return render(request, "machine_list.html", { "object_list": queryset,"form_new": form_new, "form_existing": form_existing})
 
 
-def machines_by_name_view(request, name):
+# Length of the slots the pooled availability table is split into
+POOL_SLOT_MINUTES = 60
+
+def _pooled_slots(units, day):
+    """Split the day's opening hours into slots, each with how many of the units are free."""
+    opening = get_opening_hours_on(day)
+    if not opening:
+        return []
+    windows = []
+    start = datetime.combine(day, opening[0])
+    closes_at = datetime.combine(day, opening[1])
+    while start + timedelta(minutes=POOL_SLOT_MINUTES) <= closes_at:
+        windows.append((start, start + timedelta(minutes=POOL_SLOT_MINUTES)))
+        start += timedelta(minutes=POOL_SLOT_MINUTES)
+
+    # One query for every unit and slot
+    availability = machines_available(units, windows)
+    return [
+        {
+            "start": window_start.time(),
+            "end": window_end.time(),
+            "free": sum(flags[index] for flags in availability.values()),
+        }
+        for index, (window_start, window_end) in enumerate(windows)
+    ]
+
+def machines_by_name_view(request, name, reservation_form=None):
     # Find all machines that share this exact name
-    machines = Machine.objects.filter(name=name)
+    machines = list(
+        Machine.objects.filter(name=name)
+        .select_related("installed_in")
+        .prefetch_related("certifications_required")
+        .order_by("custom_id")
+    )
 
-    if not machines.exists():
+    if not machines:
         raise Http404("No machines found with that name")
     
     locations = set()
@@ -260,12 +546,50 @@ def machines_by_name_view(request, name):
     for m in machines:
         m.all_locations = all_locations
 
+    # Pooled availability across every unit for the chosen day
+    day = _parse_calendar_date(request.GET.get("date")) or timezone.localdate()
+
+    if reservation_form is None:
+        reservation_form = ReservationForm(initial={"date": day})
+
     # You can also keep your existing filters here if you want later
     return render(request, "machines_by_name.html", {
         "name": name,
         "machines": machines,
+        "day": day,
+        "previous_day": day - timedelta(days=1),
+        "next_day": day + timedelta(days=1),
+        "pooled_slots": _pooled_slots(machines, day),
+        "reservation_form": reservation_form,
     })
 
+def machine_pool_reserve_view(request, name):
+    """Reserve whichever unit of this machine is free for the requested slot."""
+    if not Machine.objects.filter(name=name).exists():
+        raise Http404("No machines found with that name")
+    if not request.user.is_authenticated:
+        messages.error(request, "You must be logged in to create a reservation.")
+        return redirect("machine_by_name", name=name)
+    if request.method != "POST":
+        return redirect("machine_by_name", name=name)
+
+    form = ReservationForm(request.POST)
+    if not form.is_valid():
+        messages.error(request, "Please correct the errors below.")
+        return machines_by_name_view(request, name, reservation_form=form)
+
+    reservation = form.save(commit=False)
+    reservation.user = request.user
+    try:
+        book_any_unit(reservation, name)
+    except ValidationError as e:
+        for msg in e.messages:
+            messages.error(request, msg)
+        return machines_by_name_view(request, name, reservation_form=form)
+
+    messages.success(request, f"Reserved {reservation.machine.custom_id} ({name}).")
+    return redirect("machine-detail", custom_id=reservation.machine.custom_id)
+
 def machine_list_view(request):
     # Read filters from the query string
     q = (request.GET.get('q') or "").strip()
@@ -273,25 +597,23 @@ def machine_list_view(request):
     space_locations = Space.objects.values_list('location', flat=True).distinct().order_by('location')
     selected_location = request.GET.get('space_location', '').strip()
 
-    queryset = Machine.objects.select_related('installed_in').all()
+    # One query on the catalog: a row per machine name, kept current by signals
+    catalog = MachineCatalogEntry.objects.all()
 
-    # Text search
+    # Text search through the full-text index (machine documents are titled by name)
     if q:
-        queryset = queryset.filter(
-            Q(name__icontains=q) |
-            Q(custom_id__icontains=q) |
-            Q(specifications__icontains=q)
-        )
+        catalog = catalog.filter(name__in={document.title for document in search(q, ["machine"], limit=None)})
 
     # Filter by category
     if category:
-        queryset = queryset.filter(category=category)
+        catalog = catalog.filter(category=category)
 
     # Filter by space location
     if selected_location:
-        queryset = queryset.filter(installed_in__location=selected_location)
+        catalog = catalog.filter(location_key__contains=f"|{selected_location}|")
 
-    filtered_qs = queryset
+    page = _list_page(request, catalog, MACHINE_LIST_ORDERING)
+    machines = page.items
 
     # JSON data for JS
     machines_for_js = [
@@ -301,23 +623,19 @@ def machine_list_view(request):
             "about": m.about,
             "specifications": m.specifications,
         }
-        for m in filtered_qs
+        for m in machines
     ]
 
-    # Deduplicate machines by name
-    name_groups = filtered_qs.values('name').annotate(first_id=Min('id'))
-    unique_ids = [row['first_id'] for row in name_groups]
-    no_duplicates_qs = Machine.objects.filter(id__in=unique_ids).order_by('name')
-
-    # Collect all locations (from installed_in)
-    locations_by_name = defaultdict(set)
-    for m in filtered_qs:
-        if m.installed_in:
-            locations_by_name[m.name].add(m.installed_in.location)
+    # "Free now" badges: one availability query covers every unit on the page
+    now = timezone.localtime()
+    free_now = machines_available(
+        [unit_id for m in machines for unit_id in m.unit_ids],
+        [(now, now + timedelta(minutes=1))],
+    )
 
-    machines = list(no_duplicates_qs)
     for m in machines:
-        m.all_locations = sorted(locations_by_name.get(m.name, []))
+        m.all_locations = m.locations
+        m.units_free_now = sum(free_now[unit_id][0] for unit_id in m.unit_ids)
 
     # Forms
     form_new = MachineForm()
@@ -326,6 +644,7 @@ def machine_list_view(request):
 
     context = {
         "object_list": machines,
+        **page_context(request, page),
         "form_new": form_new,
         "form_existing": form_existing,
         "form": filter_form,
@@ -348,9 +667,10 @@ def machine_detail_view(request, custom_id=None, pk=None):
     edit_form = MachineForm(instance=obj)
     reservation_form = ReservationForm()
     
+    # Trainers certified in exactly this category, with all their certificates in one more query
     trainers = Trainer.objects.filter(
-        training_certificates__icontains=obj.category
-    )
+        certificates__category=obj.category
+    ).prefetch_related("certificates").order_by("name")
     
     return render(request, "machine_detail.html", {
         "object": obj,
@@ -402,9 +722,9 @@ def reservation_create_view(request, custom_id=None):
             reservation.user = request.user
             reservation.space = space
 
+            # Book the space and (if installed) its machine together, or neither
             try:
-                reservation.full_clean()
-                reservation.save()
+                book_reservation(reservation, linked_resource=space.current_machine)
 
             except ValidationError as e:
                 for msg in e.messages:
@@ -416,36 +736,6 @@ def reservation_create_view(request, custom_id=None):
                     "edit_form": SpaceForm(instance=space)
                 })
 
-            
-            # CREATE LINKED MACHINE RESERVATION (if machine installed)
-            if space.current_machine:
-                linked_res = Reservation(
-                    machine=space.current_machine,
-                    user=request.user,
-                    reservation_title=f"Linked to {reservation.reservation_title}",
-                    date=reservation.date,
-                    start_time=reservation.start_time,
-                    end_time=reservation.end_time,
-                    linked_reservation=reservation
-                )
-
-                try:
-                    linked_res.full_clean()  # ALSO validates training
-                    linked_res.save()
-                except ValidationError as e:
-                    for msg in e.messages:
-                        messages.error(request, msg)
-                    
-                    return render(request, "space_detail.html", {
-                        "object": space,
-                        "reservation_form": form,
-                        "edit_form": SpaceForm(instance=space)
-                    })
-
-                # Link back to the machine reservation
-                reservation.linked_reservation = linked_res
-                reservation.save(update_fields=['linked_reservation'])
-
             # SUCCESS
             messages.success(request, "Reservation created successfully!")
             return redirect("space-detail", custom_id=space.custom_id)
@@ -465,6 +755,46 @@ def reservation_create_view(request, custom_id=None):
         "edit_form": SpaceForm(instance=space)
     })
 
+def reservation_series_create_view(request, custom_id):
+    """Book a weekly or biweekly series of reservations for a space"""
+    space = get_object_or_404(Space, custom_id=custom_id)
+
+    if not request.user.is_authenticated:
+        messages.error(request, "You must be logged in to create a reservation.")
+        return redirect("space-detail", custom_id=space.custom_id)
+
+    if request.method != 'POST':
+        return redirect("space-detail", custom_id=space.custom_id)
+
+    form = ReservationSeriesForm(request.POST)
+    if form.is_valid():
+        series = form.save(commit=False)
+        series.user = request.user
+        series.space = space
+
+        try:
+            occurrences, skipped = series.create_occurrences()
+        except ValidationError as e:
+            for msg in e.messages:
+                messages.error(request, msg)
+        else:
+            messages.success(request, f"Booked {len(occurrences)} reservations for '{series.reservation_title}'.")
+            if skipped:
+                skipped_dates = ", ".join(day.strftime('%m-%d-%y') for day in skipped)
+                messages.warning(request, f"Skipped dates outside opening hours: {skipped_dates}")
+            return redirect("space-detail", custom_id=space.custom_id)
+    else:
+        for msg in form.non_field_errors():
+            messages.error(request, msg)
+
+    return render(request, "space_detail.html", {
+        "object": space,
+        "reservation_form": ReservationForm(),
+        "series_form": form,
+        "open_series_modal": True,
+        "edit_form": SpaceForm(instance=space)
+    })
+
 def space_reservation_edit_view(request, custom_id, reservation_id):
     """Edit an existing space reservation"""
     space = get_object_or_404(Space, custom_id=custom_id)
@@ -512,12 +842,23 @@ def space_reservation_delete_view(request, custom_id, reservation_id):
         return redirect("space-detail", custom_id=custom_id)
     
     if request.method == 'POST':
-        reservation.delete()
+        promoted = cancel_reservation(reservation)
         messages.success(request, "Reservation deleted successfully!")
+        _report_promotions(request, promoted)
         return redirect("space-detail", custom_id=custom_id)
     
     return redirect("space-detail", custom_id=custom_id)
 
+def space_waitlist_join_view(request, custom_id):
+    """Join the waitlist for a taken space slot"""
+    space = get_object_or_404(Space, custom_id=custom_id)
+    return _join_waitlist(request, redirect("space-detail", custom_id=space.custom_id), space=space)
+
+def machine_waitlist_join_view(request, custom_id):
+    """Join the waitlist for a taken machine slot"""
+    machine = get_object_or_404(Machine, custom_id=custom_id)
+    return _join_waitlist(request, redirect("machine-detail", custom_id=machine.custom_id), machine=machine)
+
 def reservation_create_viewMachines(request, custom_id=None):
     machine = get_object_or_404(Machine, custom_id=custom_id)
     # Check if user is authenticated
@@ -531,9 +872,19 @@ def reservation_create_viewMachines(request, custom_id=None):
             reservation = form.save(commit=False)
             reservation.user = request.user
             reservation.machine = machine
+
+            # High-demand machines: queue the request for the booking worker
+            if machine.queued_booking:
+                booking_request = enqueue_booking_request(reservation)
+                messages.info(request, "Your request is queued. We'll book it in the order it was received.")
+                return redirect(
+                    f"{reverse('machine-detail', kwargs={'custom_id': machine.custom_id})}"
+                    f"?booking_request={booking_request.id}"
+                )
+
+            # Book the machine and (if installed) its space together, or neither
             try:
-                reservation.full_clean()
-                reservation.save()
+                book_reservation(reservation, linked_resource=machine.installed_in)
 
             except ValidationError as e:
                 for msg in e.messages:
@@ -542,25 +893,9 @@ def reservation_create_viewMachines(request, custom_id=None):
                 return render(request, "machine_detail.html", {
                     "object": machine,
                     "reservation_form": form,
-                    "edit_form": SpaceForm(instance=machine)
+                    "edit_form": MachineForm(instance=machine)
                 })
 
-            # Check if the space has a current machine installed
-            if machine.installed_in:
-                linked_reservation = Reservation(
-                    space=machine.installed_in,
-                    user=request.user,
-                    reservation_title=f"Linked to {reservation.reservation_title}",
-                    date=reservation.date,
-                    start_time=reservation.start_time,
-                    end_time=reservation.end_time,
-                    linked_reservation=reservation
-                )
-                linked_reservation.save()
-                # Link back to the space reservation
-                reservation.linked_reservation = linked_reservation
-                reservation.save(update_fields=['linked_reservation'])
-
             messages.success(request, "Reservation created successfully!")
             return redirect("machine-detail", custom_id=machine.custom_id)
         else:
@@ -577,6 +912,22 @@ def reservation_create_viewMachines(request, custom_id=None):
         "edit_form": MachineForm(instance=machine)
     })
 
+@login_required
+def booking_request_status_json(request, request_id):
+    """Return the status of one of the user's queued booking requests (as JSON)."""
+    booking_request = get_object_or_404(
+        BookingRequest.objects.only("id", "machine_id", "status", "message", "reservation_id"),
+        id=request_id,
+        user=request.user
+    )
+    return JsonResponse({
+        "id": booking_request.id,
+        "status": booking_request.status,
+        "position": booking_request.get_position(),
+        "message": booking_request.message,
+        "reservation_id": booking_request.reservation_id,
+    })
+
 # Schedule views
 
 def schedule_list_view(request):
@@ -673,34 +1024,345 @@ def schedule_set_active_view(request, id):
         return redirect("schedule-list")
     return redirect("schedule-list")
 
+@_versioned_feed("space", lambda request, custom_id: custom_id)
 def space_reservations_json(request, custom_id):
     space = get_object_or_404(Space, custom_id=custom_id)
-    reservations = Reservation.objects.filter(
-        space=space
-    ).values(
+    return _calendar_feed(
+        request,
+        lambda objects: objects.active().filter(space=space),
         "id",
         "reservation_title",
-        "date",
-        "start_time",
-        "end_time",
-        "user__username"
+        "user__username",
+        capacity=space.capacity,
     )
-    return JsonResponse(list(reservations), safe=False)
 
+@_versioned_feed("machine", lambda request, custom_id: custom_id)
 def machines_reservations_json(request, custom_id):
-    """Return all reservations for this space (as JSON)."""
+    """Return this machine's reservations in the calendar's visible window (as JSON)."""
     machine = get_object_or_404(Machine, custom_id=custom_id)
-    reservations = Reservation.objects.filter(
-        machine=machine
-    ).values(
+    return _calendar_feed(
+        request,
+        lambda objects: objects.filter(machine=machine),
         "id",
         "reservation_title",
-        "date",
-        "start_time",
-        "end_time",
         "user__username"
     )
-    return JsonResponse(list(reservations), safe=False)
+
+def _free_slots_response(request, resource):
+    """Answer a free-slot query (?duration=<minutes>&after=<ISO datetime>&count=<n>) for a resource."""
+    try:
+        duration = int(request.GET.get("duration", 60))
+        count = int(request.GET.get("count", 5))
+    except ValueError:
+        return JsonResponse({"error": "duration and count must be whole numbers."}, status=400)
+
+    if not 15 <= duration <= 12 * 60:
+        return JsonResponse({"error": "duration must be between 15 and 720 minutes."}, status=400)
+    count = max(1, min(count, 50))
+
+    after = None
+    if request.GET.get("after"):
+        try:
+            after = parse_datetime(request.GET["after"])
+        except ValueError:
+            after = None
+        if after is None:
+            return JsonResponse({"error": "after must be an ISO 8601 datetime."}, status=400)
+
+    slots = find_free_slots(resource, timedelta(minutes=duration), after, count=count)
+    return JsonResponse([
+        {
+            "start": slot["start"].isoformat(),
+            "end": slot["end"].isoformat(),
+            "free_until": slot["free_until"].isoformat(),
+        }
+        for slot in slots
+    ], safe=False)
+
+def space_free_slots_json(request, custom_id):
+    """Return the next free slots for this space (as JSON)."""
+    space = get_object_or_404(Space, custom_id=custom_id)
+    return _free_slots_response(request, space)
+
+def machine_free_slots_json(request, custom_id):
+    """Return the next free slots for this machine (as JSON)."""
+    machine = get_object_or_404(Machine, custom_id=custom_id)
+    return _free_slots_response(request, machine)
+
+def timeline_json(request):
+    """
+    Resource timeline for a floor or location: every space, the machines
+    installed in those spaces, and their reservations for a day or a week.
+    Always three queries, however many spaces the floor holds. Every event of
+    the window comes back unless the request pages it (see _calendar_rows);
+    "next" is then the cursor of the next page.
+    """
+    spaces = Space.objects.all()
+
+    floor = request.GET.get("floor", "").strip()
+    if floor:
+        try:
+            spaces = spaces.filter(floor=int(floor))
+        except ValueError:
+            return JsonResponse({"error": "floor must be a number."}, status=400)
+
+    location = request.GET.get("location", "").strip()
+    if location:
+        spaces = spaces.filter(location=location)
+
+    # FullCalendar's start/end take priority; otherwise ?date=&span=day|week
+    start, end = _calendar_window(request)
+    if start is None:
+        start = _parse_calendar_date(request.GET.get("date")) or timezone.localdate()
+    if end is None or end <= start:
+        end = start + timedelta(days=7 if request.GET.get("span") == "week" else 1)
+
+    space_rows = list(
+        spaces.order_by("location", "custom_id").values(
+            "id", "custom_id", "title", "location", "floor", "capacity", "type"
+        )
+    )
+    space_keys = {row["id"]: f"space-{row['custom_id']}" for row in space_rows}
+
+    machine_rows = list(
+        Machine.objects.filter(
+            installed_in_id__in=space_keys
+        ).order_by("custom_id").values("id", "custom_id", "name", "installed_in_id")
+    )
+    machine_keys = {row["id"]: f"machine-{row['custom_id']}" for row in machine_rows}
+
+    reservations_in_window = Reservation.objects.active().filter(
+        Q(space_id__in=space_keys) | Q(machine_id__in=machine_keys)
+    ).in_window(start, end)
+    reservations = reservations_in_window.values(
+        "id", "reservation_title", "starts_at", "ends_at",
+        "space_id", "machine_id", "user__username", "status"
+    )
+    size = _feed_page_size(request)
+    if size is None:
+        page = KeysetPage(list(reservations.order_by(*FEED_ORDERING)))
+    else:
+        try:
+            page = keyset_page(reservations, FEED_ORDERING, request.GET.get("cursor"), size)
+        except InvalidCursor as exc:
+            return JsonResponse({"error": str(exc)}, status=400)
+
+    resources = [
+        {
+            "id": space_keys[row["id"]],
+            "type": "space",
+            "custom_id": row["custom_id"],
+            "title": row["title"],
+            "location": row["location"],
+            "floor": row["floor"],
+            "capacity": row["capacity"],
+            "space_type": row["type"],
+        }
+        for row in space_rows
+    ]
+    resources += [
+        {
+            "id": machine_keys[row["id"]],
+            "parentId": space_keys[row["installed_in_id"]],
+            "type": "machine",
+            "custom_id": row["custom_id"],
+            "title": row["name"],
+        }
+        for row in machine_rows
+    ]
+
+    reservations = page.items
+    capacities = {row["id"]: row["capacity"] for row in space_rows}
+    by_space = defaultdict(list)
+    for row in reservations:
+        if row["space_id"] in capacities:
+            by_space[row["space_id"]].append(row)
+    # A page holds only part of the window, so count seats over all of it
+    spans_by_space = None
+    if page.has_next or request.GET.get("cursor"):
+        spans_by_space = defaultdict(list)
+        for space_id, starts_at, ends_at in reservations_in_window.filter(
+            space_id__in=list(by_space)
+        ).values_list("space_id", "starts_at", "ends_at"):
+            spans_by_space[space_id].append((starts_at, ends_at))
+    for space_id, rows in by_space.items():
+        _add_remaining_seats(rows, capacities[space_id], spans_by_space[space_id] if spans_by_space is not None else None)
+
+    events = [
+        {
+            "id": row["id"],
+            "resourceId": space_keys.get(row["space_id"]) or machine_keys.get(row["machine_id"]),
+            "title": row["reservation_title"],
+            "start": calendar_time(row["starts_at"]),
+            "end": calendar_time(row["ends_at"]),
+            "username": row["user__username"],
+            "status": row["status"],
+            "remaining_seats": row.get("remaining_seats"),
+        }
+        for row in reservations
+    ]
+
+    response = JsonResponse({
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "resources": resources,
+        "events": events,
+        "next": page.next_cursor,
+    })
+    return add_next_link(response, request, page.next_cursor)
+
+# Largest number of change-log rows one delta-sync response covers
+CHANGES_PAGE_LIMIT = 1000
+
+def _sync_rows(reservations):
+    """Serialize reservations for delta-sync clients."""
+    return [
+        {
+            "id": row["id"],
+            "reservation_title": row["reservation_title"],
+            "start": calendar_time(row["starts_at"]),
+            "end": calendar_time(row["ends_at"]),
+            "status": row["status"],
+            "space": row["space__custom_id"],
+            "machine": row["machine__custom_id"],
+            "trainer_id": row["trainer_id"],
+            "username": row["user__username"],
+            "linked_reservation_id": row["linked_reservation_id"],
+        }
+        for row in reservations.order_by("starts_at", "id").values(
+            "id", "reservation_title", "starts_at", "ends_at", "status",
+            "space__custom_id", "machine__custom_id", "trainer_id",
+            "user__username", "linked_reservation_id",
+        )
+    ]
+
+def reservation_changes_json(request):
+    """
+    Delta sync for kiosks and dashboards that keep a local copy of the reservations.
+
+    Without ?since= the response is a snapshot of today's and upcoming
+    reservations plus a cursor. With ?since=<cursor> it holds only the
+    reservations created or modified after that cursor ("changes", current
+    state) and the ids of those deleted or archived ("deleted"). Pass the
+    returned cursor back next time; "has_more" means call again right away.
+    A cursor older than the retained log gets 410, and the client resyncs.
+    """
+    try:
+        limit = max(1, min(int(request.GET.get("limit", 500)), CHANGES_PAGE_LIMIT))
+    except ValueError:
+        return JsonResponse({"error": "limit must be a whole number."}, status=400)
+
+    since = request.GET.get("since")
+    if since is None:
+        # Read the cursor first: anything changed while the snapshot is built
+        # is replayed on the next call, and replaying is harmless
+        cursor = ReservationChange.objects.order_by("-id").values_list("id", flat=True).first() or 0
+        upcoming = Reservation.objects.in_window(start=timezone.localdate())
+        return JsonResponse({
+            "cursor": cursor,
+            "snapshot": True,
+            "changes": _sync_rows(upcoming),
+            "deleted": [],
+            "has_more": False,
+        })
+
+    try:
+        since = int(since)
+    except ValueError:
+        return JsonResponse({"error": "since must be a cursor returned by this endpoint."}, status=400)
+
+    log = list(
+        ReservationChange.objects.filter(id__gt=since)
+        .order_by("id")
+        .values_list("id", "reservation_id", "action")[:limit + 1]
+    )
+    if not log or log[0][0] > since + 1:
+        oldest = ReservationChange.objects.order_by("id").values_list("id", flat=True).first()
+        if oldest is not None and oldest > since + 1:
+            return JsonResponse({"error": "cursor expired; resync without since."}, status=410)
+
+    has_more = len(log) > limit
+    log = log[:limit]
+
+    # Only the latest action per reservation matters
+    latest = {}
+    for _, reservation_id, action in log:
+        latest[reservation_id] = action
+    changed = [rid for rid, action in latest.items() if action != "deleted"]
+
+    rows = _sync_rows(Reservation.objects.filter(pk__in=changed)) if changed else []
+    # Rows gone since their change was logged are reported deleted now; their
+    # own tombstone follows in a later page
+    present = {row["id"] for row in rows}
+    deleted = sorted(rid for rid in latest if rid not in present)
+
+    return JsonResponse({
+        "cursor": log[-1][0] if log else since,
+        "snapshot": False,
+        "changes": rows,
+        "deleted": deleted,
+        "has_more": has_more,
+    })
+
+# Seconds between keep-alive comments on an idle event stream
+LIVE_HEARTBEAT_SECONDS = 15
+
+async def _live_events(channels):
+    """Stream reservation events published to any of the channels, as Server-Sent Events."""
+    with get_broker().subscribe(channels) as subscription:
+        yield "retry: 5000\n\n"
+        while True:
+            try:
+                message = await asyncio.wait_for(subscription.get(), LIVE_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield f"event: reservation\ndata: {json.dumps(message)}\n\n"
+
+def _live_response(request, channels):
+    if not isinstance(request, ASGIRequest):
+        # A WSGI worker (e.g. runserver) would be held by the stream forever. 204 tells
+        # EventSource not to reconnect; the calendar still works, just without live updates.
+        return HttpResponse(status=204)
+    response = StreamingHttpResponse(_live_events(channels), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+async def space_live_events(request, custom_id):
+    """Stream reservation changes for one space."""
+    space_id = await Space.objects.filter(custom_id=custom_id).values_list("id", flat=True).afirst()
+    if space_id is None:
+        raise Http404("Space not found")
+    return _live_response(request, [f"space:{space_id}"])
+
+async def machine_live_events(request, custom_id):
+    """Stream reservation changes for one machine."""
+    machine_id = await Machine.objects.filter(custom_id=custom_id).values_list("id", flat=True).afirst()
+    if machine_id is None:
+        raise Http404("Machine not found")
+    return _live_response(request, [f"machine:{machine_id}"])
+
+async def trainer_live_events(request, pk):
+    """Stream reservation changes for one trainer."""
+    if not await Trainer.objects.filter(pk=pk).aexists():
+        raise Http404("Trainer not found")
+    return _live_response(request, [f"trainer:{pk}"])
+
+async def all_trainers_live_events(request):
+    """Stream reservation changes for every trainer."""
+    return _live_response(request, ["trainers"])
+
+async def floor_live_events(request, floor):
+    """Stream reservation changes for the spaces (and their machines) on one floor."""
+    if floor not in dict(Space.FLOOR_CHOICES):
+        raise Http404("Floor not found")
+    channels = [f"space:{pk}" async for pk in Space.objects.filter(floor=floor).values_list("id", flat=True)]
+    channels += [
+        f"machine:{pk}"
+        async for pk in Machine.objects.filter(installed_in__floor=floor).values_list("id", flat=True)
+    ]
+    return _live_response(request, channels)
 
 #Trainers
 
@@ -708,16 +1370,13 @@ def trainer_list_view(request):
     q = (request.GET.get("q") or "").strip()
     selected_cert = (request.GET.get("training_certificates") or "").strip()
 
-    queryset = Trainer.objects.all()
+    queryset = Trainer.objects.prefetch_related("certificates")
 
     if q:
-        queryset = queryset.filter(
-            Q(name__icontains=q) | Q(custom_id__icontains=q)
-        )
+        queryset = queryset.filter(pk__in=search_object_ids("trainer", q))
 
     if selected_cert:
-        # training_certificates is a comma-separated TextField, so use icontains
-        queryset = queryset.filter(training_certificates__icontains=selected_cert)
+        queryset = queryset.filter(certificates__category=selected_cert)
 
     # use the same CATEGORY_CHOICES as the TrainerForm
     category_choices = TrainerForm.CATEGORY_CHOICES
@@ -730,8 +1389,11 @@ def trainer_list_view(request):
         category_choices=category_choices,
     )
 
+    page = _list_page(request, queryset, TRAINER_LIST_ORDERING)
+
     context = {
-        "object_list": queryset,
+        "object_list": page.items,
+        **page_context(request, page),
         "filter_form": filter_form,
         "form_new": TrainerForm(),   # modal form for "Add Trainer"
         "q": q,
@@ -748,7 +1410,7 @@ def trainer_create_view(request):
             return redirect("trainer_detail", pk=obj.pk)
         # re-render list on error and reopen modal
         return render(request, "trainer_list.html", {
-            "object_list": Trainer.objects.all(),
+            "object_list": _list_page(request, Trainer.objects.prefetch_related("certificates"), TRAINER_LIST_ORDERING).items,
             "filter_form": TrainerFilterForm(
                 major_choices=[value for value, _ in TrainerForm.CATEGORY_CHOICES]
             ),
@@ -810,7 +1472,17 @@ def reservation_create_viewTrainers(request, pk):
             reservation.trainer = trainer
             # Set trainer reservations to pending by default
             reservation.status = 'pending'
-            reservation.save()
+            try:
+                book_reservation(reservation)
+            except ValidationError as e:
+                for msg in e.messages:
+                    messages.error(request, msg)
+
+                return render(request, "trainer_detail.html", {
+                    "object": trainer,
+                    "reservation_form": form,
+                    "form_edit": TrainerForm(instance=trainer)
+                })
             messages.success(request, "Reservation created successfully! Awaiting approval.")
             return redirect("trainer_detail", pk=trainer.pk)
         else:
@@ -824,45 +1496,45 @@ def reservation_create_viewTrainers(request, pk):
         "form_edit": TrainerForm(instance=trainer)
     })
 
+def trainer_waitlist_join_view(request, pk):
+    """Join the waitlist for a taken trainer slot"""
+    trainer = get_object_or_404(Trainer, pk=pk)
+    return _join_waitlist(request, redirect("trainer_detail", pk=trainer.pk), trainer=trainer)
+
+@_versioned_feed("trainer", lambda request, pk: pk)
 def trainers_reservations_json(request, pk):
-    """Return all reservations for this trainer (as JSON)."""
+    """Return this trainer's reservations in the calendar's visible window (as JSON)."""
     trainer = get_object_or_404(Trainer, pk=pk)
     # Exclude rejected reservations from the calendar
-    reservations = Reservation.objects.filter(
-        trainer=trainer
-    ).exclude(
-        status='rejected'
-    ).values(
+    return _calendar_feed(
+        request,
+        lambda objects: objects.filter(trainer=trainer).active(),
         "id",
         "reservation_title",
-        "date",
-        "start_time",
-        "end_time",
         "user__username",
         "status"
     )
-    return JsonResponse(list(reservations), safe=False)
 
+def trainer_free_slots_json(request, pk):
+    """Return the next free slots for this trainer (as JSON)."""
+    trainer = get_object_or_404(Trainer, pk=pk)
+    return _free_slots_response(request, trainer)
+
+@_versioned_feed("trainer", lambda request: "all")
 def all_trainers_reservations_json(request):
-    """Return all reservations for all trainers with trainer info (as JSON)."""
+    """Return all trainers' reservations in the calendar's visible window, with trainer info (as JSON)."""
     # Exclude rejected reservations from the calendar
-    reservations = Reservation.objects.filter(
-        trainer__isnull=False
-    ).exclude(
-        status='rejected'
-    ).select_related('trainer').values(
+    return _calendar_feed(
+        request,
+        lambda objects: objects.filter(trainer__isnull=False).active(),
         "id",
         "reservation_title",
-        "date",
-        "start_time",
-        "end_time",
         "user__username",
         "trainer__id",
         "trainer__name",
         "trainer__custom_id",
         "status"
     )
-    return JsonResponse(list(reservations), safe=False)
 
 def trainer_reservation_edit_view(request, pk, reservation_id):
     """Edit an existing trainer reservation"""
@@ -927,8 +1599,9 @@ def trainer_reservation_delete_view(request, pk, reservation_id):
         return get_redirect()
     
     if request.method == 'POST':
-        reservation.delete()
+        promoted = cancel_reservation(reservation)
         messages.success(request, "Reservation deleted successfully!")
+        _report_promotions(request, promoted)
         return get_redirect()
     
     return get_redirect()
@@ -960,65 +1633,136 @@ def trainer_reservation_approve_view(request, pk, reservation_id):
     if request.method == 'POST':
         action = request.POST.get('action')
         if action == 'approve':
-            reservation.status = 'approved'
-            reservation.save()
+            set_reservation_status([reservation.pk], 'approved')
             messages.success(request, "Reservation approved successfully!")
         elif action == 'reject':
-            reservation.status = 'rejected'
-            reservation.save()
+            set_reservation_status([reservation.pk], 'rejected')
             messages.success(request, "Reservation rejected.")
         return get_redirect()
     
     return redirect("trainer_detail", pk=trainer.pk)
 
-def about_view(request):
-    """Display about page with active schedule information"""
-    from .models import Project, Event
-    from datetime import date
+# Bulk actions on the approvals inbox, mapped to the status they set
+APPROVAL_ACTIONS = {"approve": "approved", "reject": "rejected"}
 
-    # Get all active schedules
-    active_schedules = Schedule.objects.filter(is_active=True)
+@login_required
+def pending_reservations_view(request):
+    """Staff inbox of pending trainer reservations, with bulk approve/reject."""
+    if not (request.user.is_staff or request.user.is_superuser):
+        messages.error(request, "Only staff members can approve reservations.")
+        return redirect("trainer_list")
 
-    # Create a list of all days with their hours
-    all_days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-    schedule_days = []
+    if request.method == "POST":
+        status = APPROVAL_ACTIONS.get(request.POST.get("action"))
+        ids = [value for value in request.POST.getlist("reservation_ids") if value.isdigit()]
+        if status is None or not ids:
+            messages.error(request, "Select at least one reservation and an action.")
+        else:
+            changed = set_reservation_status(ids, status)
+            messages.success(request, f"{len(changed)} reservation{'s' if len(changed) != 1 else ''} {status}.")
+        return redirect("pending-reservations")
+
+    pending = (
+        Reservation.objects.filter(status="pending")
+        .select_related("trainer", "user", "space", "machine")
+        .order_by("trainer__name", "trainer_id", "starts_at")
+    )
+    return render(request, "pending_reservations.html", {"pending": pending})
+
+OPENING_HOURS_MAX_DAYS = 400
+
+def _opening_hours_row(day):
+    """JSON form of one resolve_opening_hours() day."""
+    return {
+        "date": day["date"].isoformat(),
+        "weekday": day["date"].strftime("%A"),
+        "open": day["open"],
+        "all_day": day["all_day"],
+        "open_time": day["open_time"].strftime("%H:%M") if day["open"] else None,
+        "close_time": day["close_time"].strftime("%H:%M") if day["open"] else None,
+        "schedule": {"id": day["schedule_id"], "name": day["schedule_name"]} if day["schedule_id"] else None,
+    }
+
+def opening_hours_json(request):
+    """
+    Opening hours for every date in [start, end) (as JSON), for the about page
+    and kiosks. Defaults to the next seven days; a range may span up to
+    OPENING_HOURS_MAX_DAYS, e.g. a whole semester. Answered from the compiled
+    opening calendar, so no schedule query runs.
+    """
+    start, end = _calendar_window(request)
+    if (request.GET.get("start") and start is None) or (request.GET.get("end") and end is None):
+        return JsonResponse({"error": "start and end must be ISO dates."}, status=400)
+    if start is None:
+        start = timezone.localdate()
+    if end is None:
+        end = start + timedelta(days=7)
+    if end <= start:
+        return JsonResponse({"error": "end must be after start."}, status=400)
+    if (end - start).days > OPENING_HOURS_MAX_DAYS:
+        return JsonResponse({"error": f"A range may span at most {OPENING_HOURS_MAX_DAYS} days."}, status=400)
+
+    days = [_opening_hours_row(day) for day in resolve_opening_hours(start, end)]
+    return JsonResponse({"start": start.isoformat(), "end": end.isoformat(), "days": days})
+
+SEARCH_RESULT_LIMIT = 50
+
+def search_json(request):
+    """
+    Ranked full-text search across machines, spaces and trainers (as JSON).
+    ?q= is the text; ?type= may name kinds to restrict to (comma separated);
+    ?limit= caps the results (default 20, at most SEARCH_RESULT_LIMIT).
+    """
+    q = (request.GET.get("q") or "").strip()
 
-    # For each day, find the most appropriate active schedule
-    today = date.today()
+    kinds = [kind for kind in (request.GET.get("type") or "").split(",") if kind]
+    unknown = set(kinds) - set(SEARCH_KINDS)
+    if unknown:
+        return JsonResponse({"error": f"Unknown type: {', '.join(sorted(unknown))}."}, status=400)
 
-    for day in all_days:
-        day_schedule = None
+    try:
+        limit = min(max(int(request.GET.get("limit", 20)), 1), SEARCH_RESULT_LIMIT)
+    except ValueError:
+        return JsonResponse({"error": "limit must be a number."}, status=400)
 
-        # Find active schedules that apply to this day
-        for schedule in active_schedules:
-            # Get the days set for this schedule
-            days_set = schedule.get_days_set()
+    results = [
+        {
+            "type": document.kind,
+            "id": document.object_id,
+            "title": document.title,
+            "summary": document.summary,
+            "url": document.url,
+            "score": document.score,
+        }
+        for document in search(q, kinds, limit=limit)
+    ]
+    return JsonResponse({"query": q, "results": results})
 
-            # Check if this day is in the schedule (handle both full names and abbreviations)
-            # days_set might contain "Monday" or "Mon", we check for both
-            day_abbr = day[:3]  # "Monday" -> "Mon"
-            if day in days_set or day_abbr in days_set:
-                # Check if schedule covers today's date
-                if schedule.start_date <= today <= schedule.end_date:
-                    day_schedule = schedule
-                    break
+def about_view(request):
+    """Display about page with this week's opening hours (from the cached week result)"""
+    from .models import Project, Event
 
-        if day_schedule:
+    schedule_days = []
+    for day in get_week_hours(timezone.localdate()):
+        if day['open']:
             schedule_days.append({
-                'day': day,
-                'hours': f"{day_schedule.open_time.strftime('%I:%M %p')} - {day_schedule.close_time.strftime('%I:%M %p')}",
+                'day': day['date'].strftime('%A'),
+                'date': day['date'],
+                'hours': "Open all day" if day['all_day'] else f"{day['open_time'].strftime('%I:%M %p')} - {day['close_time'].strftime('%I:%M %p')}",
                 'open': True,
-                'schedule_name': day_schedule.name
+                'schedule_name': day['schedule_name']
             })
         else:
             schedule_days.append({
-                'day': day,
+                'day': day['date'].strftime('%A'),
+                'date': day['date'],
                 'hours': 'Closed',
                 'open': False,
                 'schedule_name': None
             })
 
-    # Get projects and events
+    # Get active schedules, projects and events
+    active_schedules = Schedule.objects.filter(is_active=True)
     projects = Project.objects.all()[:10]  # Latest 10 projects
     events = Event.objects.filter(event_date__gte=timezone.now().date())[:10]  # Upcoming 10 events
 
@@ -1039,13 +1783,14 @@ from django.contrib.auth.decorators import login_required
 def help_ticket_list_view(request):
     """Display list of open help tickets"""
     # Only show open tickets (resolved ones are removed from view)
-    tickets = HelpTicket.objects.filter(status='open')
+    page = _list_page(request, HelpTicket.objects.filter(status='open'), HELP_TICKET_LIST_ORDERING)
 
     # Check if user is admin/staff
     is_admin = request.user.is_staff or request.user.is_superuser
 
     context = {
-        'tickets': tickets,
+        'tickets': page.items,
+        **page_context(request, page),
         'is_admin': is_admin,
         'form': HelpTicketForm(),
         'open_modal': request.GET.get('open_modal') == 'new',
@@ -1064,10 +1809,11 @@ def help_ticket_create_view(request):
             return redirect('help-ticket-list')
         else:
             # Return to page with modal open and errors
-            tickets = HelpTicket.objects.filter(status='open')
+            page = _list_page(request, HelpTicket.objects.filter(status='open'), HELP_TICKET_LIST_ORDERING)
             is_admin = request.user.is_staff or request.user.is_superuser
             context = {
-                'tickets': tickets,
+                'tickets': page.items,
+                **page_context(request, page),
                 'is_admin': is_admin,
                 'form': form,
                 'open_modal': True,
@@ -1094,13 +1840,14 @@ from .models import Contact
 
 def contact_list_view(request):
     """Display list of contacts"""
-    contacts = Contact.objects.all()
+    page = _list_page(request, Contact.objects.all(), CONTACT_LIST_ORDERING)
 
     # Check if user is admin/staff
     is_admin = request.user.is_staff or request.user.is_superuser if request.user.is_authenticated else False
 
     context = {
-        'contacts': contacts,
+        'contacts': page.items,
+        **page_context(request, page),
         'is_admin': is_admin,
         'form': ContactForm(),
         'open_modal': request.GET.get('open_modal') == 'new',
@@ -1120,9 +1867,10 @@ def contact_create_view(request):
             return redirect('contact-list')
         else:
             # Return to page with modal open and errors
-            contacts = Contact.objects.all()
+            page = _list_page(request, Contact.objects.all(), CONTACT_LIST_ORDERING)
             context = {
-                'contacts': contacts,
+                'contacts': page.items,
+                **page_context(request, page),
                 'is_admin': True,
                 'form': form,
                 'open_modal': True,
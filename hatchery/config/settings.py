@@ -99,6 +99,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'cmr.context_processors.pending_approvals',
             ],
         },
     },
@@ -126,10 +127,40 @@ else:
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            'OPTIONS': {
+                # Take the write lock when a booking transaction starts (BEGIN IMMEDIATE)
+                # so concurrent bookings queue up instead of racing
+                'transaction_mode': 'IMMEDIATE',
+                'timeout': 20,
+            },
         }
     }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Holds per-user training eligibility; swap for a shared backend when running several workers
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'hatchery',
+    }
+}
+
+# Pub/sub for live calendar updates: cmr.live.LocalBroker (single process) or
+# cmr.live.PostgresBroker (LISTEN/NOTIFY, for several workers)
+RESERVATION_EVENTS_BROKER = os.environ.get('RESERVATION_EVENTS_BROKER', 'cmr.live.LocalBroker')
+
+# Reservations older than this many days are moved to the archive table
+# by `python manage.py archive_reservations`
+RESERVATION_ARCHIVE_DAYS = int(os.environ.get('RESERVATION_ARCHIVE_DAYS', 90))
+
+# Delta-sync change log entries are kept this many days by
+# `python manage.py prune_reservation_changes`; older cursors must resync
+RESERVATION_CHANGE_LOG_DAYS = int(os.environ.get('RESERVATION_CHANGE_LOG_DAYS', 30))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -215,6 +246,10 @@ ACCOUNT_AUTHENTICATION_METHOD = 'username_email'
 LOGIN_REDIRECT_URL = '/'
 LOGOUT_REDIRECT_URL = '/'
 
+# Outgoing mail (waitlist notifications). Printed to the console unless configured.
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'hatchery@bc.edu')
+
 # Custom adapter settings
 ACCOUNT_ADAPTER = 'core.adapters.CustomAccountAdapter'
 SOCIALACCOUNT_ADAPTER = 'core.adapters.CustomSocialAccountAdapter'
@@ -26,17 +26,30 @@ urlpatterns = [
     path('', views.landing_view, name='landing page'),
     path('accounts/', include('allauth.urls')),
     path('about/', views.about_view, name='about'),
+    path('about/hours/', views.opening_hours_json, name='opening-hours-json'),
+    path('search/', views.search_json, name='search-json'),
     path('spaces/<str:custom_id>/', views.dynamic_lookup_view, name='space-detail'),
     path('create/', views.space_create_view, name='create'),
     path("spaces/<str:custom_id>/reservations/", views.space_reservations_json, name="space-reservations-json"),
+    path("spaces/<str:custom_id>/free-slots/", views.space_free_slots_json, name="space-free-slots-json"),
     #path('help/', help_view, name='help'),
     path('spaces/<str:custom_id>/delete/', views.space_delete_view, name='space-delete'),
     path('spaces/<str:custom_id>/reserve/', views.reservation_create_view, name='space-reserve'),
+    path('spaces/<str:custom_id>/reserve/series/', views.reservation_series_create_view, name='space-reserve-series'),
+    path('spaces/<str:custom_id>/waitlist/', views.space_waitlist_join_view, name='space-waitlist'),
     path('spaces/', views.space_list_view, name='space-list'),
     path('spaces/<str:custom_id>/edit/', views.space_edit_view, name='space-edit'),
     path("spaces/<str:custom_id>/reservations/<int:reservation_id>/edit/", views.space_reservation_edit_view, name="space-reservation-edit"),
     path("spaces/<str:custom_id>/reservations/<int:reservation_id>/delete/", views.space_reservation_delete_view, name="space-reservation-delete"),
     path("reservations/my/", views.my_reservations_json, name="my-reservations-json"),
+    path("reservations/pending/", views.pending_reservations_view, name="pending-reservations"),
+    path("reservations/changes/", views.reservation_changes_json, name="reservation-changes-json"),
+    path("timeline/", views.timeline_json, name="timeline-json"),
+    path("live/spaces/<str:custom_id>/", views.space_live_events, name="space-live-events"),
+    path("live/machines/<str:custom_id>/", views.machine_live_events, name="machine-live-events"),
+    path("live/trainers/", views.all_trainers_live_events, name="all-trainers-live-events"),
+    path("live/trainers/<int:pk>/", views.trainer_live_events, name="trainer-live-events"),
+    path("live/floors/<int:floor>/", views.floor_live_events, name="floor-live-events"),
     path('reservations/edit/<int:reservation_id>/', views.edit_reservation, name='edit_reservation'),
     path('reservations/delete/<int:reservation_id>/', views.delete_reservation, name='delete_reservation'),
 
@@ -48,8 +61,12 @@ urlpatterns = [
     path("machines/<str:custom_id>/edit/", views.machine_edit_view, name="machine-edit"),
     path("machines/<str:custom_id>/delete/", views.machine_delete_view, name="machine-delete"),
     path('machines/<str:custom_id>/reserve/', views.reservation_create_viewMachines, name='machine-reserve'),
+    path('machines/<str:custom_id>/waitlist/', views.machine_waitlist_join_view, name='machine-waitlist'),
     path("machines/<str:custom_id>/reservations/", views.machines_reservations_json, name="machines-reservations-json"),
+    path("machines/<str:custom_id>/free-slots/", views.machine_free_slots_json, name="machine-free-slots-json"),
     path("machines/by-name/<str:name>/", views.machines_by_name_view, name="machine_by_name"),
+    path("machines/by-name/<str:name>/reserve/", views.machine_pool_reserve_view, name="machine-pool-reserve"),
+    path("booking-requests/<int:request_id>/", views.booking_request_status_json, name="booking-request-status-json"),
 
     # Schedule management
     path('schedule/', views.schedule_list_view, name='schedule-list'),
@@ -66,7 +83,9 @@ urlpatterns = [
     path("trainers/<int:pk>/edit/", views.trainer_edit_view, name="trainer_edit"),
     path("trainers/<int:pk>/delete/", views.trainer_delete_view, name="trainer_delete"),
     path("trainers/<int:pk>/reserve/", views.reservation_create_viewTrainers, name="trainer-reserve"),
+    path("trainers/<int:pk>/waitlist/", views.trainer_waitlist_join_view, name="trainer-waitlist"),
     path("trainers/<int:pk>/reservations/", views.trainers_reservations_json, name="trainers-reservations-json"),
+    path("trainers/<int:pk>/free-slots/", views.trainer_free_slots_json, name="trainer-free-slots-json"),
     path("trainers/<int:pk>/reservations/<int:reservation_id>/edit/", views.trainer_reservation_edit_view, name="trainer-reservation-edit"),
     path("trainers/<int:pk>/reservations/<int:reservation_id>/delete/", views.trainer_reservation_delete_view, name="trainer-reservation-delete"),
     path("trainers/<int:pk>/reservations/<int:reservation_id>/approve/", views.trainer_reservation_approve_view, name="trainer-reservation-approve"),
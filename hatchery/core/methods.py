@@ -2,17 +2,25 @@
 
 - Training/certification summary for the currently logged-in user
 - Machine availability checks
+- Free slot search for machines, spaces and trainers
 
 These methods use direct model queries instead of calling app services.
 """
 from __future__ import annotations
 
-from typing import Any, Dict, Optional, Union
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
 
 from django.contrib.auth.models import AnonymousUser
+from django.db.models import Q
+from django.utils import timezone
 
 from pct.models import Person, Certification, TrainingRecord
-from cmr.models import Machine, Reservation
+from cmr.models import Machine, Reservation, Space, Trainer, as_aware, occupancy, overlap_q
+from cmr.methods import get_opening_hours_between
+
+# Reservation foreign key used for each kind of reservable resource
+RESOURCE_FIELDS = {Machine: "machine", Space: "space", Trainer: "trainer"}
 
 
 def _get_person_for_user(user) -> Optional[Dict[str, Any]]:
@@ -165,6 +173,13 @@ def get_user_training_summary(user) -> Optional[Dict[str, Any]]:
     }
 
 
+def _local_naive(value: datetime) -> datetime:
+    """Convert an aware datetime to naive local time (the wall-clock time shown to users)."""
+    if timezone.is_aware(value):
+        return timezone.make_naive(value)
+    return value
+
+
 def machine_available(
     machine: Union[Machine, int],
     start,
@@ -174,10 +189,13 @@ def machine_available(
 ) -> Union[bool, Dict[str, Any]]:
     """Check if a machine is available in the [start, end) window.
 
+    Rejected reservations do not block the machine. Naive datetimes are
+    read as local time.
+
     Args:
         machine: Machine instance or machine ID
-        start: Start datetime (timezone-aware)
-        end: End datetime (timezone-aware)
+        start: Start datetime
+        end: End datetime
         include_conflict: If True, return dict with conflict details; if False, return bool
 
     Returns:
@@ -214,35 +232,196 @@ def machine_available(
             'available': False,
             'conflict': {
                 'id': 87,
-                'person_email': 'bob@example.com',
-                'start': datetime(2025, 11, 5, 13, 0, tzinfo=timezone.utc),
-                'end': datetime(2025, 11, 5, 15, 0, tzinfo=timezone.utc)
+                'user_email': 'bob@example.com',
+                'start': datetime(2025, 11, 5, 13, 0),
+                'end': datetime(2025, 11, 5, 15, 0)
             }
         }
     """
-    if isinstance(machine, Machine):
-        machine_obj = machine
-    else:
-        machine_obj = Machine.objects.get(pk=machine)
-
-    # Direct query instead of calling cmr.services.has_conflict
-    conflict_exists = Reservation.objects.filter(
-        machine=machine_obj,
-        start__lt=end,
-        end__gt=start,
-    ).exists()
+    machine_id = machine.pk if isinstance(machine, Machine) else machine
+
+    overlapping = Reservation.objects.active().filter(machine_id=machine_id).overlapping(start, end)
 
     if not include_conflict:
-        return not conflict_exists
+        return not overlapping.exists()
+
+    # Fetch a representative overlapping reservation
+    row = (
+        overlapping.order_by("starts_at")
+        .values("id", "user__email", "starts_at", "ends_at")
+        .first()
+    )
 
     conflict = None
-    if conflict_exists:
-        # Fetch a representative overlapping reservation
-        conflict = (
-            Reservation.objects.filter(machine=machine_obj, start__lt=end, end__gt=start)
-            .order_by("start")
-            .values("id", "person_email", "start", "end")
-            .first()
+    if row is not None:
+        conflict = {
+            "id": row["id"],
+            "user_email": row["user__email"],
+            "start": _local_naive(row["starts_at"]),
+            "end": _local_naive(row["ends_at"]),
+        }
+
+    return {"available": conflict is None, "conflict": conflict}
+
+
+def machines_available(
+    machines: Iterable[Union[Machine, int]],
+    windows: Sequence[Tuple[datetime, datetime]],
+) -> Dict[int, List[bool]]:
+    """Check many machines against many [start, end) windows with a single query.
+
+    Args:
+        machines: Machine instances or machine IDs
+        windows: Sequence of (start, end) datetimes
+
+    Returns:
+        Dict mapping each machine ID to a list of booleans, one per window
+        (True if the machine is free for the whole window).
+
+    Example Input:
+        machines_available(
+            machines=[15, 16],
+            windows=[
+                (datetime(2025, 11, 5, 10, 0), datetime(2025, 11, 5, 11, 0)),
+                (datetime(2025, 11, 5, 14, 0), datetime(2025, 11, 5, 15, 0)),
+            ]
+        )
+
+    Example Output:
+        {
+            15: [True, False],  # busy 14:00-15:00
+            16: [True, True]
+        }
+    """
+    machine_ids = [m.pk if isinstance(m, Machine) else m for m in machines]
+    windows = [(as_aware(start), as_aware(end)) for start, end in windows]
+    availability = {machine_id: [True] * len(windows) for machine_id in machine_ids}
+    if not machine_ids or not windows:
+        return availability
+
+    window_filter = Q()
+    for start, end in windows:
+        window_filter |= overlap_q(start, end)
+
+    rows = (
+        Reservation.objects.active()
+        .filter(machine_id__in=machine_ids)
+        .filter(window_filter)
+        .values_list("machine_id", "starts_at", "ends_at")
+    )
+    for machine_id, starts_at, ends_at in rows:
+        flags = availability[machine_id]
+        for index, (start, end) in enumerate(windows):
+            if flags[index] and starts_at < end and ends_at > start:
+                flags[index] = False
+
+    return availability
+
+def find_free_slots(
+    resource: Union[Machine, Space, Trainer],
+    duration: timedelta,
+    after: Optional[datetime] = None,
+    *,
+    count: int = 5,
+    horizon_days: int = 90,
+) -> List[Dict[str, datetime]]:
+    """Return the first free slots of a given length for a machine, space or trainer.
+
+    Opening hours come from the compiled opening calendar. The
+    resource's reservations are read in one ordered query and merged with the
+    opening hours in a single pass, stopping as soon as `count` slots are found.
+    A space with room for several people counts as free while a seat is left.
+
+    Args:
+        resource: Machine, Space or Trainer instance
+        duration: Length of the slot to find
+        after: Earliest start (defaults to now); aware datetimes are converted to local time
+        count: Maximum number of slots to return
+        horizon_days: How many days ahead of `after` to search
+
+    Returns:
+        List of dicts with 'start', 'end' (start + duration) and 'free_until'
+        (end of the free interval the slot sits in), in chronological order.
+
+    Example Input:
+        find_free_slots(
+            resource=Machine.objects.get(custom_id="M-21"),
+            duration=timedelta(hours=1),
+            after=datetime(2025, 11, 5, 9, 0),
+            count=2,
         )
 
-    return {"available": not conflict_exists, "conflict": conflict}
+    Example Output:
+        [
+            {
+                'start': datetime(2025, 11, 5, 12, 0),
+                'end': datetime(2025, 11, 5, 13, 0),
+                'free_until': datetime(2025, 11, 5, 14, 0)
+            },
+            {
+                'start': datetime(2025, 11, 5, 16, 0),
+                'end': datetime(2025, 11, 5, 17, 0),
+                'free_until': datetime(2025, 11, 5, 22, 0)
+            }
+        ]
+    """
+    field = RESOURCE_FIELDS[type(resource)]
+
+    if after is None:
+        after = timezone.now()
+    after = _local_naive(after)
+
+    first_day = after.date()
+    last_day = first_day + timedelta(days=horizon_days)
+    calendar = get_opening_hours_between(first_day, last_day)
+    open_days = sorted(calendar)
+    if not open_days or count < 1:
+        return []
+
+    rows = (
+        Reservation.objects.active()
+        .filter(**{field: resource})
+        .in_window(first_day, last_day + timedelta(days=1))
+        .order_by("starts_at")
+        .values_list("starts_at", "ends_at")
+        .iterator(chunk_size=500)
+    )
+    # Opening hours are wall-clock times, so walk the bookings in local time too
+    busy = ((_local_naive(starts_at), _local_naive(ends_at)) for starts_at, ends_at in rows)
+    if field == "space" and resource.capacity > 1:
+        # A shared space is only busy while every seat is taken
+        busy = iter([(start, end) for start, end, seats in occupancy(busy) if seats >= resource.capacity])
+    current = next(busy, None)
+
+    slots: List[Dict[str, datetime]] = []
+    for day in open_days:
+        open_time, close_time = calendar[day]
+        cursor = max(datetime.combine(day, open_time), after)
+        closes_at = datetime.combine(day, close_time)
+
+        # Skip bookings on days that were closed or already passed
+        while current is not None and current[0].date() < day:
+            current = next(busy, None)
+
+        while cursor + duration <= closes_at:
+            if current is not None and current[0].date() == day:
+                busy_start, busy_end = current
+                if busy_end <= cursor:
+                    current = next(busy, None)
+                    continue
+                gap_end = min(busy_start, closes_at)
+            else:
+                busy_end = None
+                gap_end = closes_at
+
+            if gap_end - cursor >= duration:
+                slots.append({"start": cursor, "end": cursor + duration, "free_until": gap_end})
+                if len(slots) >= count:
+                    return slots
+
+            if busy_end is None:
+                break
+            cursor = max(cursor, busy_end)
+            current = next(busy, None)
+
+    return slots
@@ -1,3 +1,115 @@
+from datetime import date, datetime, time, timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.test import TestCase
 
-# Create your tests here.
+from cmr.models import WEEKDAYS_MASK, Machine, Reservation, Schedule, Space
+from core.methods import find_free_slots, machine_available, machines_available
+
+# A Monday inside the schedule FreeSlotTests activates
+DAY = date(2031, 3, 3)
+
+
+def at(hour, minute=0, day=DAY):
+    return datetime.combine(day, time(hour, minute))
+
+
+class AvailabilityTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("maker", "maker@example.com", "password")
+        self.machine = Machine.objects.create(name="Prusa Mini", custom_id="M-3D-01", category="3D Printer")
+
+    def book(self, start, end, day=DAY, **resource):
+        """Save a reservation from hour `start` to hour `end`, of the test machine unless given a resource."""
+        return Reservation.objects.create(
+            user=self.user,
+            reservation_title="Test booking",
+            date=day,
+            start_time=time(start),
+            end_time=time(end),
+            **(resource or {"machine": self.machine}),
+        )
+
+
+class FreeSlotTests(AvailabilityTestCase):
+
+    def setUp(self):
+        super().setUp()
+        with self.captureOnCommitCallbacks(execute=True):
+            Schedule.objects.create(
+                name="Spring 2031",
+                start_date=date(2031, 3, 1),
+                end_date=date(2031, 3, 31),
+                open_time=time(9),
+                close_time=time(17),
+                days_of_week=WEEKDAYS_MASK,
+                is_active=True,
+            )
+        self.book(10, 11)
+        self.book(12, 15)
+
+    def test_slots_fill_the_gaps_between_bookings(self):
+        slots = find_free_slots(self.machine, timedelta(hours=1), at(8), count=3)
+        self.assertEqual(
+            [(slot["start"], slot["free_until"]) for slot in slots],
+            [(at(9), at(10)), (at(11), at(12)), (at(15), at(17))],
+        )
+        self.assertEqual(slots[0]["end"], at(10))
+
+    def test_gaps_shorter_than_the_duration_are_skipped(self):
+        slots = find_free_slots(self.machine, timedelta(hours=2), at(8), count=2)
+        self.assertEqual([slot["start"] for slot in slots], [at(15), at(9, day=DAY + timedelta(days=1))])
+
+    def test_search_skips_closing_time_and_closed_days(self):
+        friday = date(2031, 3, 7)
+        slots = find_free_slots(self.machine, timedelta(hours=1), at(16, 30, day=friday), count=1)
+        self.assertEqual(slots[0]["start"], at(9, day=date(2031, 3, 10)))
+
+    def test_shared_space_is_free_while_a_seat_is_left(self):
+        space = Space.objects.create(
+            title="Workbench", custom_id="SP-2-01", capacity=2,
+            location="2nd Floor: Hatch Front", floor=2, type="station",
+        )
+        self.book(9, 17, space=space)
+        slots = find_free_slots(space, timedelta(hours=1), at(8), count=1)
+        self.assertEqual(slots[0]["start"], at(9))
+        self.book(9, 12, space=space)
+        slots = find_free_slots(space, timedelta(hours=1), at(8), count=1)
+        self.assertEqual(slots[0]["start"], at(12))
+
+
+class MachineAvailabilityTests(AvailabilityTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.other = Machine.objects.create(name="Prusa Mini", custom_id="M-3D-02", category="3D Printer")
+        self.reservation = self.book(10, 11)
+
+    def test_windows_touching_a_booking_are_free(self):
+        windows = [(at(9), at(10)), (at(10, 30), at(11, 30)), (at(11), at(12))]
+        with self.assertNumQueries(1):
+            availability = machines_available([self.machine, self.other.pk], windows)
+        self.assertEqual(availability, {
+            self.machine.pk: [True, False, True],
+            self.other.pk: [True, True, True],
+        })
+
+    def test_rejected_bookings_do_not_block(self):
+        Reservation.objects.filter(pk=self.reservation.pk).update(status="rejected")
+        self.assertEqual(machines_available([self.machine], [(at(10), at(11))]), {self.machine.pk: [True]})
+        self.assertTrue(machine_available(self.machine, at(10), at(11)))
+
+    def test_conflict_details(self):
+        result = machine_available(self.machine.pk, at(10, 30), at(12), include_conflict=True)
+        self.assertEqual(result, {
+            "available": False,
+            "conflict": {
+                "id": self.reservation.pk,
+                "user_email": "maker@example.com",
+                "start": at(10),
+                "end": at(11),
+            },
+        })
@@ -8,6 +8,7 @@ from __future__ import annotations
 
 from typing import Optional, Sequence, Union
 
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 
@@ -20,6 +21,11 @@ from pct.models import (
 )
 
 
+# Completed-course cache entries expire even without a signal, bounding staleness
+# when several processes each hold their own cache
+TRAINING_CACHE_TIMEOUT = 60 * 15
+
+
 def _get_instance(model, obj_or_id):
     if isinstance(obj_or_id, model):
         return obj_or_id
@@ -129,3 +135,32 @@ def add_training(
     record.full_clean()
     record.save()
     return record
+
+
+# ---- Training eligibility cache ---------------------------------------------
+
+def _completed_courses_cache_key(person_id: int) -> str:
+    return f"pct:completed-courses:{person_id}"
+
+
+def get_completed_course_ids(person: Union[Person, int]) -> frozenset:
+    """Return the IDs of the catalog courses a person has completed.
+
+    The frozenset is cached per person and dropped whenever one of their
+    TrainingRecords is saved or deleted (see pct.signals).
+    """
+    person_id = person.pk if isinstance(person, Person) else person
+    key = _completed_courses_cache_key(person_id)
+    course_ids = cache.get(key)
+    if course_ids is None:
+        course_ids = frozenset(
+            TrainingRecord.objects.filter(person_id=person_id, training_course__isnull=False)
+            .values_list("training_course_id", flat=True)
+        )
+        cache.set(key, course_ids, TRAINING_CACHE_TIMEOUT)
+    return course_ids
+
+
+def invalidate_completed_course_ids(person_id: int) -> None:
+    """Drop a person's cached completed-course IDs."""
+    cache.delete(_completed_courses_cache_key(person_id))
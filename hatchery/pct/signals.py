@@ -1,6 +1,8 @@
 from allauth.account.signals import user_signed_up, user_logged_in
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from pct.models import Person
+from pct.models import Person, TrainingRecord
+from pct.methods import invalidate_completed_course_ids
 from core import constants as const
 
 @receiver(user_signed_up)
@@ -59,3 +61,10 @@ def create_person_on_login(sender, request, user, **kwargs):
             updated = True
         if updated:
             person.save()
+
+
+@receiver(post_save, sender=TrainingRecord)
+@receiver(post_delete, sender=TrainingRecord)
+def invalidate_training_cache(sender, instance, **kwargs):
+    """Drop the person's cached completed courses when their training changes."""
+    invalidate_completed_course_ids(instance.person_id)
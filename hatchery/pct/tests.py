@@ -0,0 +1,72 @@
+from datetime import date, time
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+
+from cmr.models import Machine, Reservation
+from core import constants as const
+from pct.methods import add_training, add_user, get_completed_course_ids
+from pct.models import TrainingCourse
+
+
+class CompletedCourseCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.person = add_user("Ada", "Maker", "ada@example.com")
+        self.laser = TrainingCourse.objects.create(name="Laser Basics", category=const.MACHINE_TYPE_LASER, level=1)
+        self.vinyl = TrainingCourse.objects.create(name="Vinyl Basics", category=const.MACHINE_TYPE_VINYL, level=1)
+
+    def test_completed_courses_are_cached(self):
+        add_training(self.person, training_course=self.laser)
+        self.assertEqual(get_completed_course_ids(self.person), {self.laser.pk})
+        with self.assertNumQueries(0):
+            self.assertEqual(get_completed_course_ids(self.person.pk), {self.laser.pk})
+
+    def test_training_changes_drop_the_cached_courses(self):
+        self.assertEqual(get_completed_course_ids(self.person), frozenset())
+        record = add_training(self.person, training_course=self.vinyl)
+        self.assertEqual(get_completed_course_ids(self.person), {self.vinyl.pk})
+        record.delete()
+        self.assertEqual(get_completed_course_ids(self.person), frozenset())
+
+    def test_records_without_a_catalog_course_do_not_count(self):
+        add_training(self.person, course_name="Shop safety")
+        self.assertEqual(get_completed_course_ids(self.person), frozenset())
+
+
+class TrainingCheckTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("ada", "ada@example.com", "password")
+        self.course = TrainingCourse.objects.create(name="Laser Basics", category=const.MACHINE_TYPE_LASER, level=1)
+        self.machine = Machine.objects.create(name="Epilog Fusion", custom_id="M-LC-01", category="Laser Cutter")
+        self.machine.certifications_required.add(self.course)
+
+    def book(self):
+        return Reservation.objects.create(
+            machine=self.machine,
+            user=self.user,
+            reservation_title="Cut acrylic",
+            date=date(2031, 3, 3),
+            start_time=time(10),
+            end_time=time(11),
+        )
+
+    def test_booking_requires_a_person_record(self):
+        with self.assertRaisesMessage(ValidationError, "not linked to a Person record"):
+            self.book()
+
+    def test_booking_requires_the_machine_training(self):
+        person = add_user("Ada", "Maker", "ada@example.com")
+        person.user = self.user
+        person.save()
+        with self.assertRaisesMessage(ValidationError, "required training to reserve this machine: Laser Basics"):
+            self.book()
+
+        # The failed check cached the person's courses; the new record drops them
+        add_training(person, training_course=self.course)
+        self.assertEqual(self.book().machine, self.machine)
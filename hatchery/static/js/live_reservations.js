@@ -0,0 +1,19 @@
+// Refetch a FullCalendar's events whenever the server pushes a reservation change.
+// Bursts of events (e.g. a booking and its linked reservation) cause one refetch.
+function subscribeToReservations(url, getCalendar) {
+  if (!window.EventSource) {
+    return null;
+  }
+  const source = new EventSource(url);
+  let refetchTimer = null;
+  source.addEventListener("reservation", () => {
+    clearTimeout(refetchTimer);
+    refetchTimer = setTimeout(() => {
+      const calendar = getCalendar();
+      if (calendar) {
+        calendar.refetchEvents();
+      }
+    }, 250);
+  });
+  return source;
+}